@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inicialização
+Mede o tempo de importação do programa principal com -X importtime e
+falha se o orçamento for excedido ou se módulos pesados forem carregados
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Módulos que não devem ser importados apenas para abrir o programa
+HEAVY_MODULES = ("cryptography", "concurrent.futures", "logging", "argparse")
+
+def parse_importtime(stderr):
+    """
+    Interpreta a saída de -X importtime
+    
+    Args:
+        stderr (str): Saída de erro do interpretador
+    
+    Returns:
+        list: Tuplas (módulo, próprio_us, cumulativo_us)
+    """
+    entries = []
+    
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        
+        parts = line[len("import time:"):].split("|")
+        entries.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    
+    return entries
+
+def measure_imports(statement):
+    """
+    Executa uma importação em um interpretador novo com -X importtime
+    
+    Args:
+        statement (str): Código Python a executar
+    
+    Returns:
+        list: Tuplas (módulo, próprio_us, cumulativo_us)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return parse_importtime(result.stderr)
+
+def measure_wall(args, runs):
+    """
+    Mede o menor tempo de parede de um comando do programa
+    
+    Args:
+        args (list): Argumentos de main.py
+        runs (int): Quantidade de execuções
+    
+    Returns:
+        float: Menor tempo em milissegundos
+    """
+    best = float("inf")
+    
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", *args], cwd=ROOT,
+                       capture_output=True, check=True)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização")
+    parser.add_argument("--budget-ms", type=float, default=60.0,
+                        help="Orçamento para a importação de main (padrão: 60 ms)")
+    parser.add_argument("--runs", type=int, default=5, help="Execuções do comando 'list'")
+    args = parser.parse_args()
+    
+    entries = measure_imports("import main")
+    main_us = next(cumulative for name, _, cumulative in entries if name == "main")
+    loaded = {name for name, _, _ in entries}
+    
+    print(f"Importação de main: {main_us / 1000:.1f} ms (orçamento: {args.budget_ms:.0f} ms)")
+    print("\nMaiores importações (cumulativo):")
+    for name, _, cumulative in sorted(entries, key=lambda e: e[2], reverse=True)[:10]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    
+    print(f"\n'main.py list': {measure_wall(['list'], args.runs):.1f} ms (melhor de {args.runs})")
+    
+    failures = []
+    
+    if main_us / 1000 > args.budget_ms:
+        failures.append(f"importação de main acima do orçamento ({main_us / 1000:.1f} ms)")
+    
+    for heavy in HEAVY_MODULES:
+        if heavy in loaded:
+            failures.append(f"módulo pesado carregado na inicialização: {heavy}")
+    
+    for failure in failures:
+        print(f"❌ {failure}")
+    
+    if not failures:
+        print("✅ Inicialização dentro do orçamento")
+    
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -9,24 +9,41 @@ import sys
 from pathlib import Path
 import time
 
-# Adiciona o diretório dos módulos ao path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
-
-from auth.password_manager import PasswordManager
-from crypto.aes_handler import AESHandler
-from file_ops.file_manager import FileManager
-from utils.logger import setup_logger
+# Apenas módulos leves são importados na inicialização; criptografia,
+# armazenamento e logging são carregados sob demanda
+from modules.auth.password_manager import PasswordManager
+from modules.auth.key_manager import KeyManager
+from modules.file_ops.file_manager import FileManager
+from modules.file_ops.retention import RetentionPolicy
+from modules.file_ops.snapshot import ConsistentCapture, CONSISTENT, INCONSISTENT
+from modules.crypto.scheduler import WorkScheduler, STRATEGIES
+from modules.utils.throttle import IOThrottle, apply_low_priority
 
 class CryptoInterface:
     """Interface principal do sistema de criptografia"""
     
     def __init__(self):
-        self.logger = setup_logger()
+        self._logger = None
         self.password_manager = PasswordManager()
+        self.key_manager = KeyManager(self.password_manager)
         self.file_manager = FileManager()
         self.current_password = None
         self.current_folder = None
+        self.kdf_target_ms = 250
+        self.retention_policy = RetentionPolicy(keep_last=5)
+        self.throttle = IOThrottle()
+        self.capture = ConsistentCapture()  # None desativa a captura consistente
+        self.scheduler = WorkScheduler()
+        self.parity = None  # ParityCodec quando a paridade estiver ativada
         
+    @property
+    def logger(self):
+        """Logger configurado apenas no primeiro uso"""
+        if self._logger is None:
+            from modules.utils.logger import setup_logger
+            self._logger = setup_logger()
+        return self._logger
+    
     def clear_screen(self):
         """Limpa a tela do terminal"""
         os.system('cls' if os.name == 'nt' else 'clear')
@@ -72,19 +89,29 @@ class CryptoInterface:
             print("│ 🔐 Senha: ❌ Não configurada")
         
         if self.current_folder:
-            files = self.file_manager.scan_folder(self.current_folder, silent=True)
-            encrypted_files = [f for f in files if f.endswith('.encrypted')]
-            regular_files = [f for f in files if not f.endswith('.encrypted')]
-            
             print(f"│ 📁 Pasta: {self.current_folder}")
-            print(f"│ 📄 Arquivos normais: {len(regular_files)}")
-            print(f"│ 🔒 Arquivos criptografados: {len(encrypted_files)}")
+            
+            try:
+                inventory = self.file_manager.get_inventory(self.current_folder)
+                print(f"│ 📄 Arquivos normais: {inventory.count(encrypted=False)}")
+                print(f"│ 🔒 Arquivos criptografados: {inventory.count(encrypted=True)}")
+            except OSError as e:
+                print(f"│ ⚠️  Pasta inacessível: {e}")
         else:
             print("│ 📁 Pasta: ❌ Não selecionada")
         
         print("└─" + "─" * 50)
         print()
 
+    def print_file_list(self, inventory, indices, limit=10):
+        """Imprime os primeiros arquivos de uma seleção do inventário"""
+        for i, index in enumerate(indices[:limit], 1):
+            size_str = self.file_manager._format_file_size(inventory.sizes[index])
+            print(f"{i:2}. {inventory.names[index]} ({size_str})")
+        
+        if len(indices) > limit:
+            print(f"    ... e mais {len(indices) - limit} arquivos")
+    
     def main_menu(self):
         """Menu principal melhorado"""
         while True:
@@ -98,6 +125,7 @@ class CryptoInterface:
                 "🔓 Descriptografar Arquivos",
                 "📊 Visualizar Arquivos da Pasta",
                 "🧹 Gerenciar Backups",
+                "⚙️  Configurações de desempenho",
                 "❌ Sair do Programa"
             ]
             
@@ -119,10 +147,12 @@ class CryptoInterface:
                 elif choice == '6':
                     self.manage_backups()
                 elif choice == '7':
+                    self.performance_settings()
+                elif choice == '8':
                     if self.confirm_exit():
                         break
                 else:
-                    self.show_error("Opção inválida! Digite um número de 1 a 7.")
+                    self.show_error("Opção inválida! Digite um número de 1 a 8.")
                     
             except KeyboardInterrupt:
                 if self.confirm_exit():
@@ -139,16 +169,108 @@ class CryptoInterface:
             if not self.confirm_action("Alterar senha"):
                 return
         
+        old_password = self.current_password
+        
         try:
             self.current_password = self.password_manager.get_password()
             self.show_success("Senha configurada com sucesso! 🎉")
             self.logger.info("Senha configurada pelo usuário")
             
+            # A calibração é feita uma vez e salva; recalibrar fica no menu de desempenho
+            if not self.key_manager.is_calibrated():
+                self.calibrate_kdf()
+            
+            if old_password and old_password != self.current_password:
+                if self.confirm_action("Aplicar a nova senha aos backups existentes"):
+                    self.rotate_backup_keys(old_password, self.current_password)
+            
         except Exception as e:
             self.show_error(f"Erro ao configurar senha: {e}")
         
         self.wait_for_enter()
     
+    def calibrate_kdf(self):
+        """Calibra a derivação de chave para o tempo alvo neste equipamento e salva o resultado"""
+        print(f"\n⏱️  Calibrando derivação de chave (alvo: {self.kdf_target_ms} ms)...")
+        
+        try:
+            params = self.key_manager.calibrate_kdf(target_ms=self.kdf_target_ms)
+            details = ", ".join(f"{k}={v}" for k, v in params.items() if k != "algorithm")
+            print(f"    ✅ {params['algorithm']} ({details})")
+            self.logger.info(f"KDF calibrado: {params}")
+            
+        except Exception as e:
+            print(f"    ⚠️  Calibração falhou, mantendo os parâmetros atuais: {e}")
+            self.logger.warning(f"Erro ao calibrar KDF: {e}")
+    
+    def rotate_backup_keys(self, old_password, new_password):
+        """Reencapsula as chaves dos backups existentes com a nova senha"""
+        backup_folders = [
+            item for item in self.file_manager.current_dir.iterdir()
+            if item.is_dir() and item.name.startswith('encrypted_backup_')
+            and self.key_manager.has_key_file(item)
+        ]
+        
+        if not backup_folders:
+            print("📭 Nenhum backup com arquivo de chave encontrado.")
+            return
+        
+        from modules.crypto.parity import refresh_parity
+        
+        updated = 0
+        
+        for folder in backup_folders:
+            try:
+                self.key_manager.rewrap_key_file(folder, old_password, new_password)
+                refresh_parity(self.key_manager.key_file_path(folder))
+                updated += 1
+                print(f"    ✅ {folder.name}")
+                
+            except Exception as e:
+                print(f"    ❌ {folder.name}: {e}")
+                self.logger.error(f"Erro ao trocar senha do backup {folder}: {e}")
+        
+        self.show_success(f"Senha atualizada em {updated} de {len(backup_folders)} backup(s)")
+        self.logger.info(f"Chaves reencapsuladas: {updated}/{len(backup_folders)}")
+    
+    def get_decryption_handler(self, folder):
+        """
+        Obtém o handler AES para uma pasta de backup
+        
+        Usa a chave de dados do arquivo de chave quando existir; backups
+        antigos, sem arquivo de chave, usam a chave derivada da senha.
+        """
+        from modules.crypto.aes_handler import AESHandler
+        from modules.crypto.parity import with_repair
+        
+        if self.key_manager.has_key_file(folder):
+            data_key = with_repair(self.key_manager.key_file_path(folder),
+                                   lambda: self.key_manager.load_data_key(folder, self.current_password))
+            return AESHandler(key=data_key)
+        
+        return AESHandler(self.current_password)
+    
+    def load_backup_manifest(self, folder, aes_handler=None):
+        """
+        Carrega o manifesto de uma pasta de backup
+        
+        Args:
+            folder (Path): Pasta do backup
+            aes_handler (AESHandler): Handler da pasta (obtido se não informado)
+        
+        Returns:
+            BackupManifest: Manifesto da pasta (vazio se não houver)
+        """
+        from modules.file_ops.manifest import BackupManifest
+        
+        if not BackupManifest.exists(folder):
+            return BackupManifest()
+        
+        from modules.crypto.parity import with_repair
+        
+        aes_handler = aes_handler or self.get_decryption_handler(folder)
+        return with_repair(BackupManifest.manifest_path(folder), lambda: BackupManifest.load(folder, aes_handler))
+    
     def select_folder(self):
         """Menu de seleção de pasta melhorado"""
         while True:
@@ -172,7 +294,7 @@ class CryptoInterface:
             if choice == '0':
                 break
             elif choice == '1':
-                self.current_folder = Path.cwd()
+                self.set_current_folder(Path.cwd())
                 self.show_success(f"Pasta definida: {self.current_folder}")
                 self.wait_for_enter()
                 break
@@ -188,6 +310,11 @@ class CryptoInterface:
                 self.show_error("Opção inválida!")
                 time.sleep(1)
     
+    def set_current_folder(self, folder):
+        """Define a pasta de trabalho e já inicia seu escaneamento em segundo plano"""
+        self.current_folder = folder
+        self.file_manager.scan_cache.refresh_async(folder)
+    
     def browse_folders(self):
         """Navegador de pastas interativo"""
         current_path = self.current_folder or Path.cwd()
@@ -227,7 +354,7 @@ class CryptoInterface:
                 if choice == '0':
                     return False
                 elif choice == 'S':
-                    self.current_folder = current_path
+                    self.set_current_folder(current_path)
                     self.show_success(f"Pasta selecionada: {current_path}")
                     self.wait_for_enter()
                     return True
@@ -271,7 +398,7 @@ class CryptoInterface:
             folder_path = Path(path_input)
             
             if folder_path.exists() and folder_path.is_dir():
-                self.current_folder = folder_path
+                self.set_current_folder(folder_path)
                 self.show_success(f"Pasta definida: {folder_path}")
                 self.wait_for_enter()
                 return True
@@ -294,9 +421,11 @@ class CryptoInterface:
         
         self.print_header(f"CONTEÚDO - {self.current_folder}")
         
-        files = self.file_manager.scan_folder(self.current_folder, silent=True)
-        encrypted_files = [f for f in files if f.endswith('.encrypted')]
-        regular_files = [f for f in files if not f.endswith('.encrypted')]
+        inventory = self.current_inventory()
+        if inventory is None:
+            return
+        encrypted_files = inventory.indices(encrypted=True)
+        regular_files = inventory.indices(encrypted=False)
         
         print(f"📊 RESUMO:")
         print(f"├─ Arquivos normais: {len(regular_files)}")
@@ -305,25 +434,56 @@ class CryptoInterface:
         
         if regular_files:
             print("📄 ARQUIVOS NORMAIS:")
-            for i, file_path in enumerate(regular_files[:10], 1):
-                file_info = self.file_manager.get_file_stats(file_path)
-                print(f"{i:2}. {file_info['name']} ({file_info['size_formatted']})")
-            
-            if len(regular_files) > 10:
-                print(f"    ... e mais {len(regular_files) - 10} arquivos")
+            self.print_file_list(inventory, regular_files)
             print()
         
         if encrypted_files:
             print("🔒 ARQUIVOS CRIPTOGRAFADOS:")
-            for i, file_path in enumerate(encrypted_files[:10], 1):
-                file_info = self.file_manager.get_file_stats(file_path)
-                print(f"{i:2}. {file_info['name']} ({file_info['size_formatted']})")
-            
-            if len(encrypted_files) > 10:
-                print(f"    ... e mais {len(encrypted_files) - 10} arquivos")
+            self.print_file_list(inventory, encrypted_files)
+            print()
+            self.print_encrypted_summary(self.inspect_encrypted(inventory, encrypted_files))
         
         self.wait_for_enter()
     
+    def inspect_encrypted(self, inventory, indices):
+        """
+        Resume os arquivos criptografados de uma seleção do inventário
+        
+        Usa o manifesto quando a pasta é um backup com manifesto e a senha está
+        configurada; caso contrário, lê os cabeçalhos em paralelo.
+        """
+        from modules.crypto.header_scan import inspect_backup, inspect_headers
+        from modules.file_ops.manifest import BackupManifest
+        
+        if self.current_password and BackupManifest.exists(self.current_folder):
+            try:
+                return inspect_backup(self.current_folder, self.load_backup_manifest(self.current_folder))
+            except Exception as e:
+                self.logger.warning(f"Manifesto ilegível em {self.current_folder}, lendo cabeçalhos: {e}")
+        
+        return inspect_headers([inventory.path(index) for index in indices])
+    
+    def print_encrypted_summary(self, report):
+        """Imprime as estatísticas agregadas de um relatório de cabeçalhos"""
+        summary = report.summary()
+        overhead = summary["overhead"]
+        size = self.file_manager._format_file_size
+        
+        print("📈 ESTATÍSTICAS DOS CRIPTOGRAFADOS:")
+        print(f"├─ Tamanho original: {size(summary['total_original'])} "
+              f"(criptografado: {size(summary['total_encrypted'])})")
+        print(f"├─ Overhead: {size(overhead['total'])} ({overhead['percent']:.2f}%), por arquivo "
+              f"mediana {overhead['median']} B, p95 {overhead['p95']} B, máx. {overhead['max']} B")
+        
+        if summary["versions"]:
+            formats = ", ".join(f"v{version}: {count}" for version, count in sorted(summary["versions"].items()))
+            ciphers = ", ".join(f"{name}: {count}" for name, count in sorted(summary["ciphers"].items()))
+            print(f"├─ Formatos: {formats} ({ciphers})")
+        else:
+            print("├─ Formatos: não lidos (dados do manifesto)")
+        
+        print(f"└─ Ilegíveis: {summary['errors']}")
+    
     def encrypt_files_menu(self):
         """Menu de criptografia"""
         if not self.validate_prerequisites():
@@ -331,8 +491,10 @@ class CryptoInterface:
         
         self.print_header("CRIPTOGRAFIA DE ARQUIVOS")
         
-        files = self.file_manager.scan_folder(self.current_folder, silent=True)
-        regular_files = [f for f in files if not f.endswith('.encrypted')]
+        inventory = self.current_inventory()
+        if inventory is None:
+            return
+        regular_files = inventory.indices(encrypted=False)
         
         if not regular_files:
             self.show_error("Nenhum arquivo para criptografar encontrado!")
@@ -342,17 +504,13 @@ class CryptoInterface:
         print(f"🔍 Encontrados {len(regular_files)} arquivo(s) para criptografar:")
         print()
         
-        for i, file_path in enumerate(regular_files[:10], 1):
-            file_info = self.file_manager.get_file_stats(file_path)
-            print(f"{i:2}. {file_info['name']} ({file_info['size_formatted']})")
-        
-        if len(regular_files) > 10:
-            print(f"    ... e mais {len(regular_files) - 10} arquivos")
-        
+        self.print_file_list(inventory, regular_files)
         print()
         
+        # Os tamanhos do inventário podem vir do cache (validado só pelo mtime da
+        # pasta); perform_encryption consulta os tamanhos atuais com stat
         if self.confirm_action(f"Criptografar {len(regular_files)} arquivo(s)"):
-            self.perform_encryption(regular_files)
+            self.perform_encryption(inventory.paths(regular_files))
         
         self.wait_for_enter()
     
@@ -363,8 +521,10 @@ class CryptoInterface:
         
         self.print_header("DESCRIPTOGRAFIA DE ARQUIVOS")
         
-        files = self.file_manager.scan_folder(self.current_folder, silent=True)
-        encrypted_files = [f for f in files if f.endswith('.encrypted')]
+        inventory = self.current_inventory()
+        if inventory is None:
+            return
+        encrypted_files = inventory.indices(encrypted=True)
         
         if not encrypted_files:
             self.show_error("Nenhum arquivo criptografado encontrado!")
@@ -374,51 +534,170 @@ class CryptoInterface:
         print(f"🔍 Encontrados {len(encrypted_files)} arquivo(s) criptografado(s):")
         print()
         
-        for i, file_path in enumerate(encrypted_files[:10], 1):
-            file_info = self.file_manager.get_file_stats(file_path)
-            print(f"{i:2}. {file_info['name']} ({file_info['size_formatted']})")
+        self.print_file_list(inventory, encrypted_files)
+        print()
         
-        if len(encrypted_files) > 10:
-            print(f"    ... e mais {len(encrypted_files) - 10} arquivos")
+        # Os nomes salvos são aleatórios; os reais vêm do manifesto criptografado
+        try:
+            manifest = self.load_backup_manifest(self.current_folder)
+        except Exception as e:
+            manifest = None
+            self.logger.warning(f"Manifesto indisponível em {self.current_folder}: {e}")
         
-        print()
+        if manifest:
+            print(f"📋 O backup contém {len(manifest)} arquivo(s) original(is):")
+            for i, (name, entry) in enumerate(list(manifest.entries.items())[:10], 1):
+                print(f"{i:2}. {name} ({self.file_manager._format_file_size(entry['size'])})")
+            if len(manifest) > 10:
+                print(f"    ... e mais {len(manifest) - 10} arquivos")
+            print()
         
         if self.confirm_action(f"Descriptografar {len(encrypted_files)} arquivo(s)"):
-            self.perform_decryption(encrypted_files)
+            self.perform_decryption(inventory.paths(encrypted_files))
         
         self.wait_for_enter()
     
-    def perform_encryption(self, files_to_encrypt):
-        """Executa processo de criptografia"""
+    def perform_encryption(self, files_to_encrypt, sizes=None):
+        """
+        Executa processo de criptografia
+        
+        Args:
+            files_to_encrypt (list): Caminhos dos arquivos
+            sizes (list): Tamanhos atuais, já obtidos pelo chamador (evita novo
+                stat; não use os do inventário em cache, que podem estar defasados)
+        """
+        from modules.crypto.aes_handler import AESHandler
+        from modules.crypto.batch_engine import BatchEngine
+        from modules.crypto.bundle_handler import BundleHandler
+        from modules.crypto.cipher_suite import select_cipher
+        from modules.crypto.sparse import is_probably_sparse
+        from modules.file_ops.manifest import BackupManifest
+        
         try:
-            aes_handler = AESHandler(self.current_password)
             backup_folder = self.file_manager.create_backup_folder()
+            data_key = self.key_manager.create_key_file(backup_folder, self.current_password)
+            
+            # Cifra autenticada mais rápida neste equipamento (medida uma vez e reaproveitada)
+            aes_handler = AESHandler(key=data_key, cipher=select_cipher())
+            bundle_handler = BundleHandler(aes_handler)
+            manifest = BackupManifest()
             
-            print("\n🔄 Iniciando criptografia...")
+            print(f"\n🔐 Cifra: {aes_handler.cipher}")
+            print("🔄 Iniciando criptografia...")
             
             successful = 0
             failed = 0
             
-            for i, file_path in enumerate(files_to_encrypt, 1):
+            # Caminho rápido: arquivos pequenos são agrupados em pacotes
+            small_files, large_files = bundle_handler.split_files(files_to_encrypt, sizes)
+            
+            if small_files:
+                groups = bundle_handler.plan_bundles(small_files)
+                print(f"📦 Agrupando {len(small_files)} arquivo(s) pequeno(s) em {len(groups)} pacote(s)")
+                
+                for i, group in enumerate(groups, 1):
+                    bundle_path = backup_folder / f"pacote_{i:04d}{BundleHandler.BUNDLE_SUFFIX}"
+                    try:
+                        for entry in bundle_handler.create_bundle(group, bundle_path, throttle=self.throttle):
+                            extra = {"consistency": entry["consistency"]} if "consistency" in entry else {}
+                            manifest.add_entry(
+                                entry["name"], bundle_path.name, entry["size"], entry["mtime"],
+                                entry["hash"], entry["hash_algorithm"], bundle=True, **extra
+                            )
+                        successful += len(group)
+                        print(f"    ✅ Pacote {i}/{len(groups)} ({len(group)} arquivos): {bundle_path}")
+                        
+                    except Exception as e:
+                        failed += len(group)
+                        print(f"    ❌ Erro: {e}")
+                        self.logger.error(f"Erro ao criar pacote {bundle_path}: {e}")
+            
+            # Arquivos grandes: os enormes são divididos entre todos os workers,
+            # um de cada vez; os demais rodam em paralelo na ordem do agendador
+            engine = BatchEngine()
+            size_of = dict(zip(files_to_encrypt, sizes)) if sizes is not None else {}
+            for file_path in large_files:
+                if file_path not in size_of:
+                    size_of[file_path] = os.stat(file_path).st_size
+            
+            huge_files = [path for path in self.scheduler.order(large_files, size_of)
+                          if aes_handler.can_split(size_of[path]) and not is_probably_sparse(os.stat(path))]
+            split = set(huge_files)
+            other_files = [path for path in large_files if path not in split]
+            
+            def encrypt_large(file_path, parts_engine=None):
+                self.throttle.before_file()
+                
+                # Nome aleatório: o nome real fica apenas no manifesto criptografado
+                backup_file_path = backup_folder / BackupManifest.new_stored_name()
+                
+                # Criptografa em fluxo e calcula o hash na mesma leitura;
+                # o mapa de trechos de arquivos esparsos vai para o cabeçalho
+                def encrypt(source, tolerant=False):
+                    if parts_engine is not None:
+                        return aes_handler.encrypt_file_parallel(source, backup_file_path, parts_engine,
+                                                                 throttle=self.throttle, tolerant=tolerant)
+                    return aes_handler.encrypt_file(source, backup_file_path, throttle=self.throttle,
+                                                    sparse=True, tolerant=tolerant)
+                
+                if self.capture is not None:
+                    info, status = self.capture.capture(file_path, encrypt)
+                else:
+                    info, status = encrypt(file_path), CONSISTENT
+                
+                return backup_file_path, info, status, os.stat(file_path).st_mtime
+            
+            def record(file_path, result, error, done, total):
+                nonlocal successful, failed
+                print(f"[{done}/{total}] {Path(file_path).name}")
+                
+                if error is not None:
+                    failed += 1
+                    print(f"    ❌ Erro: {error}")
+                    self.logger.error(f"Erro ao criptografar {file_path}: {error}")
+                    return
+                
+                backup_file_path, info, status, mtime = result
+                extra = {"extents": info["extents"]} if "extents" in info else {}
+                if status != CONSISTENT:
+                    extra["consistency"] = status
+                
+                manifest.add_entry(
+                    Path(file_path).name, backup_file_path.name, info["original_size"], mtime,
+                    info["hash"], info["hash_algorithm"], **extra
+                )
+                
+                successful += 1
+                print(f"    ✅ Salvo em: {backup_file_path}")
+                if "extents" in extra:
+                    print(f"    🕳️  Arquivo esparso: {len(info['extents'])} trecho(s) com dados")
+                if status == INCONSISTENT:
+                    print("    ⚠️  Arquivo alterado durante a leitura: cópia possivelmente inconsistente")
+                    self.logger.warning(f"Captura inconsistente: {file_path}")
+                elif status != CONSISTENT:
+                    print(f"    🔁 Arquivo alterado durante a leitura; captura: {status}")
+            
+            if large_files:
+                print(f"🗂️  {len(large_files)} arquivo(s) grande(s), ordem: {self.scheduler.describe()}")
+            
+            for i, file_path in enumerate(huge_files, 1):
+                result, error = None, None
                 try:
-                    print(f"[{i}/{len(files_to_encrypt)}] Processando: {Path(file_path).name}")
-                    
-                    with open(file_path, 'rb') as f:
-                        file_data = f.read()
-                    
-                    encrypted_data = aes_handler.encrypt(file_data)
-                    
-                    backup_file_path = backup_folder / f"{Path(file_path).name}.encrypted"
-                    with open(backup_file_path, 'wb') as f:
-                        f.write(encrypted_data)
-                    
-                    successful += 1
-                    print(f"    ✅ Salvo em: {backup_file_path}")
-                    
+                    result = encrypt_large(file_path, engine)
                 except Exception as e:
-                    failed += 1
-                    print(f"    ❌ Erro: {e}")
-                    self.logger.error(f"Erro ao criptografar {file_path}: {e}")
+                    error = e
+                record(file_path, result, error, i, len(large_files))
+            
+            engine.run(
+                other_files, encrypt_large,
+                on_result=lambda path, result, error, done, total: record(
+                    path, result, error, len(huge_files) + done, len(large_files)),
+                priority=lambda path: self.scheduler.priority(path, size_of[path])
+            )
+            
+            manifest.save(backup_folder, aes_handler)
+            self.protect_backup(backup_folder)
+            self.file_manager.scan_cache.invalidate()
             
             print("\n" + "="*50)
             print("🎉 CRIPTOGRAFIA CONCLUÍDA!")
@@ -431,10 +710,106 @@ class CryptoInterface:
         except Exception as e:
             self.show_error(f"Erro durante criptografia: {e}")
     
+    def protect_backup(self, backup_folder):
+        """
+        Gera a paridade dos arquivos, do manifesto e do arquivo de chave de um
+        backup, se a paridade estiver ativada
+        
+        Args:
+            backup_folder (Path): Pasta do backup
+        """
+        from modules.crypto.batch_engine import BatchEngine
+        from modules.file_ops.manifest import BackupManifest
+        
+        if self.parity is None:
+            return
+        
+        with os.scandir(backup_folder) as entries:
+            paths = [entry.path for entry in entries if entry.is_file() and entry.name.endswith('.encrypted')]
+        if BackupManifest.exists(backup_folder):
+            paths.append(str(BackupManifest.manifest_path(backup_folder)))
+        if self.key_manager.has_key_file(backup_folder):
+            paths.append(str(self.key_manager.key_file_path(backup_folder)))
+        
+        print(f"\n🧩 Gerando paridade de {len(paths)} arquivo(s)...")
+        summary = self.parity.protect_files(paths, BatchEngine())
+        
+        overhead = summary["parity_bytes"] * 100 / summary["data_bytes"] if summary["data_bytes"] else 0.0
+        print(f"🧩 Paridade: {self.file_manager._format_file_size(summary['parity_bytes'])} (+{overhead:.1f}%)")
+        for path, error in summary["failed"][:5]:
+            print(f"    ❌ {error}")
+        
+        self.logger.info(f"Paridade de {backup_folder}: {summary['files']} arquivo(s), "
+                         f"{summary['parity_bytes']} bytes, {len(summary['failed'])} falha(s)")
+    
+    def perform_host_backup(self, roots, cipher=None):
+        """
+        Executa o backup de várias pastas de origem em uma única pasta de backup
+        
+        Args:
+            roots (list): Pastas de origem
+            cipher (str): Cifra autenticada (padrão: a mais rápida no equipamento)
+        
+        Returns:
+            tuple: (pasta de backup criada, resumo por origem — ver HostBackup.run)
+        """
+        from modules.crypto.aes_handler import AESHandler
+        from modules.crypto.cipher_suite import select_cipher
+        from modules.crypto.host_backup import HostBackup
+        from modules.file_ops.manifest import BackupManifest
+        
+        backup_folder = self.file_manager.create_backup_folder()
+        data_key = self.key_manager.create_key_file(backup_folder, self.current_password)
+        aes_handler = AESHandler(key=data_key, cipher=cipher or select_cipher())
+        manifest = BackupManifest()
+        host_backup = HostBackup(aes_handler, backup_folder, manifest, throttle=self.throttle,
+                                 capture=self.capture, scheduler=self.scheduler)
+        
+        print(f"\n🔐 Cifra: {aes_handler.cipher}")
+        print(f"🔄 Backup de {len(roots)} origem(ns)...")
+        
+        def report(label, summary):
+            done = summary["files"] + summary["failed"]
+            if done % 100 == 0:
+                print(f"    [{label}] {done} arquivo(s) processado(s)")
+        
+        start = time.perf_counter()
+        summaries = host_backup.run(roots, on_progress=report)
+        elapsed = time.perf_counter() - start
+        
+        manifest.save(backup_folder, aes_handler)
+        self.protect_backup(backup_folder)
+        self.file_manager.scan_cache.invalidate()
+        
+        print("\n" + "="*50)
+        print("🎉 BACKUP DAS ORIGENS CONCLUÍDO!")
+        for label, summary in summaries.items():
+            size_str = self.file_manager._format_file_size(summary["bytes"])
+            print(f"📁 {label} ({summary['root']}): {summary['files']} arquivo(s), {size_str}, "
+                  f"{summary['failed']} falha(s), {summary['seconds']:.1f}s")
+            for path, error in summary["errors"][:5]:
+                print(f"    ❌ {path}: {error}")
+            for path in summary["inconsistent"][:5]:
+                print(f"    ⚠️  Alterado durante a leitura: {path}")
+        
+        total_bytes = sum(summary["bytes"] for summary in summaries.values())
+        print(f"⏱️  Tempo total: {elapsed:.1f}s ({total_bytes / max(elapsed, 0.001) / (1024 * 1024):.1f} MB/s)")
+        print(f"📁 Pasta de backup: {backup_folder}")
+        
+        self.logger.info(f"Backup de {len(roots)} origem(ns) concluído em {elapsed:.1f}s: {backup_folder}")
+        return backup_folder, summaries
+    
     def perform_decryption(self, files_to_decrypt):
         """Executa processo de descriptografia"""
+        from modules.crypto.bundle_handler import BundleHandler
+        from modules.crypto.parity import with_repair
+        from modules.file_ops.manifest import BackupManifest
+        
         try:
-            aes_handler = AESHandler(self.current_password)
+            backup_folder = Path(files_to_decrypt[0]).parent
+            aes_handler = self.get_decryption_handler(backup_folder)
+            bundle_handler = BundleHandler(aes_handler)
+            manifest = self.load_backup_manifest(backup_folder, aes_handler)
             decrypted_folder = self.file_manager.create_decrypted_folder()
             
             print("\n🔄 Iniciando descriptografia...")
@@ -443,19 +818,32 @@ class CryptoInterface:
             failed = 0
             
             for i, file_path in enumerate(files_to_decrypt, 1):
+                self.throttle.before_file()
                 try:
                     print(f"[{i}/{len(files_to_decrypt)}] Processando: {Path(file_path).name}")
                     
-                    with open(file_path, 'rb') as f:
-                        encrypted_data = f.read()
-                    
-                    decrypted_data = aes_handler.decrypt(encrypted_data)
+                    if bundle_handler.is_bundle(file_path):
+                        restored, bundle_failed = with_repair(
+                            file_path, lambda: bundle_handler.extract_bundle(file_path, decrypted_folder))
+                        successful += len(restored)
+                        failed += len(bundle_failed)
+                        print(f"    ✅ Pacote restaurado: {len(restored)} arquivo(s) em {decrypted_folder}")
+                        for name, error in bundle_failed:
+                            print(f"    ❌ Erro em {name}: {error}")
+                            self.logger.error(f"Erro ao descriptografar {name} do pacote {file_path}: {error}")
+                        continue
                     
-                    original_name = Path(file_path).stem
-                    decrypted_file_path = decrypted_folder / original_name
+                    original_name = manifest.original_name(Path(file_path).name)
+                    decrypted_file_path = BackupManifest.restore_path(decrypted_folder, original_name)
                     
-                    with open(decrypted_file_path, 'wb') as f:
-                        f.write(decrypted_data)
+                    # Esparsos recriam os buracos pelo mapa do cabeçalho (ou do manifesto, nos antigos)
+                    entry = manifest.find_stored(Path(file_path).name) or {}
+                    extents = entry.get("extents")
+                    # Arquivos com paridade danificados são reparados e lidos de novo
+                    with_repair(file_path, lambda: aes_handler.decrypt_file(
+                        file_path, decrypted_file_path, throttle=self.throttle,
+                        extents=extents, size=entry.get("size") if extents is not None else None
+                    ))
                     
                     successful += 1
                     print(f"    ✅ Restaurado: {decrypted_file_path}")
@@ -473,6 +861,7 @@ class CryptoInterface:
             print(f"❌ Falhas: {failed}")
             print(f"📁 Pasta de saída: {decrypted_folder}")
             
+            self.file_manager.scan_cache.invalidate()
             self.logger.info(f"Descriptografia concluída: {successful} sucessos, {failed} falhas")
             
         except Exception as e:
@@ -494,7 +883,13 @@ class CryptoInterface:
         options = [
             "📊 Listar backups existentes",
             "🧹 Limpar backups antigos",
-            "📁 Abrir pasta de backups"
+            "📁 Abrir pasta de backups",
+            "🔍 Verificar integridade de um backup",
+            "⚙️  Configurar política de retenção",
+            "☁️  Enviar backup para armazenamento externo",
+            "🔀 Comparar dois backups",
+            "🗂️  Navegar no conteúdo de um backup",
+            "🧬 Migrar arquivos antigos para o formato atual"
         ]
         
         self.print_menu_box("OPÇÕES DE BACKUP", options)
@@ -509,6 +904,18 @@ class CryptoInterface:
             self.clean_backups()
         elif choice == '3':
             self.open_backup_folder()
+        elif choice == '4':
+            self.verify_backup()
+        elif choice == '5':
+            self.configure_retention()
+        elif choice == '6':
+            self.upload_backup()
+        elif choice == '7':
+            self.compare_backups()
+        elif choice == '8':
+            self.browse_backup()
+        elif choice == '9':
+            self.migrate_backup()
         else:
             self.show_error("Opção inválida!")
         
@@ -532,10 +939,10 @@ class CryptoInterface:
         
         print(f"\n📁 Encontrados {len(backup_folders)} backup(s):")
         
+        # Backups criptografados: cabeçalhos lidos em paralelo, sem a chave
+        from modules.crypto.header_scan import inspect_backup
+        
         for i, folder in enumerate(backup_folders, 1):
-            files_count = len(list(folder.iterdir()))
-            size = sum(f.stat().st_size for f in folder.rglob('*') if f.is_file())
-            size_str = self.file_manager._format_file_size(size)
             mod_time = time.strftime("%d/%m/%Y %H:%M", 
                                    time.localtime(folder.stat().st_mtime))
             
@@ -543,18 +950,419 @@ class CryptoInterface:
             
             print(f"{i:2}. {backup_type}")
             print(f"    📁 {folder.name}")
-            print(f"    📊 {files_count} arquivo(s), {size_str}")
+            
+            if "encrypted" in folder.name:
+                summary = inspect_backup(folder).summary()
+                formats = ", ".join(f"v{version}: {count}" for version, count in sorted(summary["versions"].items()))
+                print(f"    📊 {summary['files']} arquivo(s), "
+                      f"{self.file_manager._format_file_size(summary['total_original'])} originais, "
+                      f"{self.file_manager._format_file_size(summary['total_encrypted'])} em disco "
+                      f"(overhead {summary['overhead']['percent']:.2f}%)")
+                if formats:
+                    print(f"    🧩 Formatos: {formats}")
+                if summary["errors"]:
+                    print(f"    ⚠️  {summary['errors']} arquivo(s) ilegível(is)")
+            else:
+                files_count = len(list(folder.iterdir()))
+                size = sum(f.stat().st_size for f in folder.rglob('*') if f.is_file())
+                print(f"    📊 {files_count} arquivo(s), {self.file_manager._format_file_size(size)}")
+            
             print(f"    🕐 {mod_time}")
             print()
     
+    def choose_backup_folder(self):
+        """
+        Pede ao usuário que escolha uma pasta de backup criptografado
+        
+        Returns:
+            Path: Pasta escolhida ou None
+        """
+        backup_folders = self.file_manager.list_backup_folders()
+        
+        if not backup_folders:
+            print("📭 Nenhum backup encontrado.")
+            return None
+        
+        print()
+        for i, folder in enumerate(backup_folders, 1):
+            print(f"{i:2}. 📁 {folder.name}")
+        print()
+        
+        choice = input("👉 Número do backup: ").strip()
+        
+        if choice.isdigit() and 1 <= int(choice) <= len(backup_folders):
+            return backup_folders[int(choice) - 1]
+        
+        self.show_error("Número inválido!")
+        return None
+    
+    def load_backup_index(self, folder):
+        """
+        Obtém o índice de um backup sem ler o conteúdo criptografado
+        
+        Args:
+            folder (Path): Pasta do backup
+        
+        Returns:
+            BackupManifest: Manifesto ou, em backups sem manifesto, índice
+            montado a partir dos cabeçalhos
+        """
+        from modules.file_ops.manifest import BackupManifest
+        
+        if BackupManifest.exists(folder):
+            return self.load_backup_manifest(folder)
+        
+        return BackupManifest.from_headers(folder)
+    
+    def print_backup_diff(self, old_folder, new_folder, limit=20):
+        """
+        Mostra as diferenças entre dois backups a partir dos índices
+        
+        Args:
+            old_folder (Path): Backup mais antigo
+            new_folder (Path): Backup mais recente
+            limit (int): Máximo de nomes exibidos por categoria
+        
+        Returns:
+            dict: Resultado de BackupManifest.diff
+        """
+        start_time = time.perf_counter()
+        old_index = self.load_backup_index(old_folder)
+        new_index = self.load_backup_index(new_folder)
+        diff = old_index.diff(new_index)
+        elapsed = (time.perf_counter() - start_time) * 1000
+        
+        print(f"\n🔀 {Path(old_folder).name} → {Path(new_folder).name}")
+        
+        sections = [
+            ("added", "➕ Adicionados", new_index),
+            ("removed", "➖ Removidos", old_index),
+            ("modified", "✏️  Modificados", new_index),
+            ("touched", "🕒 Apenas data alterada", new_index)
+        ]
+        
+        for key, title, index in sections:
+            names = diff[key]
+            if not names:
+                continue
+            
+            print(f"\n{title} ({len(names)}):")
+            for name in names[:limit]:
+                size_str = self.file_manager._format_file_size(index.get(name)["size"])
+                print(f"    {name} ({size_str})")
+            if len(names) > limit:
+                print(f"    ... e mais {len(names) - limit} arquivos")
+        
+        print(f"\n🟰 Sem alterações: {diff['unchanged']}")
+        print(f"⏱️  Comparação em {elapsed:.1f} ms")
+        return diff
+    
+    def compare_backups(self):
+        """Compara dois backups pelos manifestos, sem descriptografar o conteúdo"""
+        if not self.current_password:
+            self.show_error("Configure uma senha primeiro!")
+            return
+        
+        print("\n📅 Backup mais antigo:")
+        old_folder = self.choose_backup_folder()
+        if old_folder is None:
+            return
+        
+        print("\n📅 Backup mais recente:")
+        new_folder = self.choose_backup_folder()
+        if new_folder is None:
+            return
+        
+        try:
+            self.print_backup_diff(old_folder, new_folder)
+        except Exception as e:
+            self.show_error(f"Erro ao comparar backups: {e}")
+    
+    def migrate_backup(self, folder=None):
+        """
+        Converte os arquivos legados (AES-256-CBC sem cabeçalho) de um backup
+        para o formato segmentado atual, no lugar
+        
+        Args:
+            folder (Path): Pasta do backup (None pergunta ao usuário)
+        
+        Returns:
+            dict: Resumo da migração ou None em caso de erro
+        """
+        from modules.crypto.aes_handler import AESHandler
+        from modules.crypto.cipher_suite import FORMAT_VERSION, select_cipher
+        from modules.crypto.migrator import FormatMigrator
+        
+        if not self.current_password:
+            self.show_error("Configure uma senha primeiro!")
+            return None
+        
+        folder = folder or self.choose_backup_folder()
+        if folder is None:
+            return None
+        
+        # Sem arquivo de chave, os arquivos legados foram criptografados com uma
+        # chave derivada de um salt aleatório que nunca foi gravado
+        if not self.key_manager.has_key_file(folder):
+            legacy = FormatMigrator.find_legacy(folder)
+            if legacy:
+                self.show_error(f"{folder.name} não tem arquivo de chave: os {len(legacy)} arquivo(s) legado(s) "
+                                "criptografados só com a senha não podem ser lidos nem migrados")
+                return None
+            print("✅ Nenhum arquivo no formato antigo.")
+            return {"total": 0, "migrated": 0, "original_bytes": 0, "failed": []}
+        
+        try:
+            handler = self.get_decryption_handler(folder)
+            manifest = self.load_backup_manifest(folder, handler)
+            
+            # Mesma chave de dados do backup, com a cifra segmentada mais rápida neste equipamento
+            target = AESHandler(key=handler.key, cipher=select_cipher())
+            migrator = FormatMigrator(target)
+            
+            print(f"\n🧬 Migrando {folder.name} para o formato v{FORMAT_VERSION} ({target.cipher})...")
+            start_time = time.time()
+            
+            def progress(path, result, error, done, total):
+                if error is not None:
+                    print(f"    ❌ {error}")
+                elif done % 100 == 0 or done == total:
+                    print(f"    [{done}/{total}] migrados")
+            
+            summary = migrator.migrate_folder(folder, manifest, on_result=progress)
+            elapsed = time.time() - start_time
+            
+            if not summary["total"]:
+                print("✅ Nenhum arquivo no formato antigo.")
+            else:
+                print("\n" + "="*50)
+                print("🧬 MIGRAÇÃO CONCLUÍDA!")
+                print(f"✅ Migrados: {summary['migrated']} de {summary['total']}")
+                print(f"❌ Falhas: {len(summary['failed'])}")
+                print(f"📊 Dados migrados: {self.file_manager._format_file_size(summary['original_bytes'])} em {elapsed:.1f}s")
+            
+            self.logger.info(f"Migração de {folder}: {summary['migrated']}/{summary['total']} arquivos")
+            for path, error in summary["failed"]:
+                self.logger.error(f"MIGRATION FAILED: {path} - {error}")
+            
+            return summary
+        
+        except Exception as e:
+            self.show_error(f"Erro durante migração: {e}")
+            return None
+    
+    def browse_backup(self):
+        """Navega pelo conteúdo de um backup a partir do manifesto"""
+        if not self.current_password:
+            self.show_error("Configure uma senha primeiro!")
+            return
+        
+        folder = self.choose_backup_folder()
+        if folder is None:
+            return
+        
+        try:
+            index = self.load_backup_index(folder)
+        except Exception as e:
+            self.show_error(f"Erro ao abrir o índice do backup: {e}")
+            return
+        
+        prefix = ""
+        
+        while True:
+            folders, files = index.browse(prefix)
+            
+            print(f"\n🗂️  {folder.name}/{prefix}")
+            for i, name in enumerate(folders, 1):
+                print(f"{i:3}. 📁 {name}/")
+            for name, entry in files[:50]:
+                print(f"     📄 {name} ({self.file_manager._format_file_size(entry['size'])})")
+            if len(files) > 50:
+                print(f"     ... e mais {len(files) - 50} arquivos")
+            
+            choice = input("\n👉 Número da pasta, '..' para voltar ou Enter para sair: ").strip()
+            
+            if not choice:
+                return
+            elif choice == '..':
+                prefix = prefix.rpartition("/")[0]
+            elif choice.isdigit() and 1 <= int(choice) <= len(folders):
+                prefix = f"{prefix}/{folders[int(choice) - 1]}".strip("/")
+            else:
+                self.show_error("Opção inválida!")
+    
+    def verify_backup(self, folder=None):
+        """
+        Verifica a integridade de um backup sem gravar arquivos
+        
+        Args:
+            folder (Path): Pasta do backup (None pergunta ao usuário)
+            
+        Returns:
+            dict: Resumo da verificação ou None em caso de erro
+        """
+        from modules.crypto.parity import ParityCodec
+        from modules.crypto.verifier import BackupVerifier
+        
+        if not self.current_password:
+            self.show_error("Configure uma senha primeiro!")
+            return None
+        
+        folder = folder or self.choose_backup_folder()
+        if folder is None:
+            return None
+        
+        try:
+            verifier = BackupVerifier(self.get_decryption_handler(folder), parity=ParityCodec())
+            
+            print(f"\n🔍 Verificando {folder.name}...")
+            start_time = time.time()
+            
+            def progress(result, done, total):
+                if not result["ok"]:
+                    print(f"    ❌ {Path(result['path']).name}: {result['error']}")
+                elif result.get("repaired"):
+                    print(f"    🧩 {Path(result['path']).name}: reparado pela paridade ({result['repaired']} bloco(s))")
+                elif done % 100 == 0 or done == total:
+                    print(f"    [{done}/{total}] verificados")
+            
+            summary = verifier.verify_folder(folder, on_result=progress)
+            elapsed = time.time() - start_time
+            
+            print("\n" + "="*50)
+            print("🔍 VERIFICAÇÃO CONCLUÍDA!")
+            print(f"✅ Íntegros: {summary['ok']}")
+            print(f"🧩 Reparados pela paridade: {summary['repaired']}")
+            print(f"❌ Corrompidos/truncados: {len(summary['failed'])}")
+            print(f"📊 Dados verificados: {self.file_manager._format_file_size(summary['original_bytes'])} em {elapsed:.1f}s")
+            
+            self.logger.info(
+                f"Verificação de {folder}: {summary['ok']}/{summary['total']} íntegros, "
+                f"{len(summary['failed'])} com erro"
+            )
+            for result in summary['failed']:
+                self.logger.error(f"VERIFY FAILED: {result['path']} - {result['error']}")
+            
+            return summary
+            
+        except Exception as e:
+            self.show_error(f"Erro durante verificação: {e}")
+            return None
+    
     def clean_backups(self):
-        """Limpa backups antigos"""
-        if self.confirm_action("Limpar backups antigos (manter apenas os 5 mais recentes)"):
-            try:
-                self.file_manager.clean_old_backups(max_backups=5)
-                self.show_success("Limpeza de backups concluída!")
-            except Exception as e:
-                self.show_error(f"Erro durante limpeza: {e}")
+        """Limpa backups antigos conforme a política de retenção"""
+        try:
+            kept, removed = self.file_manager.retention.plan(self.retention_policy)
+            
+            print(f"\n📋 Política: {self.retention_policy.describe()}")
+            print(f"    Mantidos: {len(kept)} | A remover: {len(removed)}")
+            
+            if not removed:
+                self.show_success("Nenhum backup a remover.")
+                return
+            
+            for backup in removed:
+                print(f"    🗑️  {backup['path'].name}")
+            
+            if self.confirm_action(f"Remover {len(removed)} backup(s) antigo(s)"):
+                # A remoção continua em segundo plano sem travar o menu; o
+                # resultado de cada pasta é registrado no log ao terminar
+                futures = self.file_manager.retention.apply(removed, background=True)
+                for backup, future in zip(removed, futures):
+                    future.add_done_callback(lambda f, name=backup["path"].name: self.log_removal(name, f))
+                self.show_success("Limpeza de backups iniciada em segundo plano! (resultado no log)")
+                
+        except Exception as e:
+            self.show_error(f"Erro durante limpeza: {e}")
+    
+    def log_removal(self, name, future):
+        """
+        Registra no log o resultado da remoção de um backup
+        
+        Args:
+            name (str): Nome da pasta de backup
+            future (Future): Remoção concluída (ver RetentionEngine.apply)
+        
+        Returns:
+            bool: True se a pasta foi removida
+        """
+        error = future.exception()
+        
+        if error is not None:
+            self.logger.error(f"Retenção: falha ao remover {name}: {error} (nova tentativa na próxima execução)")
+            return False
+        
+        self.logger.info(f"Retenção: backup {name} removido")
+        return True
+    
+    def configure_retention(self):
+        """Configura a política de retenção de backups"""
+        policy = self.retention_policy
+        print(f"\n📋 Política atual: {policy.describe()}")
+        print("Deixe em branco para manter o valor atual.\n")
+        
+        def ask(label, current):
+            value = input(f"{label} [{current}]: ").strip()
+            if not value:
+                return current
+            if not value.isdigit():
+                raise ValueError(f"Valor inválido: {value}")
+            return int(value)
+        
+        try:
+            current_gb = policy.max_total_size // (1024 ** 3) if policy.max_total_size else 0
+            
+            keep_last = ask("Manter os últimos N backups", policy.keep_last)
+            if keep_last < 1:
+                raise ValueError("É preciso manter ao menos o último backup")
+            daily = ask("Backups diários (dias)", policy.daily)
+            weekly = ask("Backups semanais (semanas)", policy.weekly)
+            monthly = ask("Backups mensais (meses)", policy.monthly)
+            max_gb = ask("Tamanho máximo total em GB (0 = sem limite)", current_gb)
+            
+            self.retention_policy = RetentionPolicy(
+                keep_last, daily, weekly, monthly,
+                max_total_size=max_gb * 1024 ** 3 if max_gb else None
+            )
+            self.show_success(f"Política definida: {self.retention_policy.describe()}")
+            
+        except ValueError as e:
+            self.show_error(str(e))
+    
+    def upload_backup(self):
+        """Envia uma pasta de backup para um armazenamento externo"""
+        from modules.storage.backends import create_backend
+        
+        folder = self.choose_backup_folder()
+        if folder is None:
+            return
+        
+        default_url = os.environ.get("BACKUP_STORAGE_URL", "")
+        print("\nDestino: s3://bucket (endpoint em BACKUP_S3_ENDPOINT) ou caminho local")
+        url = input(f"🌐 Destino [{default_url}]: ").strip() or default_url
+        
+        if not url:
+            self.show_error("Nenhum destino informado!")
+            return
+        
+        try:
+            backend = create_backend(url)
+            start_time = time.time()
+            
+            def progress(key, done, total):
+                print(f"    [{done}/{total}] {key}")
+            
+            total_bytes = backend.upload_folder(folder, folder.name, on_progress=progress)
+            elapsed = max(time.time() - start_time, 0.001)
+            
+            size_str = self.file_manager._format_file_size(total_bytes)
+            rate_str = self.file_manager._format_file_size(total_bytes / elapsed)
+            self.show_success(f"Backup enviado: {size_str} em {elapsed:.1f}s ({rate_str}/s)")
+            self.logger.info(f"Backup {folder} enviado para {url}: {total_bytes} bytes em {elapsed:.1f}s")
+            
+        except Exception as e:
+            self.show_error(f"Erro ao enviar backup: {e}")
+            self.logger.error(f"Erro ao enviar backup {folder} para {url}: {e}")
     
     def open_backup_folder(self):
         """Abre pasta de backups no explorador"""
@@ -571,6 +1379,101 @@ class CryptoInterface:
         except Exception as e:
             self.show_error(f"Erro ao abrir pasta: {e}")
     
+    def performance_settings(self):
+        """Menu de configurações de desempenho e uso de recursos"""
+        while True:
+            self.print_header("CONFIGURAÇÕES DE DESEMPENHO")
+            
+            print(f"🚦 Limites atuais: {self.throttle.describe()}")
+            print(f"📸 Captura consistente: {'ativada' if self.capture is not None else 'desativada'}")
+            print(f"🗂️  Ordem de processamento: {self.scheduler.describe()}")
+            print(f"🧩 Paridade dos backups: {'ativada' if self.parity is not None else 'desativada'}")
+            print(f"⏱️  Derivação de chave: {self.key_manager.kdf_params['algorithm']} "
+                  f"({'calibrada' if self.key_manager.is_calibrated() else 'padrão'})")
+            print()
+            
+            options = [
+                "🚦 Limitar leitura/escrita e arquivos por segundo",
+                "🐢 Reduzir prioridade de CPU e disco (nice/ionice)",
+                "📸 Ativar/desativar captura consistente de arquivos em uso",
+                "🗂️  Ordem de processamento dos arquivos",
+                "🧩 Ativar/desativar paridade para reparo dos backups (~10% de espaço)",
+                "⏱️  Recalibrar derivação de chave da senha"
+            ]
+            
+            self.print_menu_box("DESEMPENHO", options)
+            
+            choice = input("👉 Escolha uma opção: ").strip()
+            
+            if choice == '0':
+                break
+            elif choice == '1':
+                self.configure_throttle()
+            elif choice == '2':
+                applied = apply_low_priority()
+                if applied:
+                    self.show_success(f"Prioridade reduzida: {', '.join(applied)}")
+                    self.logger.info(f"Prioridade reduzida: {applied}")
+                else:
+                    self.show_error("Não foi possível reduzir a prioridade neste sistema")
+            elif choice == '3':
+                self.capture = None if self.capture is not None else ConsistentCapture()
+                self.show_success(f"Captura consistente {'ativada' if self.capture is not None else 'desativada'}")
+            elif choice == '4':
+                self.configure_scheduler()
+            elif choice == '5':
+                from modules.crypto.parity import ParityCodec
+                
+                self.parity = None if self.parity is not None else ParityCodec()
+                self.show_success(f"Paridade {'ativada' if self.parity is not None else 'desativada'}")
+            elif choice == '6':
+                self.calibrate_kdf()
+            else:
+                self.show_error("Opção inválida!")
+            
+            self.wait_for_enter()
+    
+    def configure_scheduler(self):
+        """Escolhe a estratégia de ordenação dos arquivos nos lotes"""
+        strategies = list(STRATEGIES)
+        
+        print()
+        for i, strategy in enumerate(strategies, 1):
+            print(f"{i}. {STRATEGIES[strategy]}")
+        
+        choice = input("\n👉 Estratégia: ").strip()
+        
+        if choice.isdigit() and 1 <= int(choice) <= len(strategies):
+            self.scheduler = WorkScheduler(strategies[int(choice) - 1])
+            self.show_success(f"Ordem de processamento: {self.scheduler.describe()}")
+        else:
+            self.show_error("Opção inválida!")
+    
+    def configure_throttle(self):
+        """Configura os limites de leitura, escrita e arquivos por segundo"""
+        print("\nInforme 0 para remover um limite; deixe em branco para manter o atual.\n")
+        
+        def ask(label, current):
+            value = input(f"{label} [{current or 0:g}]: ").strip().replace(',', '.')
+            if not value:
+                return current
+            if float(value) < 0:
+                raise ValueError
+            return float(value) or None
+        
+        try:
+            read_mbps = ask("Leitura máxima (MB/s)", self.throttle.read_mbps)
+            write_mbps = ask("Escrita máxima (MB/s)", self.throttle.write_mbps)
+            files_per_sec = ask("Arquivos por segundo", self.throttle.files_per_sec)
+            
+            # Os limites valem também para operações já em andamento
+            self.throttle.set_limits(read_mbps, write_mbps, files_per_sec)
+            self.show_success(f"Limites definidos: {self.throttle.describe()}")
+            self.logger.info(f"Limites de IO: {self.throttle.describe()}")
+            
+        except ValueError:
+            self.show_error("Valor inválido! Use um número positivo, ou 0 para remover o limite.")
+    
     def validate_prerequisites(self):
         """Valida pré-requisitos para operações"""
         if not self.current_password:
@@ -585,6 +1488,22 @@ class CryptoInterface:
         
         return True
     
+    def current_inventory(self):
+        """
+        Inventário da pasta de trabalho
+        
+        Returns:
+            FileInventory: Inventário, ou None (com o erro exibido) se a pasta
+            tiver sido removida ou estiver ilegível
+        """
+        try:
+            return self.file_manager.get_inventory(self.current_folder)
+        except OSError as e:
+            self.show_error(f"Não foi possível ler a pasta {self.current_folder}: {e}")
+            self.logger.error(f"Erro ao escanear {self.current_folder}: {e}")
+            self.wait_for_enter()
+            return None
+    
     def confirm_action(self, action):
         """Confirmação de ação"""
         while True:
@@ -612,6 +1531,8 @@ class CryptoInterface:
         """Executa o programa principal"""
         try:
             self.logger.info("Sistema iniciado")
+            for future in self.file_manager.retention.purge_pending():
+                future.add_done_callback(lambda f: self.log_removal("pendente", f))
             self.main_menu()
             
         except KeyboardInterrupt:
@@ -626,10 +1547,349 @@ class CryptoInterface:
             self.logger.info("Sistema encerrado")
             print("\n👋 Obrigado por usar o Sistema de Criptografia AES!")
 
-def main():
-    """Função principal"""
+def read_cli_password():
+    """Obtém a senha da variável BACKUP_PASSWORD ou do terminal"""
+    password = os.environ.get("BACKUP_PASSWORD")
+    if password:
+        return password
+    
+    import getpass
+    return getpass.getpass("Senha: ")
+
+def cli_list(args):
+    """Comando 'list': lista os backups existentes"""
+    CryptoInterface().list_backups()
+    return 0
+
+def cli_verify(args):
+    """Comando 'verify': verifica um arquivo criptografado ou uma pasta de backup"""
+    app = CryptoInterface()
+    app.current_password = read_cli_password()
+    path = Path(args.path)
+    
+    if path.is_dir():
+        summary = app.verify_backup(path)
+        return 0 if summary and not summary['failed'] else 1
+    
+    try:
+        result = app.get_decryption_handler(path.parent).verify_file(path)
+    except Exception as e:
+        app.show_error(f"Erro durante verificação: {e}")
+        return 1
+    
+    if result["ok"]:
+        app.show_success(f"{path.name}: íntegro ({result['original_size']} bytes)")
+        return 0
+    
+    app.show_error(f"{path.name}: {result['error']}")
+    return 1
+
+def cli_backup(args):
+    """Comando 'backup': backup de várias pastas de origem em uma única execução"""
+    app = CryptoInterface()
+    
+    missing = [root for root in args.roots if not os.path.isdir(root)]
+    if missing:
+        app.show_error(f"Pasta(s) de origem não encontrada(s): {', '.join(missing)}")
+        return 1
+    
+    app.current_password = read_cli_password()
+    
+    if args.parity:
+        from modules.crypto.parity import ParityCodec
+        app.parity = ParityCodec()
+    
+    try:
+        _, summaries = app.perform_host_backup(args.roots)
+    except Exception as e:
+        app.show_error(f"Erro durante backup: {e}")
+        return 1
+    
+    return 0 if not any(summary["failed"] for summary in summaries.values()) else 1
+
+def cli_diff(args):
+    """Comando 'diff': compara dois backups pelos manifestos"""
+    app = CryptoInterface()
+    app.current_password = read_cli_password()
+    
+    try:
+        app.print_backup_diff(Path(args.old), Path(args.new))
+    except Exception as e:
+        app.show_error(f"Erro ao comparar backups: {e}")
+        return 1
+    
+    return 0
+
+def cli_browse(args):
+    """Comando 'browse': lista o conteúdo de um backup a partir do manifesto"""
+    app = CryptoInterface()
+    app.current_password = read_cli_password()
+    
+    try:
+        folders, files = app.load_backup_index(Path(args.backup)).browse(args.prefix)
+    except Exception as e:
+        app.show_error(f"Erro ao abrir o índice do backup: {e}")
+        return 1
+    
+    for name in folders:
+        print(f"{name}/")
+    for name, entry in files:
+        print(f"{name}\t{entry['size']}")
+    
+    return 0
+
+def cli_agent(args):
+    """Comando 'agent': inicia, consulta, desbloqueia, bloqueia ou encerra o agente local"""
+    from modules.agent.client import AgentClient, AgentError
+    
+    if args.action == "start":
+        from modules.agent.server import AgentServer
+        
+        app = CryptoInterface()
+        server = AgentServer(args.socket, unlock_timeout=args.timeout, logger=app.logger)
+        print(f"🤖 Agente em {server.socket_path} (Ctrl+C para encerrar)")
+        
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        except Exception as e:
+            app.show_error(f"Erro no agente: {e}")
+            return 1
+        return 0
+    
+    try:
+        with AgentClient(args.socket) as client:
+            if args.action == "status":
+                status = client.status()
+                state = "desbloqueado" if status["unlocked"] else "bloqueado"
+                expires = f" ({status['expires_in']:.0f}s restantes)" if status["unlocked"] else ""
+                print(f"🤖 Agente pid {status['pid']}: {state}{expires}, {status['workers']} workers")
+            elif args.action == "unlock":
+                client.unlock(read_cli_password(), args.timeout)
+                print(f"🔓 Agente desbloqueado por {args.timeout:.0f}s")
+            elif args.action == "lock":
+                client.lock()
+                print("🔒 Agente bloqueado")
+            else:
+                client.shutdown()
+                print("👋 Agente encerrado")
+    
+    except AgentError as e:
+        print(f"❌ {e}")
+        return 1
+    
+    return 0
+
+def cli_migrate(args):
+    """Comando 'migrate': converte os arquivos legados de um backup para o formato atual"""
     app = CryptoInterface()
-    app.run()
+    app.current_password = read_cli_password()
+    
+    summary = app.migrate_backup(Path(args.backup))
+    return 0 if summary and not summary["failed"] else 1
+
+def run_backup_job(job, password):
+    """
+    Executa um job agendado: backup das origens no destino do job, com os
+    limites, a cifra e a paridade do job, seguido da retenção
+    
+    Args:
+        job (BackupJob): Job a executar
+        password (str): Senha dos backups
+    
+    Returns:
+        dict: "folder", "files", "bytes", "failed" e "removed"
+    """
+    from concurrent.futures import wait
+    from modules.crypto.parity import ParityCodec
+    
+    destination = Path(job.destination)
+    destination.mkdir(parents=True, exist_ok=True)
+    
+    app = CryptoInterface()
+    app.current_password = password
+    app.file_manager.current_dir = destination
+    app.throttle = IOThrottle(**job.throttle)
+    app.parity = ParityCodec() if job.parity else None
+    
+    backup_folder, summaries = app.perform_host_backup(job.sources, cipher=job.resolve_cipher())
+    
+    removed = 0
+    policy = job.retention_policy()
+    if policy is not None:
+        # Remoções que falharam em execuções anteriores são tentadas de novo
+        wait(app.file_manager.retention.purge_pending())
+        
+        _, planned = app.file_manager.retention.plan(policy)
+        futures = app.file_manager.retention.apply(planned, background=False)
+        removed = sum(app.log_removal(backup["path"].name, future)
+                      for backup, future in zip(planned, futures))
+    
+    return {
+        "folder": backup_folder,
+        "files": sum(summary["files"] for summary in summaries.values()),
+        "bytes": sum(summary["bytes"] for summary in summaries.values()),
+        "failed": sum(summary["failed"] for summary in summaries.values()),
+        "removed": removed
+    }
+
+def cli_jobs(args):
+    """Comando 'jobs': backups agendados definidos no arquivo de jobs"""
+    from datetime import datetime
+    from modules.jobs.jobs import load_jobs
+    from modules.jobs.runner import JobHistory, JobScheduler
+    
+    try:
+        config = load_jobs(args.config)
+    except Exception as e:
+        print(f"❌ {e}")
+        return 1
+    
+    history = JobHistory(config["history"])
+    
+    if args.action == "list":
+        stats = history.summary()
+        now = datetime.now()
+        for job in config["jobs"]:
+            print(f"🗓️  {job.describe()}")
+            if job.enabled:
+                print(f"    Próxima execução: {job.schedule.next_after(now):%Y-%m-%d %H:%M}")
+            last = stats.get(job.name, {}).get("last")
+            if last:
+                print(f"    Última: {last['start']} ({last['status']})")
+        return 0
+    
+    if args.action == "history":
+        for entry in history.read(args.job, args.limit):
+            size = FileManager()._format_file_size(entry.get("bytes", 0))
+            print(f"{entry['start']}  {entry['job']:<16} {entry['status']:<8} {entry['seconds']:>8.1f}s "
+                  f"{size:>10} {entry.get('mbps', 0):>8.1f} MB/s  {entry.get('error', '')}")
+        
+        print()
+        for name, item in history.summary(args.job).items():
+            print(f"📊 {name}: {item['runs']} execução(ões), {item['failed']} falha(s), {item['skipped']} ignorada(s), "
+                  f"média {item['avg_seconds']:.1f}s (máx. {item['max_seconds']:.1f}s), {item['avg_mbps']:.1f} MB/s")
+        return 0
+    
+    password = read_cli_password()
+    failures = []
+    
+    def report(job, event, entry):
+        if event != "start" and (entry is None or entry["status"] != "ok"):
+            failures.append(job.name)
+        
+        if event == "start":
+            print(f"▶️  {job.name}: iniciado")
+        elif event == "skip":
+            print(f"⏭️  {job.name}: execução anterior ainda em andamento, disparo ignorado")
+        else:
+            detail = entry.get("error") or f"{entry['files']} arquivo(s), {entry['mbps']:.1f} MB/s"
+            print(f"{'✅' if entry['status'] == 'ok' else '❌'} {job.name}: {entry['status']} em {entry['seconds']:.1f}s ({detail})")
+    
+    scheduler = JobScheduler(config["jobs"], lambda job: run_backup_job(job, password),
+                             config["max_concurrent"], history, on_event=report)
+    
+    if args.action == "run":
+        names = args.names or [job.name for job in config["jobs"] if job.enabled]
+        try:
+            for name in names:
+                scheduler.submit(name)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        scheduler.wait()
+        return 1 if failures else 0
+    
+    # start: agendador em primeiro plano até Ctrl+C
+    import threading
+    
+    stop_event = threading.Event()
+    print(f"🗓️  Agendador iniciado: {len(scheduler.jobs)} job(s), até {config['max_concurrent']} simultâneo(s)")
+    
+    try:
+        scheduler.run_forever(stop_event)
+    except KeyboardInterrupt:
+        print("\n⏹️  Encerrando: aguardando os jobs em execução...")
+        stop_event.set()
+        scheduler.wait()
+    
+    return 0
+
+def parse_args(argv):
+    """Interpreta os argumentos da linha de comando"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Sistema de Criptografia de Arquivos com AES")
+    parser.add_argument("--profile", metavar="ARQUIVO",
+                        help="Grava o perfil de execução (.json: Chrome trace; outro: pilhas para flamegraph)")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    subparsers.add_parser("list", help="Lista os backups existentes")
+    
+    verify_parser = subparsers.add_parser("verify", help="Verifica a integridade de um arquivo ou backup")
+    verify_parser.add_argument("path", help="Arquivo .encrypted ou pasta de backup")
+    
+    backup_parser = subparsers.add_parser("backup", help="Backup de várias pastas de origem")
+    backup_parser.add_argument("roots", nargs="+", help="Pastas de origem")
+    backup_parser.add_argument("--parity", action="store_true", help="Gera paridade para reparo (~10%% de espaço)")
+    
+    diff_parser = subparsers.add_parser("diff", help="Compara dois backups sem descriptografar o conteúdo")
+    diff_parser.add_argument("old", help="Pasta do backup mais antigo")
+    diff_parser.add_argument("new", help="Pasta do backup mais recente")
+    
+    browse_parser = subparsers.add_parser("browse", help="Lista o conteúdo de um backup")
+    browse_parser.add_argument("backup", help="Pasta do backup")
+    browse_parser.add_argument("prefix", nargs="?", default="", help="Subpasta a listar")
+    
+    migrate_parser = subparsers.add_parser("migrate", help="Converte arquivos antigos para o formato atual")
+    migrate_parser.add_argument("backup", help="Pasta do backup")
+    
+    agent_parser = subparsers.add_parser("agent", help="Agente local com a senha e os workers carregados")
+    agent_parser.add_argument("action", choices=["start", "status", "unlock", "lock", "stop"],
+                              help="start executa o agente em primeiro plano")
+    agent_parser.add_argument("--socket", help="Caminho do socket (padrão: BACKUP_AGENT_SOCKET ou pasta do usuário)")
+    agent_parser.add_argument("--timeout", type=float, default=900, help="Prazo do desbloqueio em segundos")
+    
+    jobs_parser = subparsers.add_parser("jobs", help="Backups agendados (arquivo de jobs)")
+    jobs_parser.add_argument("action", choices=["list", "run", "start", "history"],
+                             help="start executa o agendador em primeiro plano; run executa agora")
+    jobs_parser.add_argument("names", nargs="*", help="Jobs a executar com run (padrão: todos os ativos)")
+    jobs_parser.add_argument("--config", help="Arquivo de jobs (padrão: BACKUP_JOBS_CONFIG ou backup_jobs.json)")
+    jobs_parser.add_argument("--job", help="Filtra o histórico por job")
+    jobs_parser.add_argument("--limit", type=int, default=20, help="Execuções mostradas no histórico")
+    
+    return parser.parse_args(argv)
+
+CLI_COMMANDS = {
+    "list": cli_list,
+    "verify": cli_verify,
+    "backup": cli_backup,
+    "diff": cli_diff,
+    "browse": cli_browse,
+    "migrate": cli_migrate,
+    "agent": cli_agent,
+    "jobs": cli_jobs
+}
+
+def main(argv=None):
+    """Função principal"""
+    argv = sys.argv[1:] if argv is None else argv
+    args = parse_args(argv) if argv else None
+    
+    # O perfilador só é carregado quando pedido (--profile ou BACKUP_PROFILE)
+    profile_path = (args.profile if args else None) or os.environ.get("BACKUP_PROFILE")
+    if profile_path:
+        from modules.utils import profiler
+        profiler.enable(profile_path)
+    
+    # Sem comando: interface interativa
+    if args is None or args.command is None:
+        app = CryptoInterface()
+        app.run()
+        return 0
+    
+    return CLI_COMMANDS[args.command](args)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""
+Módulo cliente do agente
+Conecta ao agente local pelo socket Unix e envia tarefas (uma linha JSON por
+pedido e por resposta), reaproveitando a mesma conexão entre pedidos
+"""
+
+import json
+import os
+import socket
+
+SOCKET_NAME = "agent.sock"
+
+def default_socket_path():
+    """
+    Retorna o caminho padrão do socket do agente
+    
+    Usa a variável BACKUP_AGENT_SOCKET, se definida; senão, a pasta de
+    execução do usuário (XDG_RUNTIME_DIR) ou ~/.cache/backup_arquivos.
+    
+    Returns:
+        str: Caminho do socket
+    """
+    path = os.environ.get("BACKUP_AGENT_SOCKET")
+    if path:
+        return path
+    
+    base = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "backup_arquivos", SOCKET_NAME)
+
+class AgentError(Exception):
+    """Erro devolvido pelo agente ao executar um pedido"""
+
+class AgentClient:
+    """Cliente do agente de backup"""
+    
+    def __init__(self, socket_path=None, timeout=None):
+        """
+        Inicializa o cliente (a conexão é aberta no primeiro pedido)
+        
+        Args:
+            socket_path (str): Socket do agente (padrão: default_socket_path())
+            timeout (float): Tempo máximo (s) de espera por resposta (None: sem limite)
+        """
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+    
+    def connect(self):
+        """Abre a conexão com o agente, se ainda não estiver aberta"""
+        if self._sock is not None:
+            return
+        
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+        except (AttributeError, OSError) as e:
+            raise AgentError(f"Agente indisponível em {self.socket_path}: {e}")
+        
+        self._sock = sock
+        self._file = sock.makefile('rwb')
+    
+    def close(self):
+        """Fecha a conexão"""
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+            self._sock = self._file = None
+    
+    def __enter__(self):
+        self.connect()
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+        return False
+    
+    def request(self, op, **params):
+        """
+        Envia um pedido ao agente e aguarda a resposta
+        
+        Args:
+            op (str): Operação (ver AgentServer.OPERATIONS)
+            **params: Parâmetros da operação
+        
+        Returns:
+            Resultado da operação
+        """
+        self.connect()
+        
+        try:
+            self._file.write(json.dumps(dict(params, op=op)).encode('utf-8') + b"\n")
+            self._file.flush()
+            line = self._file.readline()
+        except OSError as e:
+            self.close()
+            raise AgentError(f"Erro de comunicação com o agente: {e}")
+        
+        if not line:
+            self.close()
+            raise AgentError("Conexão encerrada pelo agente")
+        
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise AgentError(response.get("error", "Erro desconhecido"))
+        
+        return response.get("result")
+    
+    def status(self):
+        """Estado do agente: desbloqueio, tempo restante, pid e workers"""
+        return self.request("status")
+    
+    def unlock(self, password, timeout=None):
+        """Guarda a senha no agente por timeout segundos (padrão do agente se None)"""
+        return self.request("unlock", password=password, timeout=timeout)
+    
+    def lock(self):
+        """Descarta a senha e as chaves mantidas pelo agente"""
+        return self.request("lock")
+    
+    def list(self, folder=None, prefix=""):
+        """Lista os backups ou, com folder, o conteúdo de um backup"""
+        return self.request("list", folder=folder and os.path.abspath(folder), prefix=prefix)
+    
+    def encrypt(self, paths, folder=None):
+        """Criptografa arquivos (ou pastas) em um backup novo ou existente"""
+        return self.request("encrypt", paths=[os.path.abspath(path) for path in paths],
+                            folder=folder and os.path.abspath(folder))
+    
+    def decrypt(self, folder, files=None, output=None):
+        """Restaura os arquivos de um backup (todos, se files for None)"""
+        return self.request("decrypt", folder=os.path.abspath(folder),
+                            files=files and [os.path.abspath(path) for path in files],
+                            output=output and os.path.abspath(output))
+    
+    def verify(self, path):
+        """Verifica um arquivo criptografado ou uma pasta de backup"""
+        return self.request("verify", path=os.path.abspath(path))
+    
+    def shutdown(self):
+        """Encerra o agente"""
+        return self.request("shutdown")
\ No newline at end of file
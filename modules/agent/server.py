@@ -0,0 +1,373 @@
+"""
+Módulo do agente local
+Processo de longa duração que mantém a senha desbloqueada (com prazo), as
+chaves dos backups, o cache de escaneamento e o pool de workers prontos, e
+atende pedidos de criptografia, descriptografia, verificação e listagem por
+um socket Unix
+"""
+
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ..auth.key_manager import KeyManager
+from ..auth.password_manager import PasswordManager
+from ..crypto.batch_engine import BatchEngine
+from ..crypto.parity import ParityCodec, refresh_parity, with_repair
+from ..file_ops.file_manager import FileManager
+from ..file_ops.manifest import BackupManifest
+from ..file_ops.snapshot import ConsistentCapture, CONSISTENT
+from .client import default_socket_path
+
+class AgentServer:
+    """Agente de backup atendendo pedidos por socket Unix"""
+    
+    OPERATIONS = ("status", "unlock", "lock", "list", "encrypt", "decrypt", "verify", "shutdown")
+    
+    def __init__(self, socket_path=None, unlock_timeout=900, max_workers=None, logger=None):
+        """
+        Inicializa o agente
+        
+        Args:
+            socket_path (str): Socket de escuta (padrão: default_socket_path())
+            unlock_timeout (float): Prazo padrão (s) do desbloqueio
+            max_workers (int): Workers do pool compartilhado (padrão do BatchEngine)
+            logger (logging.Logger): Logger do agente (opcional)
+        """
+        self.socket_path = socket_path or default_socket_path()
+        self.unlock_timeout = unlock_timeout
+        self.logger = logger
+        self.file_manager = FileManager()
+        self.capture = ConsistentCapture()
+        self.engine = BatchEngine(max_workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.engine.max_workers)
+        self.engine.executor = self.executor
+        self._server = None
+        self._lock = threading.Lock()
+        self._folder_locks = {}
+        self._reset_keys()
+    
+    def _reset_keys(self):
+        """Descarta a senha, as chaves mestras derivadas e os handlers dos backups"""
+        self._password = None
+        self._expires_at = None
+        self.key_manager = KeyManager(PasswordManager())
+        self._handlers = {}
+    
+    def _log(self, message):
+        if self.logger is not None:
+            self.logger.info(message)
+    
+    def _expire(self):
+        """Bloqueia o agente quando o prazo do desbloqueio termina"""
+        with self._lock:
+            if self._expires_at is not None and time.monotonic() >= self._expires_at:
+                self._reset_keys()
+                self._log("Agente bloqueado: prazo do desbloqueio encerrado")
+    
+    def _require_password(self):
+        self._expire()
+        with self._lock:
+            if self._password is None:
+                raise Exception("Agente bloqueado: envie 'unlock' com a senha")
+            return self._password
+    
+    def _handler(self, folder, create=False):
+        """
+        Handler AES de uma pasta de backup, mantido em memória enquanto desbloqueado
+        
+        Args:
+            folder (Path): Pasta do backup
+            create (bool): Se True, cria o arquivo de chave quando não existir
+        """
+        from ..crypto.aes_handler import AESHandler
+        from ..crypto.cipher_suite import select_cipher
+        
+        password = self._require_password()
+        key = os.path.abspath(folder)
+        
+        with self._lock:
+            handler = self._handlers.get(key)
+        if handler is not None:
+            return handler
+        
+        if self.key_manager.has_key_file(folder):
+            data_key = with_repair(self.key_manager.key_file_path(folder),
+                                   lambda: self.key_manager.load_data_key(folder, password))
+            handler = AESHandler(key=data_key, cipher=select_cipher())
+        elif create:
+            handler = AESHandler(key=self.key_manager.create_key_file(folder, password), cipher=select_cipher())
+        else:
+            handler = AESHandler(password)
+        
+        with self._lock:
+            self._handlers[key] = handler
+        return handler
+    
+    def _folder_lock(self, folder):
+        """Lock por pasta de backup: pedidos na mesma pasta não disputam o manifesto"""
+        with self._lock:
+            return self._folder_locks.setdefault(os.path.abspath(folder), threading.Lock())
+    
+    def _load_manifest(self, folder, handler):
+        if not BackupManifest.exists(folder):
+            return BackupManifest()
+        return with_repair(BackupManifest.manifest_path(folder), lambda: BackupManifest.load(folder, handler))
+    
+    def op_status(self):
+        self._expire()
+        with self._lock:
+            remaining = None if self._expires_at is None else max(0.0, self._expires_at - time.monotonic())
+            return {"unlocked": self._password is not None, "expires_in": remaining, "pid": os.getpid(),
+                    "workers": self.engine.max_workers, "socket": self.socket_path}
+    
+    def op_unlock(self, password, timeout=None):
+        if not password:
+            raise Exception("Senha não informada")
+        
+        timeout = self.unlock_timeout if timeout is None else float(timeout)
+        
+        with self._lock:
+            if password != self._password:
+                self._reset_keys()
+            self._password = password
+            self._expires_at = time.monotonic() + timeout
+        
+        self._log(f"Agente desbloqueado por {timeout:.0f}s")
+        return {"expires_in": timeout}
+    
+    def op_lock(self):
+        with self._lock:
+            self._reset_keys()
+        self._log("Agente bloqueado")
+        return {"unlocked": False}
+    
+    def op_list(self, folder=None, prefix=""):
+        if folder is None:
+            return [{"folder": str(item), "name": item.name, "mtime": item.stat().st_mtime}
+                    for item in self.file_manager.list_backup_folders()]
+        
+        folders, files = self._load_manifest(folder, self._handler(folder)).browse(prefix)
+        return {"folders": folders,
+                "files": [{"name": name, "stored_name": entry["stored_name"], "size": entry["size"]}
+                          for name, entry in files]}
+    
+    def op_encrypt(self, paths, folder=None):
+        """Criptografa arquivos (pastas são expandidas pelo cache de escaneamento)"""
+        self._require_password()
+        
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                files.extend(self.file_manager.get_inventory(path).paths())
+            else:
+                files.append(path)
+        
+        with self._lock:
+            if folder is None:
+                # Cada pedido sem pasta informada recebe uma pasta (e chave) nova
+                folder = self.file_manager.create_backup_folder()
+        folder = Path(folder)
+        folder.mkdir(parents=True, exist_ok=True)
+        
+        with self._folder_lock(folder):
+            handler = self._handler(folder, create=True)
+            manifest = self._load_manifest(folder, handler)
+            
+            def encrypt(file_path):
+                stored_name = BackupManifest.new_stored_name()
+                
+                def read(source, tolerant=False):
+                    return handler.encrypt_file(source, folder / stored_name, sparse=True, tolerant=tolerant)
+                
+                info, status = self.capture.capture(file_path, read)
+                return stored_name, info, status, os.stat(file_path).st_mtime
+            
+            encrypted, errors = [], []
+            for file_path, result, error in self.engine.run(files, encrypt):
+                if error is not None:
+                    errors.append({"path": file_path, "error": str(error)})
+                    continue
+                
+                stored_name, info, status, mtime = result
+                extra = {"extents": info["extents"]} if "extents" in info else {}
+                if status != CONSISTENT:
+                    extra["consistency"] = status
+                
+                manifest.add_entry(Path(file_path).name, stored_name, info["original_size"], mtime,
+                                   info["hash"], info["hash_algorithm"], **extra)
+                encrypted.append({"path": file_path, "stored_name": stored_name, "size": info["original_size"]})
+            
+            manifest.save(folder, handler)
+            
+            # Backups protegidos por paridade recebem a paridade dos arquivos novos
+            if refresh_parity(manifest.manifest_path(folder)):
+                ParityCodec().protect_files([str(folder / item["stored_name"]) for item in encrypted], self.engine)
+        
+        self.file_manager.scan_cache.invalidate()
+        self._log(f"Agente: {len(encrypted)} arquivo(s) criptografado(s) em {folder}, {len(errors)} erro(s)")
+        return {"folder": str(folder), "files": encrypted, "errors": errors}
+    
+    def op_decrypt(self, folder, files=None, output=None):
+        """Restaura os arquivos do backup usando os nomes e trechos do manifesto"""
+        from ..crypto.bundle_handler import BundleHandler
+        from ..crypto.verifier import BackupVerifier
+        
+        folder = Path(folder)
+        handler = self._handler(folder)
+        bundle_handler = BundleHandler(handler)
+        manifest = self._load_manifest(folder, handler)
+        
+        files = files or BackupVerifier(handler).find_encrypted_files(folder)
+        output = Path(output) if output else self.file_manager.create_decrypted_folder()
+        output.mkdir(parents=True, exist_ok=True)
+        errors = []  # Preenchida também pelos arquivos internos dos pacotes
+        
+        def decrypt(file_path):
+            if bundle_handler.is_bundle(file_path):
+                paths, failed = bundle_handler.extract_bundle(file_path, output)
+                errors.extend({"path": f"{file_path}:{name}", "error": str(error)} for name, error in failed)
+                return [str(path) for path in paths]
+            
+            stored_name = Path(file_path).name
+            destination = BackupManifest.restore_path(output, manifest.original_name(stored_name))
+            entry = manifest.find_stored(stored_name) or {}
+            extents = entry.get("extents")
+            with_repair(file_path, lambda: handler.decrypt_file(
+                file_path, destination, extents=extents, size=entry.get("size") if extents is not None else None))
+            return [str(destination)]
+        
+        restored = []
+        for file_path, result, error in self.engine.run(files, decrypt):
+            if error is not None:
+                errors.append({"path": file_path, "error": str(error)})
+            else:
+                restored.extend(result)
+        
+        self._log(f"Agente: {len(restored)} arquivo(s) restaurado(s) de {folder}, {len(errors)} erro(s)")
+        return {"output": str(output), "files": restored, "errors": errors}
+    
+    def op_verify(self, path):
+        from ..crypto.verifier import BackupVerifier
+        
+        if os.path.isdir(path):
+            return BackupVerifier(self._handler(path), self.engine, ParityCodec()).verify_folder(path)
+        
+        return self._handler(os.path.dirname(path)).verify_file(path)
+    
+    def op_shutdown(self):
+        threading.Thread(target=self.shutdown, daemon=True).start()
+        return {"stopping": True}
+    
+    def dispatch(self, request):
+        """
+        Executa um pedido já decodificado
+        
+        Args:
+            request (dict): Pedido com "op" e os parâmetros da operação (outros
+                valores JSON são recusados com erro)
+        
+        Returns:
+            dict: Resposta com "ok" e "result" ou "error"
+        """
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "Pedido inválido: esperado um objeto JSON"}
+        
+        op = request.pop("op", None)
+        if op not in self.OPERATIONS:
+            return {"ok": False, "error": f"Operação desconhecida: {op}"}
+        
+        try:
+            return {"ok": True, "result": getattr(self, f"op_{op}")(**request)}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+    
+    def serve_forever(self):
+        """Abre o socket (acessível apenas pelo usuário) e atende pedidos até shutdown"""
+        if not hasattr(socket, "AF_UNIX"):
+            raise Exception("O agente requer suporte a sockets Unix")
+        
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        
+        if os.path.exists(self.socket_path):
+            if _socket_alive(self.socket_path):
+                raise Exception(f"Agente já em execução em {self.socket_path}")
+            os.remove(self.socket_path)
+        
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _UnixServer(self.socket_path, _make_handler(self))
+        finally:
+            os.umask(old_umask)
+        
+        self._server.agent = self
+        self._log(f"Agente iniciado em {self.socket_path} (pid {os.getpid()})")
+        
+        try:
+            self._server.serve_forever(poll_interval=1.0)
+        finally:
+            self._server.server_close()
+            self.executor.shutdown(wait=True)
+            with self._lock:
+                self._reset_keys()
+            try:
+                os.remove(self.socket_path)
+            except OSError:
+                pass
+            self._log("Agente encerrado")
+    
+    def shutdown(self):
+        """Encerra o laço de atendimento"""
+        if self._server is not None:
+            self._server.shutdown()
+
+def _socket_alive(path):
+    """Verifica se há um agente respondendo no socket"""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+def _peer_uid(sock):
+    """UID do processo conectado (Linux); None se o sistema não informar"""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    return struct.unpack('3i', credentials)[1]
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    
+    def service_actions(self):
+        # Chamado a cada volta do laço: aplica o prazo do desbloqueio mesmo sem pedidos
+        self.agent._expire()
+
+def _make_handler(agent):
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            uid = _peer_uid(self.connection)
+            if uid is not None and uid != os.getuid():
+                return
+            
+            for line in self.rfile:
+                try:
+                    response = agent.dispatch(json.loads(line))
+                except ValueError as e:
+                    response = {"ok": False, "error": f"Pedido inválido: {e}"}
+                
+                self.wfile.write(json.dumps(response).encode('utf-8') + b"\n")
+                self.wfile.flush()
+    
+    return Handler
\ No newline at end of file
@@ -0,0 +1,294 @@
+"""
+Módulo de derivação de chaves (KDF)
+PBKDF2, scrypt e Argon2id com parâmetros calibrados para o equipamento
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+PBKDF2 = "pbkdf2-sha256"
+SCRYPT = "scrypt"
+ARGON2ID = "argon2id"
+
+KEY_LENGTH = 32  # 32 bytes = 256 bits para AES-256
+
+DEFAULT_PARAMS = {
+    PBKDF2: {"iterations": 100000},
+    SCRYPT: {"n": 2 ** 14, "r": 8, "p": 1},
+    ARGON2ID: {"iterations": 3, "memory_cost": 64 * 1024, "lanes": 4}
+}
+
+PARAMS_ENV = "BACKUP_KDF_CONFIG"
+PARAMS_VERSION = 1
+
+_saved_params = None
+
+# Identificadores e ordem dos parâmetros no cabeçalho dos arquivos criptografados
+KDF_IDS = {PBKDF2: 1, SCRYPT: 2, ARGON2ID: 3}
+KDF_NAMES = {kdf_id: name for name, kdf_id in KDF_IDS.items()}
+PARAM_FIELDS = {
+    PBKDF2: ("iterations",),
+    SCRYPT: ("n", "r", "p"),
+    ARGON2ID: ("iterations", "memory_cost", "lanes")
+}
+
+def encode_params(params):
+    """
+    Converte os parâmetros em identificador e três inteiros (para o cabeçalho)
+    
+    Args:
+        params (dict): Parâmetros com a chave "algorithm"
+    
+    Returns:
+        tuple: (identificador do algoritmo, lista com três inteiros)
+    """
+    algorithm = params.get("algorithm", PBKDF2)
+    if algorithm not in KDF_IDS:
+        raise ValueError(f"Algoritmo de derivação desconhecido: {algorithm}")
+    
+    values = [int(params[field]) for field in PARAM_FIELDS[algorithm]]
+    return KDF_IDS[algorithm], values + [0] * (3 - len(values))
+
+def decode_params(kdf_id, values):
+    """
+    Reconstrói os parâmetros a partir do identificador e dos inteiros do cabeçalho
+    
+    Args:
+        kdf_id (int): Identificador do algoritmo
+        values (tuple): Três inteiros na ordem de PARAM_FIELDS
+    
+    Returns:
+        dict: Parâmetros, incluindo a chave "algorithm"
+    """
+    if kdf_id not in KDF_NAMES:
+        raise ValueError(f"Algoritmo de derivação desconhecido no cabeçalho: {kdf_id}")
+    
+    algorithm = KDF_NAMES[kdf_id]
+    return dict(zip(PARAM_FIELDS[algorithm], values), algorithm=algorithm)
+
+def _argon2_backend():
+    """
+    Localiza uma implementação de Argon2id
+    
+    Returns:
+        str: "cryptography", "argon2-cffi" ou None se indisponível
+    """
+    try:
+        from cryptography.hazmat.primitives.kdf.argon2 import Argon2id  # noqa: F401
+        return "cryptography"
+    except ImportError:
+        pass
+    
+    try:
+        from argon2.low_level import hash_secret_raw  # noqa: F401
+        return "argon2-cffi"
+    except ImportError:
+        return None
+
+def available_algorithms():
+    """
+    Lista os algoritmos de derivação disponíveis neste equipamento
+    
+    Returns:
+        list: Nomes dos algoritmos, do mais forte para o mais simples
+    """
+    algorithms = [SCRYPT, PBKDF2]
+    
+    if _argon2_backend():
+        algorithms.insert(0, ARGON2ID)
+    
+    return algorithms
+
+def default_params(algorithm=PBKDF2):
+    """
+    Retorna os parâmetros padrão de um algoritmo
+    
+    Args:
+        algorithm (str): Nome do algoritmo
+    
+    Returns:
+        dict: Parâmetros, incluindo a chave "algorithm"
+    """
+    if algorithm not in DEFAULT_PARAMS:
+        raise ValueError(f"Algoritmo de derivação desconhecido: {algorithm}")
+    
+    return dict(DEFAULT_PARAMS[algorithm], algorithm=algorithm)
+
+def derive(password, salt, params):
+    """
+    Deriva uma chave de 32 bytes com o algoritmo e parâmetros informados
+    
+    Args:
+        password (str): Senha original
+        salt (bytes): Salt da derivação
+        params (dict): Parâmetros com a chave "algorithm"
+    
+    Returns:
+        bytes: Chave derivada
+    """
+    algorithm = params.get("algorithm", PBKDF2)
+    secret = password.encode('utf-8')
+    
+    if algorithm == PBKDF2:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+        
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=KEY_LENGTH,
+            salt=salt,
+            iterations=params["iterations"],
+        )
+        return kdf.derive(secret)
+    
+    if algorithm == SCRYPT:
+        from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+        
+        kdf = Scrypt(salt=salt, length=KEY_LENGTH, n=params["n"], r=params["r"], p=params["p"])
+        return kdf.derive(secret)
+    
+    if algorithm == ARGON2ID:
+        backend = _argon2_backend()
+        
+        if backend == "cryptography":
+            from cryptography.hazmat.primitives.kdf.argon2 import Argon2id
+            
+            kdf = Argon2id(
+                salt=salt,
+                length=KEY_LENGTH,
+                iterations=params["iterations"],
+                lanes=params["lanes"],
+                memory_cost=params["memory_cost"],
+            )
+            return kdf.derive(secret)
+        
+        if backend == "argon2-cffi":
+            from argon2.low_level import hash_secret_raw, Type
+            
+            return hash_secret_raw(
+                secret, salt,
+                time_cost=params["iterations"],
+                memory_cost=params["memory_cost"],
+                parallelism=params["lanes"],
+                hash_len=KEY_LENGTH,
+                type=Type.ID,
+            )
+        
+        raise ValueError("Argon2id não está disponível neste sistema")
+    
+    raise ValueError(f"Algoritmo de derivação desconhecido: {algorithm}")
+
+def _measure_ms(params, password="calibracao", salt=b"\x00" * 16):
+    """Mede o tempo (ms) de uma derivação com os parâmetros informados"""
+    start = time.perf_counter()
+    derive(password, salt, params)
+    return (time.perf_counter() - start) * 1000
+
+def calibrate(algorithm=None, target_ms=250, max_memory=256 * 1024 * 1024):
+    """
+    Mede o equipamento e escolhe parâmetros para a latência desejada
+    
+    Args:
+        algorithm (str): Algoritmo (None escolhe o mais forte disponível)
+        target_ms (int): Tempo alvo de uma derivação em milissegundos
+        max_memory (int): Memória máxima (bytes) para scrypt/Argon2id
+    
+    Returns:
+        dict: Parâmetros calibrados, incluindo a chave "algorithm"
+    """
+    algorithm = algorithm or available_algorithms()[0]
+    params = default_params(algorithm)
+    
+    if algorithm == PBKDF2:
+        # Custo linear nas iterações: mede uma amostra e extrapola
+        sample = 20000
+        elapsed = _measure_ms(dict(params, iterations=sample))
+        params["iterations"] = max(10000, int(sample * target_ms / max(elapsed, 0.001)))
+    
+    elif algorithm == SCRYPT:
+        # Dobra N enquanto couber no tempo e na memória (128 * r * N bytes)
+        params["n"] = 2 ** 12
+        
+        while 128 * params["r"] * params["n"] * 2 <= max_memory:
+            elapsed = _measure_ms(params)
+            if elapsed * 2 > target_ms:
+                break
+            params["n"] *= 2
+    
+    elif algorithm == ARGON2ID:
+        params["memory_cost"] = min(params["memory_cost"], max_memory // 1024)
+        elapsed = _measure_ms(dict(params, iterations=1))
+        params["iterations"] = max(1, int(target_ms / max(elapsed, 0.001)))
+    
+    return params
+
+def params_path():
+    """
+    Caminho do arquivo com os parâmetros calibrados: variável
+    BACKUP_KDF_CONFIG ou backup_arquivos/kdf_params.json na pasta de
+    configuração do usuário
+    
+    Returns:
+        Path: Caminho do arquivo
+    """
+    base = os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config"
+    return Path(os.environ.get(PARAMS_ENV) or Path(base) / "backup_arquivos" / "kdf_params.json")
+
+def _valid_params(params):
+    """Indica se os parâmetros lidos do arquivo podem ser usados neste equipamento"""
+    if not isinstance(params, dict) or params.get("algorithm") not in PARAM_FIELDS:
+        return False
+    
+    algorithm = params["algorithm"]
+    if algorithm == ARGON2ID and not _argon2_backend():
+        return False
+    
+    values = [params.get(field) for field in PARAM_FIELDS[algorithm]]
+    return all(isinstance(v, int) and not isinstance(v, bool) and v > 0 for v in values)
+
+def saved_params():
+    """
+    Parâmetros calibrados salvos por save_params
+    
+    O arquivo é lido uma única vez por execução, e assim todas as entradas do
+    programa (menu, CLI, jobs e agente) usam a mesma calibração.
+    
+    Returns:
+        dict: Parâmetros salvos ou None se não houver calibração válida
+    """
+    global _saved_params
+    
+    if _saved_params is None:
+        try:
+            with open(params_path(), 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get("version") == PARAMS_VERSION and _valid_params(saved.get("params")):
+                _saved_params = saved["params"]
+        except (OSError, ValueError, AttributeError):
+            pass
+    
+    return dict(_saved_params) if _saved_params is not None else None
+
+def save_params(params, target_ms=None):
+    """
+    Salva os parâmetros calibrados para as próximas execuções
+    
+    Args:
+        params (dict): Parâmetros com a chave "algorithm"
+        target_ms (int): Tempo alvo usado na calibração (informativo)
+    """
+    global _saved_params
+    
+    path = params_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": PARAMS_VERSION, "params": params, "target_ms": target_ms}, f, indent=2)
+        os.replace(temp_path, path)
+    except OSError as e:
+        raise Exception(f"Erro ao salvar parâmetros de derivação em {path}: {e}")
+    
+    _saved_params = dict(params)
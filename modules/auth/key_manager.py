@@ -0,0 +1,190 @@
+"""
+Módulo de hierarquia de chaves
+Chaves de dados aleatórias por backup, protegidas pela chave mestra derivada da senha
+"""
+
+import json
+import os
+from pathlib import Path
+
+from . import kdf
+from .password_manager import PasswordManager
+
+class KeyManager:
+    """Classe para criação, abertura e rotação dos arquivos de chave dos backups"""
+    
+    KEY_FILE_NAME = "backup.key"
+    KEY_FILE_VERSION = 1
+    
+    def __init__(self, password_manager=None, kdf_params=None):
+        """
+        Inicializa o gerenciador de chaves
+        
+        Args:
+            password_manager (PasswordManager): Usado para derivar a chave mestra
+            kdf_params (dict): Parâmetros de derivação para novos arquivos de chave
+                (padrão: a calibração salva ou, sem ela, PBKDF2 padrão)
+        """
+        self.password_manager = password_manager or PasswordManager()
+        self.kdf_params = kdf_params or kdf.saved_params() or kdf.default_params(kdf.PBKDF2)
+        self._master_keys = {}
+    
+    def calibrate_kdf(self, algorithm=None, target_ms=250):
+        """
+        Calibra a derivação para o equipamento atual
+        
+        Os parâmetros escolhidos passam a ser usados nos próximos arquivos de
+        chave, ficam registrados em cada um deles e são salvos (ver
+        kdf.save_params) para as próximas execuções.
+        
+        Args:
+            algorithm (str): Algoritmo (None escolhe o mais forte disponível)
+            target_ms (int): Tempo alvo de desbloqueio em milissegundos
+        
+        Returns:
+            dict: Parâmetros calibrados
+        """
+        self.kdf_params = kdf.calibrate(algorithm, target_ms)
+        kdf.save_params(self.kdf_params, target_ms)
+        return self.kdf_params
+    
+    def is_calibrated(self):
+        """
+        Indica se há uma calibração salva para este equipamento
+        
+        Returns:
+            bool: True se kdf.saved_params encontrou parâmetros válidos
+        """
+        return kdf.saved_params() is not None
+    
+    def key_file_path(self, folder):
+        """
+        Retorna o caminho do arquivo de chave de uma pasta de backup
+        
+        Args:
+            folder (Path): Pasta do backup
+        
+        Returns:
+            Path: Caminho do arquivo de chave
+        """
+        return Path(folder) / self.KEY_FILE_NAME
+    
+    def has_key_file(self, folder):
+        """
+        Verifica se a pasta possui arquivo de chave
+        
+        Args:
+            folder (Path): Pasta do backup
+        
+        Returns:
+            bool: True se o arquivo de chave existir
+        """
+        return self.key_file_path(folder).is_file()
+    
+    def _master_key(self, password, salt, params):
+        """Deriva (ou reutiliza) a chave mestra para uma senha, salt e parâmetros"""
+        cache_key = (password, salt, tuple(sorted(params.items())))
+        
+        if cache_key not in self._master_keys:
+            self._master_keys[cache_key], _ = self.password_manager.derive_key(password, salt, params)
+        
+        return self._master_keys[cache_key]
+    
+    def _write_key_file(self, folder, password, data_key, exclusive=False):
+        """
+        Encapsula a chave de dados com a senha e grava o arquivo de chave
+        
+        Com exclusive, falha se o arquivo já existir em vez de substituí-lo.
+        """
+        from cryptography.hazmat.primitives.keywrap import aes_key_wrap
+        
+        salt = os.urandom(16)
+        master_key = self._master_key(password, salt, self.kdf_params)
+        
+        key_data = {
+            "version": self.KEY_FILE_VERSION,
+            "kdf": dict(self.kdf_params, salt=salt.hex()),
+            "wrapped_key": aes_key_wrap(master_key, data_key).hex()
+        }
+        
+        key_path = self.key_file_path(folder)
+        
+        if exclusive:
+            with open(key_path, 'x', encoding='utf-8') as f:
+                json.dump(key_data, f, indent=2)
+            return
+        
+        # Grava em arquivo temporário e substitui atomicamente
+        temp_path = key_path.with_name(key_path.name + ".tmp")
+        
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(key_data, f, indent=2)
+        
+        os.replace(temp_path, key_path)
+    
+    def create_key_file(self, folder, password):
+        """
+        Gera uma chave de dados aleatória para um novo backup
+        
+        Nunca substitui um arquivo de chave existente: os arquivos já
+        criptografados na pasta ficariam ilegíveis.
+        
+        Args:
+            folder (Path): Pasta do backup
+            password (str): Senha do usuário
+        
+        Returns:
+            bytes: Chave de dados (32 bytes) a ser usada na criptografia
+        """
+        try:
+            data_key = os.urandom(32)
+            self._write_key_file(folder, password, data_key, exclusive=True)
+            return data_key
+        
+        except FileExistsError:
+            raise Exception(f"Erro ao criar arquivo de chave: {folder} já possui {self.KEY_FILE_NAME}")
+        except Exception as e:
+            raise Exception(f"Erro ao criar arquivo de chave: {e}")
+    
+    def load_data_key(self, folder, password):
+        """
+        Abre o arquivo de chave de um backup e recupera a chave de dados
+        
+        Args:
+            folder (Path): Pasta do backup
+            password (str): Senha do usuário
+        
+        Returns:
+            bytes: Chave de dados do backup
+        """
+        from cryptography.hazmat.primitives.keywrap import aes_key_unwrap, InvalidUnwrap
+        
+        try:
+            with open(self.key_file_path(folder), 'r', encoding='utf-8') as f:
+                key_data = json.load(f)
+            
+            params = dict(key_data["kdf"])
+            salt = bytes.fromhex(params.pop("salt"))
+            wrapped_key = bytes.fromhex(key_data["wrapped_key"])
+            
+            # Arquivos sem parâmetros gravados usam o padrão PBKDF2
+            params = dict(kdf.default_params(params.get("algorithm", kdf.PBKDF2)), **params)
+            
+            return aes_key_unwrap(self._master_key(password, salt, params), wrapped_key)
+        
+        except InvalidUnwrap:
+            raise Exception("Senha incorreta para este backup")
+        except Exception as e:
+            raise Exception(f"Erro ao abrir arquivo de chave: {e}")
+    
+    def rewrap_key_file(self, folder, old_password, new_password):
+        """
+        Troca a senha de um backup reencapsulando apenas a chave de dados
+        
+        Args:
+            folder (Path): Pasta do backup
+            old_password (str): Senha atual
+            new_password (str): Nova senha
+        """
+        data_key = self.load_data_key(folder, old_password)
+        self._write_key_file(folder, new_password, data_key)
\ No newline at end of file
@@ -86,30 +86,26 @@ class PasswordManager:
         """
         return hashlib.sha256(password.encode('utf-8')).digest()
     
-    def derive_key(self, password, salt=None):
+    def derive_key(self, password, salt=None, params=None):
         """
-        Deriva uma chave criptográfica da senha usando PBKDF2
+        Deriva uma chave criptográfica da senha (PBKDF2 por padrão)
         
         Args:
             password (str): Senha original
             salt (bytes): Salt para derivação (opcional)
+            params (dict): Algoritmo e parâmetros da derivação (opcional)
             
         Returns:
             tuple: (chave, salt)
         """
         import os
-        from cryptography.hazmat.primitives import hashes
-        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+        from . import kdf
         
         if salt is None:
             salt = os.urandom(16)  # Gera salt aleatório de 16 bytes
         
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,  # 32 bytes = 256 bits para AES-256
-            salt=salt,
-            iterations=100000,  # Número de iterações para maior segurança
-        )
+        if params is None:
+            params = kdf.default_params(kdf.PBKDF2)
         
-        key = kdf.derive(password.encode('utf-8'))
+        key = kdf.derive(password, salt, params)
         return key, salt
\ No newline at end of file
@@ -1,41 +1,181 @@
 """
 Módulo de criptografia AES
-Parte 3: Criptografia com AES dos arquivos
+Parte 3: Criptografia com AES dos arquivos (formato segmentado autenticado ou legado CBC)
 """
 
+import hashlib
+import io
 import os
 import struct
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives import padding
-import sys
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'auth'))
-from password_manager import PasswordManager
+
+from ..auth import kdf
+from ..auth.password_manager import PasswordManager
+from ..utils.buffer_pool import LimitedReader, get_pool, readinto_full
+from . import cipher_suite
+from .sparse import ExtentReader, ExtentWriter, find_data_extents, is_probably_sparse
+
+PART_HASH_MARK = "/partes-"  # Ex.: "sha256/partes-4194304"
+
+def part_hash_algorithm(hash_algorithm, part_size):
+    """
+    Nome do hash por partes, gravado no manifesto no lugar do algoritmo
+    
+    Args:
+        hash_algorithm (str): Algoritmo do hashlib de cada parte
+        part_size (int): Tamanho de cada parte em bytes
+    
+    Returns:
+        str: Algoritmo e tamanho das partes (ver PartHasher)
+    """
+    return f"{hash_algorithm}{PART_HASH_MARK}{part_size}"
+
+def new_hasher(hash_algorithm):
+    """
+    Cria o objeto de hash de um algoritmo gravado no manifesto
+    
+    Args:
+        hash_algorithm (str): Algoritmo do hashlib ou nome do hash por partes
+    
+    Returns:
+        Objeto com update e hexdigest
+    """
+    if PART_HASH_MARK in hash_algorithm:
+        algorithm, part_size = hash_algorithm.split(PART_HASH_MARK)
+        return PartHasher(algorithm, int(part_size))
+    return hashlib.new(hash_algorithm)
+
+class PartHasher:
+    """
+    Hash por partes: hash da sequência dos hashes de cada parte do original
+    
+    Permite que as partes de um arquivo sejam resumidas por workers diferentes
+    (encrypt_file_parallel) e que a leitura sequencial chegue ao mesmo valor.
+    """
+    
+    def __init__(self, algorithm, part_size):
+        """
+        Inicializa o hash
+        
+        Args:
+            algorithm (str): Algoritmo do hashlib
+            part_size (int): Tamanho de cada parte em bytes
+        """
+        self.algorithm = algorithm
+        self.part_size = part_size
+        self.digests = []
+        self._part = hashlib.new(algorithm)
+        self._filled = 0
+    
+    def update(self, data):
+        """Acrescenta dados ao hash, fechando as partes à medida que se completam"""
+        data = memoryview(data)
+        
+        while len(data):
+            take = min(len(data), self.part_size - self._filled)
+            self._part.update(data[:take])
+            self._filled += take
+            data = data[take:]
+            
+            if self._filled == self.part_size:
+                self.digests.append(self._part.digest())
+                self._part = hashlib.new(self.algorithm)
+                self._filled = 0
+    
+    def hexdigest(self):
+        """Combina os hashes das partes (a última, incompleta, inclusive)"""
+        digests = self.digests + ([self._part.digest()] if self._filled or not self.digests else [])
+        return hashlib.new(self.algorithm, b"".join(digests)).hexdigest()
 
 class AESHandler:
     """Classe para manipulação de criptografia AES"""
     
-    def __init__(self, password):
+    HEADER_SIZE = 24  # IV (16) + tamanho original (8)
+    CHUNK_SIZE = 1024 * 1024  # Bloco de leitura do processamento em fluxo
+    PART_SEGMENTS = 64  # Segmentos por parte na divisão de arquivos grandes entre workers
+    
+    def __init__(self, password=None, key=None, cipher=None):
         """
-        Inicializa o handler AES com a senha fornecida
+        Inicializa o handler AES com a senha fornecida ou com uma chave de dados
         
         Args:
             password (str): Senha do usuário
+            key (bytes): Chave de dados de 32 bytes (tem prioridade sobre a senha)
+            cipher (str): Cifra dos novos arquivos: cipher_suite.AES_GCM,
+                cipher_suite.CHACHA20 ou None para o formato legado AES-256-CBC.
+                Na descriptografia a cifra é lida do cabeçalho de cada arquivo.
         """
         self.password_manager = PasswordManager()
-        self.key, _ = self.password_manager.derive_key(password)
+        self._password = None
+        self.kdf_params = None
+        self.salt = None
+        self._derived = {}
+        
+        if key is not None:
+            self.key = key
+        else:
+            # Sem arquivo de chave: salt e parâmetros vão no cabeçalho (formato v3)
+            self.kdf_params = kdf.default_params(kdf.PBKDF2)
+            self.key, self.salt = self.password_manager.derive_key(password, params=self.kdf_params)
+            self._password = password
+        
         self.algorithm = algorithms.AES(self.key)
+        self.cipher = cipher or cipher_suite.AES_CBC
+        self._segmented = {}
+    
+    def _segmented_cipher(self, cipher_name, segment_size=cipher_suite.DEFAULT_SEGMENT_SIZE, key=None):
+        """Obtém (e reaproveita) a cifra segmentada para nome, tamanho de segmento e chave"""
+        key = key or self.key
+        cache_key = (cipher_name, segment_size, key)
+        
+        if cache_key not in self._segmented:
+            self._segmented[cache_key] = cipher_suite.SegmentedCipher(key, cipher_name, segment_size)
+        
+        return self._segmented[cache_key]
+    
+    def _header_options(self):
+        """Flags e bloco KDF do cabeçalho dos arquivos novos"""
+        if self.salt is None:
+            return {"flags": 0, "kdf_block": None}
+        return {"flags": cipher_suite.FLAG_PASSWORD_KEY,
+                "kdf_block": cipher_suite.pack_kdf(self.kdf_params, self.salt)}
+    
+    def _key_for(self, header):
+        """Chave de um arquivo segmentado: derivada da senha pelo bloco KDF ou a do handler"""
+        params = header["kdf"]
+        if params is None or self._password is None:
+            return self.key
+        
+        if params["salt"] == self.salt and all(params[k] == v for k, v in self.kdf_params.items()):
+            return self.key
+        
+        cache_key = tuple(sorted(params.items()))
+        if cache_key not in self._derived:
+            salt = params["salt"]
+            derive_params = {k: v for k, v in params.items() if k != "salt"}
+            self._derived[cache_key], _ = self.password_manager.derive_key(self._password, salt, derive_params)
+        
+        return self._derived[cache_key]
     
     def encrypt(self, data):
         """
-        Criptografa dados usando AES-256-CBC
+        Criptografa dados com a cifra do handler
         
         Args:
             data (bytes): Dados a serem criptografados
             
         Returns:
-            bytes: Dados criptografados (IV + salt + tamanho_original + dados_criptografados)
+            bytes: Dados criptografados (cabeçalho + segmentos, ou no formato
+            legado IV + tamanho_original + dados_criptografados)
         """
         try:
+            if self.cipher != cipher_suite.AES_CBC:
+                output = io.BytesIO()
+                self._segmented_cipher(self.cipher).encrypt_from(io.BytesIO(data), output, len(data),
+                                                                 **self._header_options())
+                return output.getvalue()
+            
             # Gera IV aleatório
             iv = os.urandom(16)  # 16 bytes para AES
             
@@ -62,7 +202,7 @@ class AESHandler:
     
     def decrypt(self, encrypted_data):
         """
-        Descriptografa dados usando AES-256-CBC
+        Descriptografa dados no formato segmentado ou no legado AES-256-CBC
         
         Args:
             encrypted_data (bytes): Dados criptografados
@@ -71,6 +211,11 @@ class AESHandler:
             bytes: Dados originais descriptografados
         """
         try:
+            if cipher_suite.is_segmented(encrypted_data, len(encrypted_data)):
+                output = io.BytesIO()
+                self.decrypt_stream(io.BytesIO(encrypted_data), output)
+                return output.getvalue()
+            
             if len(encrypted_data) < 24:  # IV (16) + tamanho (8) mínimo
                 raise ValueError("Dados criptografados muito pequenos")
             
@@ -105,49 +250,346 @@ class AESHandler:
         except Exception as e:
             raise Exception(f"Erro durante descriptografia: {e}")
     
-    def encrypt_file(self, input_path, output_path):
+    def encrypt_stream(self, infile, outfile, size, hash_algorithm='sha256', extents=None):
         """
-        Criptografa um arquivo completo
+        Criptografa em fluxo, calculando o hash do original na mesma leitura
+        
+        Args:
+            infile: Arquivo original aberto em modo binário
+            outfile: Destino aberto em modo binário
+            size (int): Tamanho do original
+            hash_algorithm (str): Algoritmo do hashlib (ex.: 'sha256', 'blake2b'),
+                nome do hash por partes (ver part_hash_algorithm) ou None para
+                não calcular hash
+            extents (list): Trechos [offset, tamanho] com dados de um arquivo
+                esparso; apenas eles são lidos e criptografados, e o mapa fica
+                na tabela de trechos do cabeçalho (opcional; não disponível no
+                formato legado CBC)
+        
+        Returns:
+            dict: "original_size", "hash_algorithm", "hash" (hexadecimal) e,
+            para arquivos esparsos, "extents"
+        """
+        hasher = new_hasher(hash_algorithm) if hash_algorithm else None
+        
+        if extents is None:
+            reader = infile
+            data_size = size
+        else:
+            if self.cipher == cipher_suite.AES_CBC:
+                raise ValueError("O formato legado não registra o mapa de trechos de arquivos esparsos")
+            reader = ExtentReader(infile, extents, size, hasher)
+            data_size = sum(length for _, length in extents)
+        
+        # O cabeçalho registra o tamanho lógico e a tabela de trechos
+        if self.cipher == cipher_suite.AES_CBC:
+            total = self._encrypt_cbc_from(reader, outfile, data_size, hasher)
+        else:
+            total = self._segmented_cipher(self.cipher).encrypt_from(reader, outfile, size, hasher,
+                                                                     extents=extents, **self._header_options())
+        
+        if extents is not None:
+            reader.finish()
+        
+        if total != data_size:
+            raise ValueError(f"Arquivo alterado durante a leitura ({total} de {data_size} bytes)")
+        
+        result = {"original_size": size, "hash_algorithm": hash_algorithm,
+                  "hash": hasher.hexdigest() if hasher else None}
+        if extents is not None:
+            result["extents"] = extents
+        
+        return result
+    
+    def _encrypt_cbc_from(self, reader, outfile, size, hasher=None):
+        """
+        Grava no formato legado: IV + tamanho + AES-256-CBC com padding PKCS7
+        
+        Lê com readinto e criptografa com update_into em buffers do pool; o
+        padding PKCS7 é aplicado apenas no último bloco.
+        """
+        iv = os.urandom(16)
+        outfile.write(iv + struct.pack('<Q', size))
+        
+        encryptor = Cipher(self.algorithm, modes.CBC(iv)).encryptor()
+        total = 0
+        
+        with get_pool(self.CHUNK_SIZE).buffer() as in_buffer, \
+                get_pool(self.CHUNK_SIZE + 16).buffer() as out_buffer:
+            in_view = memoryview(in_buffer)
+            out_view = memoryview(out_buffer)
+            
+            while True:
+                filled = readinto_full(reader, in_view, hasher)
+                if not filled:
+                    break
+                
+                count = encryptor.update_into(in_view[:filled], out_view)
+                outfile.write(out_view[:count])
+                total += filled
+        
+        pad = 16 - total % 16
+        outfile.write(encryptor.update(bytes([pad]) * pad) + encryptor.finalize())
+        return total
+    
+    def encrypt_file(self, input_path, output_path, hash_algorithm='sha256', throttle=None, sparse=False,
+                     tolerant=False):
+        """
+        Criptografa um arquivo completo em fluxo
         
         Args:
             input_path (str): Caminho do arquivo original
             output_path (str): Caminho do arquivo criptografado
+            hash_algorithm (str): Algoritmo do hash do original
+            throttle (IOThrottle): Limites de leitura/escrita (opcional)
+            sparse (bool): Se True, pula os buracos de arquivos esparsos (o
+                mapa de trechos fica no cabeçalho); ignorado no formato legado CBC
+            tolerant (bool): Se True, lê apenas até o tamanho da abertura, sem
+                falhar se o arquivo crescer durante a leitura
+        
+        Returns:
+            dict: Tamanho e hash do original (ver encrypt_stream)
         """
         try:
-            with open(input_path, 'rb') as infile:
-                data = infile.read()
-            
-            encrypted_data = self.encrypt(data)
-            
-            with open(output_path, 'wb') as outfile:
-                outfile.write(encrypted_data)
+            with open(input_path, 'rb') as infile, open(output_path, 'wb') as outfile:
+                stat = os.fstat(infile.fileno())
+                extents = None
+                
+                if sparse and self.cipher != cipher_suite.AES_CBC and is_probably_sparse(stat):
+                    extents = find_data_extents(infile.fileno(), stat.st_size)
+                    if extents is not None and (extents == [[0, stat.st_size]]
+                                                or len(extents) > cipher_suite.MAX_EXTENTS):
+                        extents = None
+                
+                if throttle is not None:
+                    infile, outfile = throttle.wrap(infile), throttle.wrap(outfile)
+                
+                if tolerant and extents is None:
+                    infile = LimitedReader(infile, stat.st_size)
+                
+                return self.encrypt_stream(infile, outfile, stat.st_size, hash_algorithm, extents)
                 
         except Exception as e:
             raise Exception(f"Erro ao criptografar arquivo {input_path}: {e}")
     
-    def decrypt_file(self, input_path, output_path):
+    def can_split(self, size):
+        """
+        Indica se um arquivo deste tamanho pode ser dividido entre workers
+        
+        Args:
+            size (int): Tamanho do original
+        
+        Returns:
+            bool: True no formato segmentado, para arquivos com ao menos duas partes
+        """
+        return self.cipher != cipher_suite.AES_CBC and size >= 2 * self.PART_SEGMENTS * cipher_suite.DEFAULT_SEGMENT_SIZE
+    
+    def encrypt_file_parallel(self, input_path, output_path, engine, hash_algorithm='sha256', throttle=None,
+                              tolerant=False):
+        """
+        Criptografa um arquivo grande dividindo seus segmentos entre os workers
+        
+        Cada parte (PART_SEGMENTS segmentos) é lida com pread e gravada com
+        pwrite na sua posição; o hash de cada parte é calculado sobre os
+        mesmos buffers criptografados, e o hash do original é o hash por
+        partes (ver PartHasher), com o algoritmo registrado em
+        "hash_algorithm". O arquivo criptografado é idêntico em formato ao de
+        encrypt_file. No formato legado CBC, que é sequencial, recorre a
+        encrypt_file.
+        
+        Args:
+            input_path (str): Caminho do arquivo original
+            output_path (str): Caminho do arquivo criptografado
+            engine (BatchEngine): Motor que executa as partes em paralelo
+            hash_algorithm (str): Algoritmo do hash do original
+            throttle (IOThrottle): Limites de leitura/escrita (opcional)
+            tolerant (bool): Se True, não falha se o arquivo crescer durante a leitura
+        
+        Returns:
+            dict: Tamanho e hash do original (ver encrypt_stream)
+        """
+        if self.cipher == cipher_suite.AES_CBC:
+            return self.encrypt_file(input_path, output_path, hash_algorithm, throttle, tolerant=tolerant)
+        
+        try:
+            with open(input_path, 'rb') as infile, open(output_path, 'wb') as outfile:
+                in_fd, out_fd = infile.fileno(), outfile.fileno()
+                size = os.fstat(in_fd).st_size
+                
+                cipher = self._segmented_cipher(self.cipher)
+                header, nonce_prefix = cipher.new_header(size, **self._header_options())
+                os.pwrite(out_fd, header, 0)
+                
+                count = cipher_suite.segment_count(size, cipher.segment_size)
+                parts = [(first, min(first + self.PART_SEGMENTS, count))
+                         for first in range(0, count, self.PART_SEGMENTS)]
+                
+                def work(part):
+                    hasher = hashlib.new(hash_algorithm) if hash_algorithm else None
+                    cipher.encrypt_segments(in_fd, out_fd, header, nonce_prefix, size, *part, throttle, hasher)
+                    return hasher.digest() if hasher else None
+                
+                results = engine.run(parts, work)
+                
+                for part, result, error in results:
+                    if error is not None:
+                        raise error
+                
+                if not tolerant and os.fstat(in_fd).st_size != size:
+                    raise ValueError("Arquivo alterado durante a leitura")
+                
+                if not hash_algorithm:
+                    return {"original_size": size, "hash_algorithm": None, "hash": None}
+                
+                digests = [result for part, result, error in sorted(results, key=lambda r: r[0])]
+                return {"original_size": size,
+                        "hash_algorithm": part_hash_algorithm(hash_algorithm, self.PART_SEGMENTS * cipher.segment_size),
+                        "hash": hashlib.new(hash_algorithm, b"".join(digests)).hexdigest()}
+        
+        except Exception as e:
+            raise Exception(f"Erro ao criptografar arquivo {input_path}: {e}")
+    
+    def decrypt_stream(self, infile, outfile=None, extents=None):
+        """
+        Descriptografa em fluxo, em blocos de CHUNK_SIZE, com memória limitada
+        
+        Args:
+            infile: Arquivo criptografado aberto em modo binário
+            outfile: Destino aberto em modo binário (None descarta os dados)
+            extents (list): Trechos [offset, tamanho] de um arquivo esparso cujo
+                mapa está apenas no manifesto (arquivos anteriores à tabela de
+                trechos no cabeçalho); os dados são gravados nesses offsets,
+                deixando buracos (opcional)
+        
+        Returns:
+            int: Quantidade de bytes descriptografados (o tamanho lógico, nos
+            arquivos esparsos com tabela de trechos)
+        """
+        header = infile.read(self.HEADER_SIZE)
+        if len(header) < self.HEADER_SIZE:
+            raise ValueError("Dados criptografados muito pequenos")
+        
+        # A cifra dos arquivos novos vem do cabeçalho; sem ele, é o formato legado
+        if cipher_suite.is_segmented(header, _input_size(infile)):
+            header = cipher_suite.read_header(infile, header)
+            cipher = self._segmented_cipher(header["cipher"], header["segment_size"], self._key_for(header))
+            
+            # O mapa gravado no cabeçalho prevalece sobre o do manifesto
+            sparse = header["extents"] is not None
+            if sparse:
+                extents = header["extents"]
+            if outfile is not None and extents is not None:
+                outfile = ExtentWriter(outfile, extents)
+            
+            total = cipher.decrypt_stream(infile, outfile, header)
+            if not sparse:
+                return total
+            
+            if outfile is not None:
+                outfile.finish(header["original_size"])
+            return header["original_size"]
+        
+        if outfile is not None and extents is not None:
+            outfile = ExtentWriter(outfile, extents)
+        
+        reader = LegacyReader(self.algorithm, infile, header)
+        
+        try:
+            with get_pool(self.CHUNK_SIZE).buffer() as buffer:
+                view = memoryview(buffer)
+                
+                while True:
+                    count = reader.readinto(view)
+                    if not count:
+                        break
+                    if outfile is not None:
+                        outfile.write(view[:count])
+            
+            reader.finish()
+        finally:
+            reader.close()
+        
+        return reader.original_size
+    
+    def decrypt_file(self, input_path, output_path, throttle=None, extents=None, size=None):
         """
         Descriptografa um arquivo completo
         
         Args:
             input_path (str): Caminho do arquivo criptografado
             output_path (str): Caminho do arquivo descriptografado
+            throttle (IOThrottle): Limites de leitura/escrita (opcional)
+            extents (list): Mapa de trechos de um arquivo esparso (opcional)
+            size (int): Tamanho lógico do arquivo esparso restaurado
         """
         try:
-            with open(input_path, 'rb') as infile:
-                encrypted_data = infile.read()
-            
-            decrypted_data = self.decrypt(encrypted_data)
-            
-            with open(output_path, 'wb') as outfile:
-                outfile.write(decrypted_data)
+            with open(input_path, 'rb') as infile, open(output_path, 'wb') as outfile:
+                target = outfile
+                if throttle is not None:
+                    infile, target = throttle.wrap(infile), throttle.wrap(outfile)
                 
+                self.decrypt_stream(infile, target, extents)
+                
+                # Recria o buraco final de esparsos cujo mapa está só no manifesto
+                if size is not None:
+                    outfile.truncate(size)
+        
         except Exception as e:
             raise Exception(f"Erro ao descriptografar arquivo {input_path}: {e}")
     
-    def get_file_info(self, encrypted_file_path):
+    def verify_file(self, encrypted_file_path):
+        """
+        Verifica a integridade de um arquivo criptografado sem gravar o conteúdo
+        
+        Confere o tamanho esperado a partir do cabeçalho e descriptografa em fluxo
+        para um destino descartável. No formato segmentado cada segmento é
+        autenticado; no legado AES-256-CBC, sem autenticação, a verificação
+        detecta truncamento e a maior parte das corrupções, mas não garante
+        autenticidade.
+        
+        Args:
+            encrypted_file_path (str): Caminho do arquivo criptografado
+            
+        Returns:
+            dict: Resultado com "path", "ok", "original_size" e "error"
+        """
+        result = {"path": str(encrypted_file_path), "ok": False, "original_size": None, "error": None}
+        
+        info = self.get_file_info(encrypted_file_path)
+        if "error" in info:
+            result["error"] = info["error"]
+            return result
+        
+        result["original_size"] = info["original_size"]
+        
+        if info["cipher"] == cipher_suite.AES_CBC:
+            expected_size = self.HEADER_SIZE + (info["original_size"] // 16 + 1) * 16
+        else:
+            expected_size = cipher_suite.encrypted_size(info["original_size"], info["segment_size"], info["version"],
+                                                        info.get("extents"))
+        
+        if info["encrypted_size"] < expected_size:
+            result["error"] = f"Arquivo truncado ({info['encrypted_size']} de {expected_size} bytes)"
+            return result
+        
+        if info["encrypted_size"] > expected_size:
+            result["error"] = f"Tamanho inconsistente com o cabeçalho ({info['encrypted_size']} de {expected_size} bytes)"
+            return result
+        
+        try:
+            with open(encrypted_file_path, 'rb') as infile:
+                self.decrypt_stream(infile)
+            result["ok"] = True
+            
+        except Exception as e:
+            result["error"] = f"Conteúdo corrompido: {e}"
+        
+        return result
+    
+    @staticmethod
+    def get_file_info(encrypted_file_path):
         """
-        Obtém informações sobre um arquivo criptografado
+        Obtém informações sobre um arquivo criptografado (não requer a chave)
         
         Args:
             encrypted_file_path (str): Caminho do arquivo criptografado
@@ -157,23 +599,116 @@ class AESHandler:
         """
         try:
             with open(encrypted_file_path, 'rb') as f:
-                # Lê apenas os primeiros 24 bytes para obter informações
-                header = f.read(24)
+                # Lê apenas o cabeçalho (e a tabela de trechos) para obter informações
+                header = f.read(cipher_suite.MAX_HEADER_SIZE)
+                file_size = os.fstat(f.fileno()).st_size
                 
-            if len(header) < 24:
-                return {"error": "Arquivo muito pequeno para ser válido"}
+                if len(header) < 24:
+                    return {"error": "Arquivo muito pequeno para ser válido"}
+                
+                if cipher_suite.is_segmented(header, file_size):
+                    parsed = cipher_suite.read_header(f, header)
+                    info = {
+                        "version": parsed["version"],
+                        "original_size": parsed["original_size"],
+                        "encrypted_size": file_size,
+                        "cipher": parsed["cipher"],
+                        "segment_size": parsed["segment_size"],
+                        "iv_preview": parsed["nonce_prefix"][:4].hex(),
+                        "overhead": file_size - parsed["data_size"]
+                    }
+                    if parsed["extents"] is not None:
+                        info["extents"] = parsed["extents"]
+                    return info
             
             iv = header[:16]
             original_size = struct.unpack('<Q', header[16:24])[0]
             
-            file_size = os.path.getsize(encrypted_file_path)
-            
             return {
+                "version": cipher_suite.LEGACY_VERSION,
                 "original_size": original_size,
                 "encrypted_size": file_size,
+                "cipher": cipher_suite.AES_CBC,
                 "iv_preview": iv[:4].hex(),  # Mostra apenas os primeiros 4 bytes do IV
                 "overhead": file_size - original_size
             }
             
         except Exception as e:
-            return {"error": f"Erro ao ler informações: {e}"}
\ No newline at end of file
+            return {"error": f"Erro ao ler informações: {e}"}
+
+def _input_size(infile):
+    """Tamanho do arquivo de entrada, ou None quando não é um arquivo em disco"""
+    try:
+        return os.fstat(infile.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        return None
+
+class LegacyReader:
+    """
+    Leitor (com readinto) que descriptografa em fluxo o formato legado AES-256-CBC
+    
+    Entrega apenas os bytes do tamanho original registrado no cabeçalho; o
+    padding PKCS7, determinado por esse tamanho, é conferido em finish().
+    """
+    
+    def __init__(self, algorithm, infile, header):
+        """
+        Args:
+            algorithm: algorithms.AES com a chave do arquivo
+            infile: Arquivo criptografado posicionado logo após o cabeçalho
+            header (bytes): Cabeçalho legado (IV + tamanho original)
+        """
+        self.infile = infile
+        self.original_size = struct.unpack('<Q', header[16:24])[0]
+        self.pad = 16 - self.original_size % 16
+        self.decryptor = Cipher(algorithm, modes.CBC(header[:16])).decryptor()
+        self.produced = 0
+        self.padding_seen = bytearray()
+        self._pending = memoryview(b"")
+        
+        self._in_buffer = get_pool(AESHandler.CHUNK_SIZE).acquire()
+        self._out_buffer = get_pool(AESHandler.CHUNK_SIZE + 16).acquire()
+    
+    def readinto(self, buffer):
+        while not len(self._pending) and self._in_buffer is not None:
+            filled = readinto_full(self.infile, memoryview(self._in_buffer))
+            if not filled:
+                break
+            
+            out_view = memoryview(self._out_buffer)
+            count = self.decryptor.update_into(memoryview(self._in_buffer)[:filled], out_view)
+            data_count = max(0, min(count, self.original_size - self.produced))
+            self.produced += count
+            
+            self.padding_seen += out_view[data_count:count]
+            if len(self.padding_seen) > self.pad:
+                raise ValueError("Dados além do tamanho registrado no cabeçalho")
+            
+            self._pending = out_view[:data_count]
+        
+        count = min(len(buffer), len(self._pending))
+        buffer[:count] = self._pending[:count]
+        self._pending = self._pending[count:]
+        return count
+    
+    def finish(self):
+        """Confere o tamanho e o padding e devolve os buffers ao pool"""
+        try:
+            # finalize falha se o texto cifrado não tiver tamanho múltiplo do bloco
+            self.padding_seen += self.decryptor.finalize()
+            
+            if self.produced < self.original_size + self.pad:
+                raise ValueError("Tamanho dos dados descriptografados não confere")
+            if self.padding_seen != bytes([self.pad]) * self.pad:
+                raise ValueError("Padding inválido")
+        
+        finally:
+            self.close()
+    
+    def close(self):
+        """Devolve os buffers ao pool (pode ser chamado mais de uma vez)"""
+        if self._in_buffer is not None:
+            self._pending = memoryview(b"")
+            get_pool(AESHandler.CHUNK_SIZE).release(self._in_buffer)
+            get_pool(AESHandler.CHUNK_SIZE + 16).release(self._out_buffer)
+            self._in_buffer = self._out_buffer = None
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+Módulo de processamento em lote
+Executa operações sobre muitos arquivos em paralelo
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+class BatchEngine:
+    """Classe para execução paralela de operações em lote"""
+    
+    def __init__(self, max_workers=None, executor=None):
+        """
+        Inicializa o motor de lote
+        
+        Args:
+            max_workers (int): Número de workers (padrão: baseado na quantidade de CPUs)
+            executor (ThreadPoolExecutor): Pool compartilhado e mantido aberto entre
+                execuções (ex.: pelo agente); None cria um pool a cada execução
+        """
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.executor = executor
+    
+    def run(self, items, func, on_result=None, priority=None):
+        """
+        Aplica uma função a cada item em paralelo
+        
+        Args:
+            items (list): Itens a processar
+            func (callable): Função aplicada a cada item
+            on_result (callable): Chamada a cada item concluído com
+                (item, resultado, erro, concluídos, total)
+            priority (callable): Chave de ordenação; itens com chave menor
+                entram primeiro na fila (ex.: WorkScheduler.priority)
+        
+        Returns:
+            list: Lista de tuplas (item, resultado, erro) na ordem de conclusão
+        """
+        items = sorted(items, key=priority) if priority is not None else list(items)
+        results = []
+        
+        if not items:
+            return results
+        
+        if self.executor is not None:
+            return self._collect(self.executor, items, func, on_result, results)
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return self._collect(executor, items, func, on_result, results)
+    
+    def _collect(self, executor, items, func, on_result, results):
+        """Envia os itens ao pool e reúne os resultados na ordem de conclusão"""
+        futures = {executor.submit(func, item): item for item in items}
+        
+        for done, future in enumerate(as_completed(futures), 1):
+            item = futures[future]
+            result, error = None, None
+            
+            try:
+                result = future.result()
+            except Exception as e:
+                error = e
+            
+            results.append((item, result, error))
+            
+            if on_result:
+                on_result(item, result, error, done, len(items))
+        
+        return results
\ No newline at end of file
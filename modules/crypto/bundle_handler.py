@@ -0,0 +1,241 @@
+"""
+Módulo de agrupamento de arquivos pequenos
+Caminho rápido: vários arquivos pequenos criptografados em um único pacote
+"""
+
+import hashlib
+import json
+import os
+import struct
+from pathlib import Path
+
+from ..file_ops.manifest import BackupManifest
+from ..file_ops.snapshot import RETRIED, INCONSISTENT, stat_signature
+from ..utils.buffer_pool import ViewReader, get_pool, readinto_full
+
+class BundleHandler:
+    """Agrupa arquivos pequenos em pacotes criptografados com índice"""
+    
+    BUNDLE_SUFFIX = '.bundle.encrypted'
+    
+    def __init__(self, aes_handler, max_file_size=64 * 1024, max_bundle_size=8 * 1024 * 1024):
+        """
+        Inicializa o agrupador de arquivos pequenos
+        
+        Args:
+            aes_handler (AESHandler): Handler usado para criptografar os pacotes
+            max_file_size (int): Tamanho máximo (bytes) para um arquivo entrar em pacote
+            max_bundle_size (int): Tamanho máximo (bytes) de dados por pacote
+        """
+        self.aes_handler = aes_handler
+        self.max_file_size = max_file_size
+        self.max_bundle_size = max_bundle_size
+    
+    def is_bundle(self, file_path):
+        """
+        Verifica se um arquivo é um pacote de arquivos pequenos
+        
+        Args:
+            file_path (str): Caminho do arquivo
+        
+        Returns:
+            bool: True se o arquivo for um pacote
+        """
+        return str(file_path).endswith(self.BUNDLE_SUFFIX)
+    
+    def split_files(self, file_paths, sizes=None):
+        """
+        Separa os arquivos pequenos (agrupáveis) dos demais
+        
+        Args:
+            file_paths (list): Lista de caminhos de arquivos
+            sizes (list): Tamanhos já conhecidos, na mesma ordem (opcional)
+        
+        Returns:
+            tuple: (arquivos_pequenos, arquivos_grandes), pequenos como (caminho, tamanho)
+        """
+        small_files = []
+        large_files = []
+        
+        for i, file_path in enumerate(file_paths):
+            try:
+                size = sizes[i] if sizes is not None else os.stat(file_path).st_size
+            except OSError:
+                large_files.append(file_path)
+                continue
+            
+            if size <= self.max_file_size:
+                small_files.append((file_path, size))
+            else:
+                large_files.append(file_path)
+        
+        return small_files, large_files
+    
+    def plan_bundles(self, small_files):
+        """
+        Distribui os arquivos pequenos em grupos limitados por max_bundle_size
+        
+        Args:
+            small_files (list): Lista de tuplas (caminho, tamanho)
+        
+        Returns:
+            list: Lista de grupos, cada um uma lista de caminhos
+        """
+        groups = []
+        current = []
+        current_size = 0
+        
+        for file_path, size in small_files:
+            if current and current_size + size > self.max_bundle_size:
+                groups.append(current)
+                current = []
+                current_size = 0
+            
+            current.append(file_path)
+            current_size += size
+        
+        if current:
+            groups.append(current)
+        
+        return groups
+    
+    def create_bundle(self, file_paths, bundle_path, hash_algorithm='sha256', throttle=None):
+        """
+        Lê os arquivos e grava um único pacote criptografado com índice
+        
+        Formato do conteúdo antes da criptografia:
+        tamanho_indice (4 bytes) + índice JSON [[nome, tamanho, hash], ...] + dados concatenados
+        
+        Args:
+            file_paths (list): Arquivos a serem agrupados
+            bundle_path (Path): Caminho do pacote a ser criado
+            hash_algorithm (str): Algoritmo do hash de cada original
+            throttle (IOThrottle): Limites de leitura/escrita e arquivos/s (opcional)
+        
+        Returns:
+            list: Entradas gravadas ("name", "size", "mtime", "hash", "hash_algorithm"
+            e, para arquivos alterados durante a leitura, "consistency")
+        """
+        try:
+            index = []
+            entries = []
+            
+            # Os dados são lidos com readinto em um único buffer reutilizável do pool
+            with get_pool(self.max_bundle_size + self.max_file_size).buffer() as buffer:
+                view = memoryview(buffer)
+                offset = 0
+                
+                for file_path in file_paths:
+                    if throttle is not None:
+                        throttle.before_file()
+                    
+                    with open(file_path, 'rb') as f:
+                        # Arquivo alterado durante a leitura: lê mais uma vez e, se mudar de novo, sinaliza
+                        for attempt in range(2):
+                            f.seek(0)
+                            before = os.fstat(f.fileno())
+                            size = readinto_full(throttle.wrap(f) if throttle is not None else f, view[offset:])
+                            consistent = stat_signature(os.fstat(f.fileno())) == stat_signature(before)
+                            if consistent:
+                                break
+                        
+                        mtime = before.st_mtime
+                    
+                    if offset + size == len(view):
+                        raise ValueError(f"Arquivo {file_path} cresceu além do limite do pacote")
+                    
+                    # Hash calculado sobre o mesmo buffer que será criptografado
+                    file_hash = hashlib.new(hash_algorithm, view[offset:offset + size]).hexdigest()
+                    name = Path(file_path).name
+                    offset += size
+                    
+                    index.append([name, size, file_hash])
+                    entry = {
+                        "name": name,
+                        "size": size,
+                        "mtime": mtime,
+                        "hash": file_hash,
+                        "hash_algorithm": hash_algorithm
+                    }
+                    if attempt or not consistent:
+                        entry["consistency"] = RETRIED if consistent else INCONSISTENT
+                    entries.append(entry)
+                
+                index_bytes = json.dumps(index, ensure_ascii=False).encode('utf-8')
+                prefix = struct.pack('<I', len(index_bytes)) + index_bytes
+                
+                # Uma única passada de criptografia para todo o pacote
+                with open(bundle_path, 'wb') as f:
+                    self.aes_handler.encrypt_stream(
+                        ViewReader([prefix, view[:offset]]),
+                        throttle.wrap(f) if throttle is not None else f,
+                        len(prefix) + offset, hash_algorithm=None
+                    )
+            
+            return entries
+        
+        except Exception as e:
+            raise Exception(f"Erro ao criar pacote {bundle_path}: {e}")
+    
+    def read_bundle(self, bundle_path):
+        """
+        Descriptografa um pacote e separa seus arquivos
+        
+        Args:
+            bundle_path (str): Caminho do pacote criptografado
+        
+        Returns:
+            list: Lista de tuplas (nome, dados)
+        """
+        with open(bundle_path, 'rb') as f:
+            payload = self.aes_handler.decrypt(f.read())
+        
+        if len(payload) < 4:
+            raise ValueError("Pacote sem índice")
+        
+        index_size = struct.unpack('<I', payload[:4])[0]
+        index = json.loads(payload[4:4 + index_size].decode('utf-8'))
+        
+        view = memoryview(payload)
+        offset = 4 + index_size
+        entries = []
+        
+        for name, size, *_ in index:
+            if offset + size > len(payload):
+                raise ValueError(f"Pacote truncado no arquivo {name}")
+            entries.append((name, bytes(view[offset:offset + size])))
+            offset += size
+        
+        return entries
+    
+    def extract_bundle(self, bundle_path, output_folder):
+        """
+        Restaura todos os arquivos de um pacote em uma pasta
+        
+        Uma falha ao gravar um arquivo (ex.: destino já existente) não
+        interrompe os demais; apenas um pacote ilegível gera exceção.
+        
+        Args:
+            bundle_path (str): Caminho do pacote criptografado
+            output_folder (Path): Pasta de destino
+        
+        Returns:
+            tuple: (caminhos dos arquivos restaurados, lista de (nome, erro))
+        """
+        try:
+            entries = self.read_bundle(bundle_path)
+        except Exception as e:
+            raise Exception(f"Erro ao extrair pacote {bundle_path}: {e}")
+        
+        restored, failed = [], []
+        
+        for name, data in entries:
+            try:
+                output_path = BackupManifest.restore_path(output_folder, name)
+                with open(output_path, 'xb') as f:
+                    f.write(data)
+                restored.append(output_path)
+            except Exception as e:
+                failed.append((name, e))
+        
+        return restored, failed
\ No newline at end of file
@@ -0,0 +1,642 @@
+"""
+Módulo de cifras autenticadas
+Formato segmentado com AES-256-GCM ou ChaCha20-Poly1305 e escolha automática
+da cifra mais rápida para o equipamento
+
+Formato do arquivo:
+cabeçalho + segmentos, cada um com até segment_size bytes de dados seguidos
+da tag de autenticação (16 bytes).
+
+O cabeçalho (magic, versão, cifra, flags, tamanho do segmento, tamanho
+original e prefixo do nonce; a partir da versão 3, também o algoritmo, os
+parâmetros e o salt da derivação de chave) é autenticado em todos os segmentos. Em
+arquivos esparsos (FLAG_SPARSE), o tamanho original é o tamanho lógico e o
+cabeçalho termina com a tabela de trechos com dados (quantidade + offset e
+tamanho de cada trecho); os segmentos contêm apenas esses trechos. O nonce de
+cada segmento é prefixo (7) + índice (4) + marcador de último segmento (1),
+o que impede reordenar, remover ou truncar segmentos sem detecção.
+"""
+
+import json
+import os
+import platform
+import struct
+import time
+from pathlib import Path
+
+from ..auth import kdf
+from ..utils.buffer_pool import get_pool, readinto_full
+
+AES_CBC = "aes-256-cbc"  # Formato legado, sem cabeçalho próprio
+AES_GCM = "aes-256-gcm"
+CHACHA20 = "chacha20-poly1305"
+
+CIPHER_IDS = {AES_GCM: 1, CHACHA20: 2}
+CIPHER_NAMES = {cipher_id: name for name, cipher_id in CIPHER_IDS.items()}
+AUTHENTICATED_CIPHERS = (AES_GCM, CHACHA20)
+
+MAGIC = b"BKE2"
+LEGACY_VERSION = 1  # IV + tamanho + AES-256-CBC, sem magic
+FORMAT_VERSION = 3  # Versão gravada nos arquivos novos
+SUPPORTED_VERSIONS = (2, 3)
+HEADER = struct.Struct('<4sBBHIQ7s')  # magic, versão, cifra, flags, segmento, tamanho, nonce
+KDF_BLOCK = struct.Struct('<B3I16s')  # Versão 3: algoritmo, três parâmetros e salt da derivação
+SIGNATURE = struct.Struct('<BBHIQ')  # Campos do cabeçalho após o magic, até o tamanho original
+LEGACY_HEADER = struct.Struct('<16sQ')  # Formato legado: IV e tamanho original
+MAX_HEADER_SIZE = HEADER.size + KDF_BLOCK.size  # Sem a tabela de trechos dos arquivos esparsos
+EXTENT_COUNT = struct.Struct('<I')
+EXTENT = struct.Struct('<QQ')  # offset e tamanho de um trecho com dados
+MAX_EXTENTS = 1024 * 1024
+
+FLAG_PASSWORD_KEY = 0x0001  # Chave derivada da senha pelo bloco KDF (sem arquivo de chave)
+FLAG_SPARSE = 0x0002  # Tabela de trechos após o cabeçalho; segmentos só com os trechos
+TAG_SIZE = 16
+DEFAULT_SEGMENT_SIZE = 1024 * 1024
+
+CACHE_VERSION = 1
+
+_selected_cipher = None
+
+def _aead(cipher_name, key):
+    """Cria o objeto AEAD da biblioteca cryptography para a cifra informada"""
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+    
+    if cipher_name == AES_GCM:
+        return AESGCM(key)
+    if cipher_name == CHACHA20:
+        return ChaCha20Poly1305(key)
+    
+    raise ValueError(f"Cifra desconhecida: {cipher_name}")
+
+def _legacy_size_matches(data, file_size):
+    """Indica se o tamanho do arquivo confere com o cabeçalho legado (IV + tamanho)"""
+    if len(data) < LEGACY_HEADER.size:
+        return False
+    
+    original_size = LEGACY_HEADER.unpack_from(data)[1]
+    return file_size == LEGACY_HEADER.size + (original_size // 16 + 1) * 16
+
+def is_segmented(data, file_size=None):
+    """
+    Verifica se os bytes iniciais pertencem ao formato segmentado
+    
+    O IV aleatório de um arquivo legado pode começar com o magic; por isso
+    versão, cifra e tamanho do segmento também precisam ser válidos e, com
+    file_size, um arquivo cujo tamanho só confere com o cabeçalho legado é
+    tratado como legado.
+    
+    Args:
+        data (bytes): Início do arquivo (ao menos 24 bytes para as conferências)
+        file_size (int): Tamanho total do arquivo (opcional)
+    
+    Returns:
+        bool: True se o arquivo estiver no formato segmentado
+    """
+    if data[:len(MAGIC)] != MAGIC:
+        return False
+    if len(data) < LEGACY_HEADER.size:
+        return True  # Curto demais para o legado; parse_header aponta o erro
+    
+    version, cipher_id, flags, segment_size, original_size = SIGNATURE.unpack_from(data, len(MAGIC))
+    if version not in SUPPORTED_VERSIONS or cipher_id not in CIPHER_NAMES or segment_size == 0:
+        return False
+    if file_size is None:
+        return True
+    
+    # Sem a tabela de trechos não há como calcular o tamanho de um esparso
+    if not flags & FLAG_SPARSE and file_size == encrypted_size(original_size, segment_size, version):
+        return True
+    
+    # Um arquivo segmentado truncado ou corrompido continua sendo segmentado
+    return not _legacy_size_matches(data, file_size)
+
+def segment_count(size, segment_size):
+    """Quantidade de segmentos para um original de size bytes (ao menos um)"""
+    return max(1, -(-size // segment_size))
+
+def header_size(version):
+    """Tamanho do cabeçalho de uma versão do formato segmentado"""
+    return HEADER.size + (KDF_BLOCK.size if version >= 3 else 0)
+
+def encrypted_size(size, segment_size, version=FORMAT_VERSION, extents=None):
+    """
+    Tamanho esperado do arquivo criptografado
+    
+    Args:
+        size (int): Tamanho do original
+        segment_size (int): Tamanho do segmento
+        version (int): Versão do formato (define o tamanho do cabeçalho)
+        extents (list): Trechos [offset, tamanho] de um arquivo esparso (opcional)
+    
+    Returns:
+        int: Tamanho total em bytes (cabeçalho, dados e tags)
+    """
+    if extents is not None:
+        size = sum(length for _, length in extents)
+        return (header_size(version) + len(pack_extents(extents)) + size
+                + segment_count(size, segment_size) * TAG_SIZE)
+    
+    return header_size(version) + size + segment_count(size, segment_size) * TAG_SIZE
+
+def pack_extents(extents):
+    """
+    Monta a tabela de trechos de um arquivo esparso
+    
+    Args:
+        extents (list): Trechos [offset, tamanho] com dados, em ordem
+    
+    Returns:
+        bytes: Quantidade de trechos seguida do offset e tamanho de cada um
+    """
+    return EXTENT_COUNT.pack(len(extents)) + b"".join(EXTENT.pack(offset, length) for offset, length in extents)
+
+def _unpack_extents(data, offset, size):
+    """Lê e valida a tabela de trechos; retorna (trechos, fim da tabela)"""
+    if len(data) < offset + EXTENT_COUNT.size:
+        raise ValueError("Cabeçalho incompleto")
+    
+    count = EXTENT_COUNT.unpack_from(data, offset)[0]
+    end = offset + EXTENT_COUNT.size + count * EXTENT.size
+    if count > MAX_EXTENTS:
+        raise ValueError("Tabela de trechos inválida")
+    if len(data) < end:
+        raise ValueError("Cabeçalho incompleto")
+    
+    extents = []
+    position = 0
+    
+    for start, length in EXTENT.iter_unpack(data[offset + EXTENT_COUNT.size:end]):
+        if start < position or length == 0 or start + length > size:
+            raise ValueError("Tabela de trechos inválida")
+        extents.append([start, length])
+        position = start + length
+    
+    return extents, end
+
+def pack_kdf(params=None, salt=None):
+    """
+    Monta o bloco KDF do cabeçalho
+    
+    Args:
+        params (dict): Parâmetros da derivação (None para chave de arquivo de chave)
+        salt (bytes): Salt de 16 bytes da derivação
+    
+    Returns:
+        bytes: Bloco KDF (zerado quando params é None)
+    """
+    if params is None:
+        return bytes(KDF_BLOCK.size)
+    
+    kdf_id, values = kdf.encode_params(params)
+    return KDF_BLOCK.pack(kdf_id, *values, salt)
+
+def parse_header(data, extents=True):
+    """
+    Interpreta o cabeçalho do formato segmentado
+    
+    Args:
+        data (bytes): Início do arquivo (ao menos header_size(versão) bytes e,
+            em arquivos esparsos, a tabela de trechos)
+        extents (bool): Se False, não lê a tabela de trechos (basta o
+            cabeçalho fixo para tamanho, versão e cifra)
+    
+    Returns:
+        dict: "version", "header_size", "cipher", "flags", "segment_size",
+        "original_size" (tamanho lógico), "data_size" (bytes nos segmentos),
+        "extents" (trechos de um arquivo esparso; senão None), "nonce_prefix",
+        "kdf" (parâmetros com "salt" quando a chave é derivada da senha; senão
+        None) e "raw"
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Cabeçalho incompleto")
+    
+    magic, version, cipher_id, flags, segment_size, original_size, nonce_prefix = HEADER.unpack_from(data)
+    
+    if magic != MAGIC:
+        raise ValueError("Formato de arquivo desconhecido")
+    if version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Versão de formato não suportada: {version}")
+    
+    size = header_size(version)
+    if len(data) < size:
+        raise ValueError("Cabeçalho incompleto")
+    if cipher_id not in CIPHER_NAMES:
+        raise ValueError(f"Cifra desconhecida no cabeçalho: {cipher_id}")
+    if segment_size == 0:
+        raise ValueError("Tamanho de segmento inválido")
+    
+    kdf_params = None
+    if version >= 3 and flags & FLAG_PASSWORD_KEY:
+        kdf_id, first, second, third, salt = KDF_BLOCK.unpack_from(data, HEADER.size)
+        kdf_params = dict(kdf.decode_params(kdf_id, (first, second, third)), salt=salt)
+    
+    extent_list = None
+    data_size = original_size
+    if flags & FLAG_SPARSE and extents:
+        extent_list, size = _unpack_extents(data, size, original_size)
+        data_size = sum(length for _, length in extent_list)
+    
+    return {
+        "version": version,
+        "header_size": size,
+        "cipher": CIPHER_NAMES[cipher_id],
+        "flags": flags,
+        "segment_size": segment_size,
+        "original_size": original_size,
+        "data_size": data_size,
+        "extents": extent_list,
+        "nonce_prefix": nonce_prefix,
+        "kdf": kdf_params,
+        "raw": bytes(data[:size])
+    }
+
+def read_header(infile, initial=b""):
+    """
+    Lê e interpreta o cabeçalho segmentado de um arquivo aberto
+    
+    Args:
+        infile: Arquivo posicionado no início (ou logo após initial)
+        initial (bytes): Bytes do início já lidos pelo chamador
+    
+    Returns:
+        dict: Cabeçalho interpretado (ver parse_header); o arquivo fica
+        posicionado no primeiro segmento quando initial não passa do cabeçalho
+    """
+    data = bytearray(initial)
+    
+    def fill(size):
+        if len(data) < size:
+            data.extend(infile.read(size - len(data)))
+        return len(data) >= size
+    
+    if fill(HEADER.size) and data[4] in SUPPORTED_VERSIONS:
+        size = header_size(data[4])
+        
+        # Arquivo esparso: a tabela de trechos segue o cabeçalho fixo
+        if fill(size) and HEADER.unpack_from(data)[3] & FLAG_SPARSE and fill(size + EXTENT_COUNT.size):
+            count = EXTENT_COUNT.unpack_from(data, size)[0]
+            if count <= MAX_EXTENTS:
+                fill(size + EXTENT_COUNT.size + count * EXTENT.size)
+    
+    return parse_header(bytes(data))
+
+class SegmentedCipher:
+    """Criptografia autenticada em segmentos independentes"""
+    
+    def __init__(self, key, cipher_name=AES_GCM, segment_size=DEFAULT_SEGMENT_SIZE):
+        """
+        Inicializa a cifra segmentada
+        
+        Args:
+            key (bytes): Chave de 32 bytes
+            cipher_name (str): AES_GCM ou CHACHA20
+            segment_size (int): Bytes de dados por segmento
+        """
+        self.key = key
+        self.cipher_name = cipher_name
+        self.segment_size = segment_size
+        self.aead = _aead(cipher_name, key)
+    
+    @staticmethod
+    def _nonce(prefix, index, last):
+        return prefix + struct.pack('>IB', index, 1 if last else 0)
+    
+    def _encrypt_segment(self, nonce, data, header, out):
+        """Criptografa um segmento no buffer de saída; retorna o trecho preenchido"""
+        if hasattr(self.aead, "encrypt_into"):
+            self.aead.encrypt_into(nonce, data, header, out[:len(data) + TAG_SIZE])
+            return out[:len(data) + TAG_SIZE]
+        
+        return self.aead.encrypt(nonce, bytes(data), header)
+    
+    def _decrypt_segment(self, nonce, data, header, out):
+        """Descriptografa um segmento no buffer de saída; retorna o trecho preenchido"""
+        if hasattr(self.aead, "decrypt_into"):
+            size = max(0, len(data) - TAG_SIZE)
+            self.aead.decrypt_into(nonce, data, header, out[:size])
+            return out[:size]
+        
+        return self.aead.decrypt(nonce, bytes(data), header)
+    
+    def new_header(self, size, flags=0, kdf_block=None, extents=None):
+        """
+        Monta o cabeçalho de um novo arquivo, com prefixo de nonce aleatório
+        
+        Args:
+            size (int): Tamanho total (lógico) do original
+            flags (int): Flags do cabeçalho
+            kdf_block (bytes): Bloco KDF (ver pack_kdf); None grava o bloco zerado
+            extents (list): Trechos [offset, tamanho] de um arquivo esparso,
+                gravados na tabela de trechos (opcional)
+        
+        Returns:
+            tuple: (cabeçalho em bytes, prefixo do nonce)
+        """
+        if extents is not None:
+            flags |= FLAG_SPARSE
+        
+        nonce_prefix = os.urandom(7)
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, CIPHER_IDS[self.cipher_name], flags,
+                             self.segment_size, size, nonce_prefix) + (kdf_block or pack_kdf())
+        if extents is not None:
+            header += pack_extents(extents)
+        return header, nonce_prefix
+    
+    def encrypt_segments(self, in_fd, out_fd, header, nonce_prefix, size, first, stop, throttle=None, hasher=None):
+        """
+        Criptografa um intervalo de segmentos com pread/pwrite
+        
+        Como cada segmento tem nonce e posição próprios, intervalos diferentes
+        do mesmo arquivo podem ser criptografados em paralelo.
+        
+        Args:
+            in_fd (int): Descritor do original
+            out_fd (int): Descritor do destino (cabeçalho já gravado)
+            header (bytes): Cabeçalho obtido com new_header
+            nonce_prefix (bytes): Prefixo do nonce do cabeçalho
+            size (int): Tamanho total do original
+            first (int): Primeiro segmento do intervalo
+            stop (int): Segmento seguinte ao último do intervalo
+            throttle (IOThrottle): Limites de leitura/escrita (opcional)
+            hasher: Objeto do hashlib atualizado com o original do intervalo,
+                na ordem dos segmentos (opcional)
+        """
+        count = segment_count(size, self.segment_size)
+        
+        with get_pool(self.segment_size).buffer() as in_buffer, \
+                get_pool(self.segment_size + TAG_SIZE).buffer() as out_buffer:
+            in_view = memoryview(in_buffer)
+            out_view = memoryview(out_buffer)
+            
+            for index in range(first, stop):
+                offset = index * self.segment_size
+                length = max(0, min(self.segment_size, size - offset))
+                
+                if throttle is not None:
+                    throttle.read_limiter.consume(length)
+                
+                filled = preadinto(in_fd, in_view[:length], offset)
+                if filled != length:
+                    raise ValueError("Arquivo alterado durante a leitura")
+                if hasher is not None:
+                    hasher.update(in_view[:length])
+                
+                data = self._encrypt_segment(self._nonce(nonce_prefix, index, index == count - 1),
+                                             in_view[:length], header, out_view)
+                
+                if throttle is not None:
+                    throttle.write_limiter.consume(len(data))
+                os.pwrite(out_fd, data, len(header) + index * (self.segment_size + TAG_SIZE))
+    
+    def encrypt_from(self, reader, outfile, size, hasher=None, flags=0, kdf_block=None, extents=None):
+        """
+        Criptografa o conteúdo de um leitor, segmento a segmento
+        
+        Usa dois buffers do pool compartilhado (entrada preenchida com
+        readinto e saída preenchida com encrypt_into), sem novas alocações
+        por segmento.
+        
+        Args:
+            reader: Objeto com readinto (arquivo, ThrottledFile, ExtentReader...)
+            outfile: Destino aberto em modo binário
+            size (int): Tamanho total do original (gravado no cabeçalho)
+            hasher: Objeto do hashlib atualizado com o original (opcional)
+            flags (int): Flags do cabeçalho
+            kdf_block (bytes): Bloco KDF do cabeçalho (opcional)
+            extents (list): Trechos [offset, tamanho] de um arquivo esparso; o
+                leitor entrega apenas os dados desses trechos (opcional)
+        
+        Returns:
+            int: Quantidade de bytes lidos
+        """
+        header, nonce_prefix = self.new_header(size, flags, kdf_block, extents)
+        outfile.write(header)
+        
+        if extents is not None:
+            size = sum(length for _, length in extents)
+        
+        count = segment_count(size, self.segment_size)
+        in_pool = get_pool(self.segment_size)
+        out_pool = get_pool(self.segment_size + TAG_SIZE)
+        total = 0
+        
+        with in_pool.buffer() as in_buffer, out_pool.buffer() as out_buffer:
+            in_view = memoryview(in_buffer)
+            out_view = memoryview(out_buffer)
+            probe = memoryview(bytearray(1))
+            
+            for index in range(count):
+                last = index == count - 1
+                filled = readinto_full(reader, in_view, hasher)
+                total += filled
+                
+                # Após o último segmento, um byte a mais indica que o arquivo cresceu
+                if last and filled == len(in_view):
+                    total += readinto_full(reader, probe)
+                
+                outfile.write(self._encrypt_segment(self._nonce(nonce_prefix, index, last),
+                                                    in_view[:filled], header, out_view))
+                
+                if filled < len(in_view) and not last:
+                    break  # Arquivo encolheu: o chamador confere o total
+        
+        return total
+    
+    def decrypt_stream(self, infile, outfile=None, header=None):
+        """
+        Descriptografa e autentica todos os segmentos
+        
+        Args:
+            infile: Arquivo criptografado posicionado após o cabeçalho
+            outfile: Destino aberto em modo binário (None descarta os dados)
+            header (dict): Cabeçalho já interpretado por parse_header
+        
+        Returns:
+            int: Quantidade de bytes descriptografados (em arquivos esparsos,
+            apenas os dos trechos)
+        """
+        from cryptography.exceptions import InvalidTag
+        
+        count = segment_count(header["data_size"], header["segment_size"])
+        segment_bytes = header["segment_size"] + TAG_SIZE
+        total = 0
+        
+        in_pool = get_pool(segment_bytes)
+        out_pool = get_pool(header["segment_size"])
+        
+        with in_pool.buffer() as in_buffer, out_pool.buffer() as out_buffer:
+            in_view = memoryview(in_buffer)
+            out_view = memoryview(out_buffer)
+            
+            for index in range(count):
+                last = index == count - 1
+                filled = readinto_full(infile, in_view)
+                
+                if filled < TAG_SIZE:
+                    raise ValueError(f"Segmento {index + 1} de {count} truncado")
+                
+                try:
+                    data = self._decrypt_segment(self._nonce(header["nonce_prefix"], index, last),
+                                                 in_view[:filled], header["raw"], out_view)
+                except InvalidTag:
+                    raise ValueError(f"Falha de autenticação no segmento {index + 1} de {count}")
+                
+                if not last and len(data) != header["segment_size"]:
+                    raise ValueError("Segmento incompleto")
+                
+                total += len(data)
+                if outfile is not None:
+                    outfile.write(data)
+        
+        if infile.read(1):
+            raise ValueError("Dados extras após o último segmento")
+        if total != header["data_size"]:
+            raise ValueError("Tamanho dos dados descriptografados não confere")
+        
+        return total
+
+def preadinto(fd, view, offset):
+    """
+    Lê de uma posição do arquivo direto em um buffer, sem mover o cursor
+    
+    Args:
+        fd (int): Descritor do arquivo
+        view (memoryview): Destino
+        offset (int): Posição inicial no arquivo
+    
+    Returns:
+        int: Quantidade de bytes lidos (menor que o buffer apenas no fim do arquivo)
+    """
+    filled = 0
+    
+    while filled < len(view):
+        if hasattr(os, "preadv"):
+            count = os.preadv(fd, [view[filled:]], offset + filled)
+        else:
+            data = os.pread(fd, len(view) - filled, offset + filled)
+            count = len(data)
+            view[filled:filled + count] = data
+        
+        if not count:
+            break
+        filled += count
+    
+    return filled
+
+def cpu_has_aes():
+    """
+    Detecta instruções de AES por hardware (AES-NI no x86, extensão AES no ARM)
+    
+    Returns:
+        bool: True/False, ou None se não for possível detectar
+    """
+    try:
+        with open('/proc/cpuinfo', 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key.strip().lower() in ('flags', 'features'):
+                    return 'aes' in value.split()
+    except OSError:
+        pass
+    
+    return None
+
+def benchmark_ciphers(sample_size=4 * 1024 * 1024, rounds=3):
+    """
+    Mede a vazão de cada cifra autenticada neste equipamento
+    
+    Args:
+        sample_size (int): Bytes criptografados por rodada
+        rounds (int): Rodadas por cifra (vale a melhor)
+    
+    Returns:
+        dict: Vazão em MB/s por nome de cifra
+    """
+    key = os.urandom(32)
+    data = os.urandom(sample_size)
+    results = {}
+    
+    for name in AUTHENTICATED_CIPHERS:
+        aead = _aead(name, key)
+        best = None
+        
+        for _ in range(rounds):
+            start = time.perf_counter()
+            aead.encrypt(b"\x00" * 12, data, None)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        
+        results[name] = sample_size / max(best, 1e-9) / (1024 * 1024)
+    
+    return results
+
+def _cache_path():
+    """Caminho do arquivo com o resultado da medição das cifras"""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "backup_arquivos" / "cipher_benchmark.json"
+
+def _fingerprint():
+    """Identifica equipamento e biblioteca para invalidar a medição em cache"""
+    import cryptography
+    
+    return {
+        "version": CACHE_VERSION,
+        "machine": platform.machine(),
+        "cpu_aes": cpu_has_aes(),
+        "cryptography": cryptography.__version__
+    }
+
+def select_cipher(refresh=False):
+    """
+    Escolhe a cifra autenticada mais rápida para novos backups
+    
+    A medição é feita uma única vez e reaproveitada (em memória e em disco)
+    enquanto equipamento e biblioteca não mudarem. A variável de ambiente
+    BACKUP_CIPHER força uma cifra específica.
+    
+    Args:
+        refresh (bool): Se True, refaz a medição
+    
+    Returns:
+        str: Nome da cifra escolhida
+    """
+    global _selected_cipher
+    
+    forced = os.environ.get("BACKUP_CIPHER")
+    if forced:
+        if forced not in AUTHENTICATED_CIPHERS:
+            raise ValueError(f"Cifra inválida em BACKUP_CIPHER: {forced}")
+        return forced
+    
+    if _selected_cipher is not None and not refresh:
+        return _selected_cipher
+    
+    fingerprint = _fingerprint()
+    cache_path = _cache_path()
+    
+    if not refresh:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get("fingerprint") == fingerprint and cached.get("cipher") in AUTHENTICATED_CIPHERS:
+                _selected_cipher = cached["cipher"]
+                return _selected_cipher
+        except (OSError, ValueError):
+            pass
+    
+    try:
+        throughput = benchmark_ciphers()
+        _selected_cipher = max(throughput, key=throughput.get)
+    except Exception:
+        # Sem medição, a detecção de hardware decide
+        throughput = {}
+        _selected_cipher = CHACHA20 if cpu_has_aes() is False else AES_GCM
+    
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump({"fingerprint": fingerprint, "cipher": _selected_cipher, "throughput": throughput}, f, indent=2)
+    except OSError:
+        pass  # Sem cache em disco, a medição vale apenas para esta execução
+    
+    return _selected_cipher
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""
+Módulo de inspeção de cabeçalhos em lote
+Lê os cabeçalhos de muitos arquivos criptografados em paralelo (pread + fstat
+por arquivo, sem a chave) ou usa o manifesto, e resume o backup em colunas
+"""
+
+import os
+import struct
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from operator import sub
+
+from . import cipher_suite
+
+LEGACY_HEADER_SIZE = 24
+CBC_ID = 0  # Identificador da cifra legada nas colunas (as demais usam CIPHER_IDS)
+
+BATCH_SIZE = 256  # Arquivos por tarefa do pool
+
+class HeaderReport:
+    """Cabeçalhos de vários arquivos armazenados em colunas"""
+    
+    __slots__ = ("paths", "original_sizes", "encrypted_sizes", "versions", "cipher_ids", "errors", "source")
+    
+    def __init__(self, source="headers"):
+        """
+        Args:
+            source (str): Origem dos dados ("headers" ou "manifest")
+        """
+        self.paths = []
+        self.original_sizes = array('q')
+        self.encrypted_sizes = array('q')
+        self.versions = bytearray()
+        self.cipher_ids = bytearray()
+        self.errors = []
+        self.source = source
+    
+    def __len__(self):
+        return len(self.paths)
+    
+    def add(self, path, original_size, encrypted_size, version=0, cipher_id=CBC_ID):
+        """
+        Adiciona um arquivo ao relatório (versão 0 indica formato não lido)
+        """
+        self.paths.append(path)
+        self.original_sizes.append(original_size)
+        self.encrypted_sizes.append(encrypted_size)
+        self.versions.append(version)
+        self.cipher_ids.append(cipher_id)
+    
+    def extend(self, other):
+        """Anexa as colunas de outro relatório (usado ao juntar os lotes)"""
+        self.paths.extend(other.paths)
+        self.original_sizes.extend(other.original_sizes)
+        self.encrypted_sizes.extend(other.encrypted_sizes)
+        self.versions.extend(other.versions)
+        self.cipher_ids.extend(other.cipher_ids)
+        self.errors.extend(other.errors)
+    
+    def summary(self):
+        """
+        Estatísticas agregadas, calculadas sobre as colunas inteiras
+        
+        Returns:
+            dict: "files", "errors", "total_original", "total_encrypted",
+            "overhead" (total, mínimo, mediana, p95, máximo e percentual),
+            "versions" e "ciphers" (contagem por valor) e "source"
+        """
+        overheads = sorted(map(sub, self.encrypted_sizes, self.original_sizes))
+        total_original = sum(self.original_sizes)
+        total_encrypted = sum(self.encrypted_sizes)
+        
+        def percentile(fraction):
+            return overheads[min(len(overheads) - 1, int(fraction * len(overheads)))] if overheads else 0
+        
+        versions, ciphers = {}, {}
+        for (version, cipher_id), count in Counter(zip(self.versions, self.cipher_ids)).items():
+            if not version:
+                continue
+            name = cipher_suite.AES_CBC if cipher_id == CBC_ID else cipher_suite.CIPHER_NAMES.get(cipher_id, "?")
+            versions[version] = versions.get(version, 0) + count
+            ciphers[name] = ciphers.get(name, 0) + count
+        
+        return {
+            "files": len(self),
+            "errors": len(self.errors),
+            "total_original": total_original,
+            "total_encrypted": total_encrypted,
+            "overhead": {
+                "total": total_encrypted - total_original,
+                "min": overheads[0] if overheads else 0,
+                "median": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": overheads[-1] if overheads else 0,
+                "percent": (total_encrypted - total_original) * 100 / total_original if total_original else 0.0
+            },
+            "versions": versions,
+            "ciphers": ciphers,
+            "source": self.source
+        }
+
+def _inspect_batch(paths):
+    """Lê os cabeçalhos de um lote de arquivos (executado em uma thread do pool)"""
+    report = HeaderReport()
+    
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                header = os.pread(fd, cipher_suite.MAX_HEADER_SIZE, 0)
+                encrypted_size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+            
+            if cipher_suite.is_segmented(header, encrypted_size):
+                parsed = cipher_suite.parse_header(header, extents=False)
+                report.add(path, parsed["original_size"], encrypted_size, parsed["version"],
+                           cipher_suite.CIPHER_IDS[parsed["cipher"]])
+            elif len(header) >= LEGACY_HEADER_SIZE:
+                report.add(path, struct.unpack_from('<Q', header, 16)[0], encrypted_size, cipher_suite.LEGACY_VERSION)
+            else:
+                report.errors.append((path, "Arquivo muito pequeno para ser válido"))
+        
+        except (OSError, ValueError) as e:
+            report.errors.append((path, str(e)))
+    
+    return report
+
+def inspect_headers(paths, max_workers=None):
+    """
+    Lê os cabeçalhos de muitos arquivos em paralelo
+    
+    Args:
+        paths (list): Arquivos criptografados
+        max_workers (int): Threads de leitura (padrão: baseado na quantidade de CPUs)
+    
+    Returns:
+        HeaderReport: Colunas na ordem de paths; arquivos ilegíveis ficam em errors
+    """
+    paths = [os.fspath(path) for path in paths]
+    batches = [paths[i:i + BATCH_SIZE] for i in range(0, len(paths), BATCH_SIZE)]
+    report = HeaderReport()
+    
+    if len(batches) <= 1:
+        for batch in batches:
+            report.extend(_inspect_batch(batch))
+        return report
+    
+    max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+        for partial in executor.map(_inspect_batch, batches):
+            report.extend(partial)
+    
+    return report
+
+def inspect_backup(folder, manifest=None, max_workers=None):
+    """
+    Resume uma pasta de backup
+    
+    Com o manifesto, os tamanhos originais vêm dele e cada arquivo custa
+    apenas o stat da listagem da pasta (sem abrir os arquivos); o formato e a
+    cifra de cada arquivo só são conhecidos pela leitura dos cabeçalhos.
+    
+    Args:
+        folder (Path): Pasta do backup
+        manifest (BackupManifest): Manifesto já carregado (opcional)
+        max_workers (int): Threads de leitura dos cabeçalhos
+    
+    Returns:
+        HeaderReport: Relatório da pasta
+    """
+    with os.scandir(folder) as entries:
+        files = [entry for entry in entries if entry.name.endswith('.encrypted') and entry.is_file()]
+    
+    if manifest is None or not len(manifest):
+        return inspect_headers(sorted(entry.path for entry in files), max_workers)
+    
+    # Tamanho original por arquivo salvo (pacotes somam os arquivos que contêm)
+    original_sizes = {}
+    for entry in manifest.entries.values():
+        stored_name = entry["stored_name"]
+        original_sizes[stored_name] = original_sizes.get(stored_name, 0) + entry["size"]
+    
+    report = HeaderReport(source="manifest")
+    
+    for entry in sorted(files, key=lambda entry: entry.name):
+        if entry.name in original_sizes:
+            report.add(entry.path, original_sizes[entry.name], entry.stat().st_size)
+        else:
+            report.errors.append((entry.path, "Arquivo ausente do manifesto"))
+    
+    return report
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+Módulo de backup de várias pastas de origem
+Escaneia as origens em paralelo (um escaneador por dispositivo) e alimenta
+um único pool de criptografia, com progresso e resumo por origem
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ..file_ops.inventory import FileInventory
+from ..file_ops.manifest import BackupManifest
+from ..file_ops.snapshot import CONSISTENT, INCONSISTENT
+
+class HostBackup:
+    """Backup de muitas pastas de origem em uma única execução"""
+    
+    def __init__(self, aes_handler, backup_folder, manifest=None, throttle=None, max_workers=None,
+                 extensions=None, capture=None, scheduler=None):
+        """
+        Inicializa o backup de várias origens
+        
+        Args:
+            aes_handler (AESHandler): Handler com a chave e a cifra do backup
+            backup_folder (Path): Pasta de destino dos arquivos criptografados
+            manifest (BackupManifest): Manifesto que recebe as entradas (opcional)
+            throttle (IOThrottle): Limites de leitura/escrita e arquivos/s (opcional)
+            max_workers (int): Workers do pool de criptografia (padrão: CPUs)
+            extensions (set): Extensões aceitas (None aceita todas)
+            capture (ConsistentCapture): Captura consistente de arquivos em uso (opcional)
+            scheduler (WorkScheduler): Ordem dos arquivos de cada origem (opcional)
+        """
+        self.aes_handler = aes_handler
+        self.backup_folder = Path(backup_folder)
+        self.manifest = manifest if manifest is not None else BackupManifest()
+        self.throttle = throttle
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.extensions = extensions
+        self.capture = capture
+        self.scheduler = scheduler
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def group_by_device(roots):
+        """
+        Agrupa as origens pelo dispositivo em que estão
+        
+        Args:
+            roots (list): Pastas de origem
+        
+        Returns:
+            dict: Dispositivo (st_dev) -> lista de origens
+        """
+        groups = {}
+        
+        for root in roots:
+            groups.setdefault(os.stat(root).st_dev, []).append(root)
+        
+        return groups
+    
+    @staticmethod
+    def root_labels(roots):
+        """
+        Gera um rótulo único por origem, usado como prefixo no manifesto
+        
+        Args:
+            roots (list): Pastas de origem
+        
+        Returns:
+            dict: Origem -> rótulo
+        """
+        labels = {}
+        used = set()
+        
+        for root in roots:
+            base = Path(root).resolve().name or "raiz"
+            label = base
+            suffix = 2
+            
+            while label in used:
+                label = f"{base}_{suffix}"
+                suffix += 1
+            
+            used.add(label)
+            labels[root] = label
+        
+        return labels
+    
+    def run(self, roots, on_progress=None):
+        """
+        Executa o backup de todas as origens
+        
+        Há um escaneador por dispositivo, para evitar disputa de cabeça de
+        leitura. Cada origem é escaneada por inteiro (a ordem do agendador
+        depende de todos os tamanhos) e seus arquivos vão para o pool
+        compartilhado enquanto o escaneador segue para a próxima origem; um
+        semáforo limita os arquivos pendentes na fila.
+        
+        Args:
+            roots (list): Pastas de origem
+            on_progress (callable): Chamada a cada arquivo concluído com
+                (rótulo, resumo_da_origem)
+        
+        Returns:
+            dict: Rótulo -> resumo com "root", "files", "bytes", "failed",
+            "errors", "inconsistent" e "seconds"
+        """
+        roots = list(dict.fromkeys(os.path.abspath(root) for root in roots))
+        labels = self.root_labels(roots)
+        summaries = {
+            labels[root]: {"root": root, "files": 0, "bytes": 0, "failed": 0, "errors": [], "inconsistent": [],
+                           "seconds": 0.0, "_pending": 0, "_scanned": False, "_start": time.perf_counter()}
+            for root in roots
+        }
+        exclude = {os.path.abspath(self.backup_folder)}
+        slots = threading.BoundedSemaphore(self.max_workers * 4)
+        
+        def finish_root(summary):
+            # Chamado com o lock: a origem termina quando foi escaneada e não há pendências
+            if summary["_scanned"] and summary["_pending"] == 0:
+                summary["seconds"] = time.perf_counter() - summary["_start"]
+        
+        def encrypt(label, root, file_path):
+            summary = summaries[label]
+            
+            try:
+                if self.throttle is not None:
+                    self.throttle.before_file()
+                
+                stored_name = BackupManifest.new_stored_name()
+                
+                def read(source, tolerant=False):
+                    return self.aes_handler.encrypt_file(source, self.backup_folder / stored_name,
+                                                         throttle=self.throttle, sparse=True, tolerant=tolerant)
+                
+                if self.capture is not None:
+                    info, status = self.capture.capture(file_path, read)
+                else:
+                    info, status = read(file_path), CONSISTENT
+                
+                mtime = os.stat(file_path).st_mtime
+                extra = {"extents": info["extents"]} if "extents" in info else {}
+                if status != CONSISTENT:
+                    extra["consistency"] = status
+                name = f"{label}/{Path(os.path.relpath(file_path, root)).as_posix()}"
+                
+                with self._lock:
+                    self.manifest.add_entry(name, stored_name, info["original_size"], mtime,
+                                            info["hash"], info["hash_algorithm"], root=label, **extra)
+                    summary["files"] += 1
+                    summary["bytes"] += info["original_size"]
+                    if status == INCONSISTENT:
+                        summary["inconsistent"].append(file_path)
+            
+            except Exception as e:
+                with self._lock:
+                    summary["failed"] += 1
+                    summary["errors"].append((file_path, str(e)))
+            
+            finally:
+                slots.release()
+                with self._lock:
+                    summary["_pending"] -= 1
+                    finish_root(summary)
+                
+                if on_progress:
+                    on_progress(label, summary)
+        
+        def scan_device(device_roots, pool):
+            for root in device_roots:
+                label = labels[root]
+                summary = summaries[label]
+                
+                try:
+                    inventory = FileInventory.scan(root, self.extensions, recursive=True, exclude=exclude)
+                except OSError as e:
+                    with self._lock:
+                        summary["failed"] += 1
+                        summary["errors"].append((root, str(e)))
+                    inventory = FileInventory()
+                
+                paths = inventory.paths()
+                if self.scheduler is not None:
+                    paths = self.scheduler.order(paths, dict(zip(paths, inventory.sizes)))
+                
+                for file_path in paths:
+                    slots.acquire()
+                    with self._lock:
+                        summary["_pending"] += 1
+                    pool.submit(encrypt, label, root, file_path)
+                
+                with self._lock:
+                    summary["_scanned"] = True
+                    finish_root(summary)
+        
+        groups = self.group_by_device(roots)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            with ThreadPoolExecutor(max_workers=len(groups) or 1) as scanners:
+                for future in [scanners.submit(scan_device, device_roots, pool) for device_roots in groups.values()]:
+                    future.result()
+        
+        for summary in summaries.values():
+            for key in ("_pending", "_scanned", "_start"):
+                summary.pop(key)
+        
+        return summaries
\ No newline at end of file
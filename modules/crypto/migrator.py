@@ -0,0 +1,159 @@
+"""
+Módulo de migração de formato
+Converte arquivos no formato legado (IV + tamanho + AES-256-CBC) para o
+formato segmentado versionado, no lugar, em fluxo e em paralelo
+"""
+
+import os
+from pathlib import Path
+
+from . import cipher_suite
+from .aes_handler import LegacyReader
+from .batch_engine import BatchEngine
+from .header_scan import inspect_headers
+from .parity import refresh_parity
+
+class FormatMigrator:
+    """Classe para migração dos arquivos legados de uma pasta de backup"""
+    
+    TEMP_SUFFIX = ".migrating"
+    
+    def __init__(self, aes_handler, engine=None):
+        """
+        Inicializa o migrador
+        
+        Args:
+            aes_handler (AESHandler): Handler com a chave de dados do backup
+                (AESHandler(key=...)) e a cifra segmentada de destino (ex.:
+                cipher=select_cipher()); a mesma chave lê os arquivos legados
+            engine (BatchEngine): Motor de lote usado na migração paralela
+        """
+        if aes_handler.cipher == cipher_suite.AES_CBC:
+            raise ValueError("A migração requer uma cifra do formato segmentado")
+        
+        # Uma chave derivada da senha agora tem salt novo, diferente do usado nos legados
+        if aes_handler.salt is not None:
+            raise ValueError("A migração requer a chave de dados do arquivo de chave do backup")
+        
+        self.aes_handler = aes_handler
+        self.engine = engine or BatchEngine()
+    
+    @staticmethod
+    def find_legacy(folder):
+        """
+        Lista os arquivos da pasta que ainda estão no formato legado
+        
+        Args:
+            folder (Path): Pasta do backup
+        
+        Returns:
+            list: Caminhos dos arquivos legados, ordenados
+        """
+        with os.scandir(folder) as entries:
+            paths = sorted(entry.path for entry in entries
+                           if entry.is_file() and entry.name.endswith('.encrypted'))
+        
+        report = inspect_headers(paths)
+        return [path for path, version in zip(report.paths, report.versions)
+                if version == cipher_suite.LEGACY_VERSION]
+    
+    def migrate_file(self, path, expected_hash=None, hash_algorithm='sha256'):
+        """
+        Converte um arquivo legado, sem gravar o conteúdo em claro
+        
+        O conteúdo é descriptografado e recriptografado em fluxo (memória
+        limitada aos buffers do pool) para um arquivo temporário na mesma
+        pasta, que substitui o original atomicamente com os.replace. O nome
+        salvo não muda, então o manifesto continua válido.
+        
+        Args:
+            path (str): Arquivo legado
+            expected_hash (str): Hash do original registrado no manifesto;
+                se não conferir, o arquivo original é mantido (opcional)
+            hash_algorithm (str): Algoritmo de expected_hash
+        
+        Returns:
+            dict: "path", "original_size" e "hash" do conteúdo migrado
+        """
+        path = os.fspath(path)
+        temp_path = path + self.TEMP_SUFFIX
+        
+        try:
+            with open(path, 'rb') as infile, open(temp_path, 'wb') as outfile:
+                header = infile.read(self.aes_handler.HEADER_SIZE)
+                if (len(header) < self.aes_handler.HEADER_SIZE
+                        or cipher_suite.is_segmented(header, os.fstat(infile.fileno()).st_size)):
+                    raise ValueError("Arquivo não está no formato legado")
+                
+                reader = LegacyReader(self.aes_handler.algorithm, infile, header)
+                try:
+                    info = self.aes_handler.encrypt_stream(reader, outfile, reader.original_size, hash_algorithm)
+                    reader.finish()
+                finally:
+                    reader.close()
+                
+                outfile.flush()
+                os.fsync(outfile.fileno())
+            
+            if expected_hash is not None and info["hash"] != expected_hash:
+                raise ValueError("Hash do conteúdo não confere com o manifesto")
+            
+            os.replace(temp_path, path)
+            
+            # A paridade existente se refere ao conteúdo antigo
+            refresh_parity(path)
+            
+            return {"path": path, "original_size": info["original_size"], "hash": info["hash"]}
+        
+        except Exception as e:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise Exception(f"Erro ao migrar {Path(path).name}: {e}")
+    
+    def migrate_folder(self, folder, manifest=None, on_result=None):
+        """
+        Migra todos os arquivos legados de uma pasta em paralelo
+        
+        Com o manifesto, cada arquivo é conferido pelo hash registrado e o
+        próprio manifesto é regravado com a cifra nova.
+        
+        Args:
+            folder (Path): Pasta do backup
+            manifest (BackupManifest): Manifesto da pasta (opcional)
+            on_result (callable): Chamada a cada arquivo com
+                (caminho, resultado, erro, concluídos, total)
+        
+        Returns:
+            dict: Resumo com "total", "migrated", "original_bytes" e "failed"
+            (lista de (caminho, erro))
+        """
+        legacy = self.find_legacy(folder)
+        
+        def migrate(path):
+            entry = manifest.find_stored(Path(path).name) if manifest is not None else None
+            
+            # Pacotes têm um hash por arquivo interno e esparsos guardam só os trechos com
+            # dados; nesses casos a conferência fica com a descriptografia
+            if entry is None or entry.get("bundle") or "extents" in entry or not entry.get("hash"):
+                return self.migrate_file(path)
+            return self.migrate_file(path, entry["hash"], entry["hash_algorithm"])
+        
+        outcomes = self.engine.run(legacy, migrate, on_result)
+        
+        summary = {"total": len(legacy), "migrated": 0, "original_bytes": 0, "failed": []}
+        
+        for path, result, error in outcomes:
+            if error is not None:
+                summary["failed"].append((path, str(error)))
+            else:
+                summary["migrated"] += 1
+                summary["original_bytes"] += result["original_size"]
+        
+        if manifest is not None:
+            manifest.save(folder, self.aes_handler)
+            refresh_parity(manifest.manifest_path(folder))
+        
+        summary["failed"].sort()
+        return summary
\ No newline at end of file
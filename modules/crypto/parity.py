@@ -0,0 +1,392 @@
+"""
+Módulo de paridade
+Redundância opcional (~10%) para os arquivos criptografados: o arquivo é
+dividido em blocos de tamanho fixo, cada bloco tem um checksum e cada grupo
+de data_blocks blocos tem um bloco de paridade XOR, gravados em um arquivo
+auxiliar (.parity) ao lado do original.
+
+Os checksums localizam os blocos danificados (apagamentos) e a paridade
+reconstrói um bloco por grupo. Os grupos são intercalados dentro de faixas de
+data_blocks * stripe_groups blocos, de modo que um trecho contíguo danificado
+de até stripe_groups blocos por faixa é recuperável (na última faixa,
+incompleta, um bloco a cada data_blocks). A memória usada na
+geração é limitada a stripe_groups blocos.
+
+O XOR usa NumPy quando disponível; sem ele, usa inteiros do Python, que
+processam o bloco inteiro de uma vez.
+"""
+
+import hashlib
+import os
+import struct
+
+PARITY_SUFFIX = ".parity"
+MAGIC = b"BKPARIT1"
+HEADER = struct.Struct('<8sIHHQI')  # magic, bloco, blocos por grupo, grupos por faixa, tamanho, blocos
+CHECKSUM_SIZE = 8
+DIGEST_SIZE = 16
+
+DEFAULT_BLOCK_SIZE = 64 * 1024
+DEFAULT_DATA_BLOCKS = 10  # Um bloco de paridade a cada 10: ~10% de redundância
+DEFAULT_STRIPE_GROUPS = 16
+MIN_BLOCK_SIZE = 256  # Limita o custo dos checksums (8 bytes por bloco) em arquivos pequenos
+
+_numpy = None
+
+def _numpy_module():
+    """NumPy, se instalado (importado apenas no primeiro uso)"""
+    global _numpy
+    
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    
+    return _numpy or None
+
+def _xor_into(target, data):
+    """Aplica target ^= data nos primeiros len(data) bytes de target"""
+    np = _numpy_module()
+    length = len(data)
+    
+    if np is not None:
+        view = np.frombuffer(target, dtype=np.uint8, count=length)
+        np.bitwise_xor(view, np.frombuffer(data, dtype=np.uint8, count=length), out=view)
+        return
+    
+    value = int.from_bytes(target[:length], 'little') ^ int.from_bytes(data, 'little')
+    target[:length] = value.to_bytes(length, 'little')
+
+def _checksum(data):
+    return hashlib.blake2b(data, digest_size=CHECKSUM_SIZE).digest()
+
+def parity_path(path):
+    """
+    Caminho do arquivo de paridade de um arquivo criptografado
+    
+    Args:
+        path (str): Arquivo protegido
+    
+    Returns:
+        str: Caminho do arquivo .parity
+    """
+    return os.fspath(path) + PARITY_SUFFIX
+
+def has_parity(path):
+    """Indica se o arquivo possui arquivo de paridade"""
+    return os.path.isfile(parity_path(path))
+
+def refresh_parity(path):
+    """
+    Gera novamente a paridade de um arquivo regravado, se ele já a possuía
+    
+    Args:
+        path (str): Arquivo criptografado
+    
+    Returns:
+        bool: True se a paridade foi gerada novamente
+    """
+    if not has_parity(path):
+        return False
+    
+    ParityCodec().create(path)
+    return True
+
+def with_repair(path, action):
+    """
+    Executa uma leitura do arquivo; se falhar e o arquivo possuir paridade,
+    repara o arquivo e executa a leitura mais uma vez
+    
+    Args:
+        path (str): Arquivo lido por action
+        action (callable): Leitura sem argumentos
+    
+    Returns:
+        Resultado de action
+    """
+    try:
+        return action()
+    except Exception:
+        try:
+            repaired = has_parity(path) and ParityCodec().repair(path)["repaired"]
+        except Exception:
+            repaired = 0
+        
+        # Sem reparo, o erro original é o mais informativo
+        if not repaired:
+            raise
+    
+    return action()
+
+class _Layout:
+    """Posição dos blocos, grupos e tabelas de um arquivo protegido"""
+    
+    def __init__(self, block_size, data_blocks, stripe_groups, file_size):
+        self.block_size = block_size
+        self.data_blocks = data_blocks
+        self.stripe_groups = stripe_groups
+        self.file_size = file_size
+        self.block_count = -(-file_size // block_size)
+        self.stripe_blocks = data_blocks * stripe_groups
+        
+        # A última faixa, incompleta, usa só os grupos necessários para manter a proporção
+        self.full_stripes, rest = divmod(self.block_count, self.stripe_blocks)
+        self.last_groups = -(-rest // data_blocks)
+        self.parity_count = self.full_stripes * stripe_groups + self.last_groups
+        
+        self.tables_offset = HEADER.size
+        self.digest_offset = HEADER.size + (self.block_count + self.parity_count) * CHECKSUM_SIZE
+        self.parity_offset = self.digest_offset + DIGEST_SIZE
+    
+    def groups_in(self, stripe):
+        """Quantidade de grupos de paridade de uma faixa"""
+        return self.stripe_groups if stripe < self.full_stripes else self.last_groups
+    
+    def group_of(self, index):
+        """Grupo de paridade de um bloco de dados"""
+        stripe, local = divmod(index, self.stripe_blocks)
+        return stripe * self.stripe_groups + local % self.groups_in(stripe)
+    
+    def members(self, group):
+        """Blocos de dados de um grupo de paridade"""
+        stripe, slot = divmod(group, self.stripe_groups)
+        first = stripe * self.stripe_blocks + slot
+        return list(range(first, min((stripe + 1) * self.stripe_blocks, self.block_count), self.groups_in(stripe)))
+    
+    def block_length(self, index):
+        return min(self.block_size, self.file_size - index * self.block_size)
+
+class ParityCodec:
+    """Geração, conferência e reparo da paridade dos arquivos criptografados"""
+    
+    def __init__(self, block_size=DEFAULT_BLOCK_SIZE, data_blocks=DEFAULT_DATA_BLOCKS,
+                 stripe_groups=DEFAULT_STRIPE_GROUPS):
+        """
+        Inicializa o codificador
+        
+        Args:
+            block_size (int): Tamanho máximo dos blocos (arquivos pequenos usam
+                blocos menores, para manter a redundância e o intercalamento)
+            data_blocks (int): Blocos de dados por bloco de paridade
+            stripe_groups (int): Grupos intercalados por faixa (tamanho máximo,
+                em blocos, de um dano contíguo recuperável em cada faixa)
+        """
+        self.block_size = block_size
+        self.data_blocks = data_blocks
+        self.stripe_groups = stripe_groups
+    
+    def overhead(self):
+        """Fração aproximada de redundância gravada (ex.: 0.1 para 10%)"""
+        return 1 / self.data_blocks
+    
+    def create(self, path):
+        """
+        Gera o arquivo de paridade (substituído atomicamente)
+        
+        Args:
+            path (str): Arquivo criptografado
+        
+        Returns:
+            int: Tamanho do arquivo de paridade em bytes
+        """
+        path = os.fspath(path)
+        target = parity_path(path)
+        temp_path = target + ".tmp"
+        
+        try:
+            with open(path, 'rb') as infile, open(temp_path, 'wb') as outfile:
+                file_size = os.fstat(infile.fileno()).st_size
+                # Arquivos menores que uma faixa usam blocos menores, para ainda ocuparem todos os grupos
+                stripe_bytes = self.data_blocks * self.stripe_groups
+                block_size = min(self.block_size, max(MIN_BLOCK_SIZE, -(-file_size // stripe_bytes)))
+                layout = _Layout(block_size, self.data_blocks, self.stripe_groups, file_size)
+                
+                header = HEADER.pack(MAGIC, block_size, self.data_blocks, self.stripe_groups, file_size,
+                                     layout.block_count)
+                data_sums = bytearray()
+                parity_sums = bytearray()
+                
+                buffer = bytearray(block_size)
+                view = memoryview(buffer)
+                accumulators = [bytearray(block_size) for _ in range(self.stripe_groups)]
+                outfile.seek(layout.parity_offset)
+                
+                for index in range(layout.block_count):
+                    length = layout.block_length(index)
+                    count = infile.readinto(view[:length])
+                    if count != length:
+                        raise ValueError("Arquivo alterado durante a geração da paridade")
+                    
+                    data_sums += _checksum(view[:length])
+                    _xor_into(accumulators[layout.group_of(index) % self.stripe_groups], view[:length])
+                    
+                    # Fim da faixa: grava os blocos de paridade e zera os acumuladores
+                    if (index + 1) % layout.stripe_blocks == 0 or index + 1 == layout.block_count:
+                        for accumulator in accumulators[:layout.groups_in(index // layout.stripe_blocks)]:
+                            parity_sums += _checksum(accumulator)
+                            outfile.write(accumulator)
+                            accumulator[:] = bytes(block_size)
+                
+                tables = header + data_sums + parity_sums
+                outfile.seek(0)
+                outfile.write(tables + hashlib.blake2b(tables, digest_size=DIGEST_SIZE).digest())
+                outfile.flush()
+                os.fsync(outfile.fileno())
+            
+            os.replace(temp_path, target)
+            return layout.parity_offset + layout.parity_count * block_size
+        
+        except Exception as e:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise Exception(f"Erro ao gerar paridade de {os.path.basename(path)}: {e}")
+    
+    @staticmethod
+    def _read_tables(parity_file):
+        """Lê e valida cabeçalho e tabelas de checksums do arquivo de paridade"""
+        header = parity_file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError("Arquivo de paridade incompleto")
+        
+        magic, block_size, data_blocks, stripe_groups, file_size, block_count = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("Arquivo de paridade inválido")
+        
+        layout = _Layout(block_size, data_blocks, stripe_groups, file_size)
+        if layout.block_count != block_count:
+            raise ValueError("Arquivo de paridade inconsistente")
+        
+        tables = parity_file.read(layout.digest_offset - HEADER.size)
+        digest = parity_file.read(DIGEST_SIZE)
+        if hashlib.blake2b(header + tables, digest_size=DIGEST_SIZE).digest() != digest:
+            raise ValueError("Tabelas do arquivo de paridade danificadas")
+        
+        split = block_count * CHECKSUM_SIZE
+        return layout, tables[:split], tables[split:]
+    
+    @staticmethod
+    def check(path):
+        """
+        Confere os blocos de um arquivo contra o arquivo de paridade
+        
+        Args:
+            path (str): Arquivo criptografado
+        
+        Returns:
+            dict: "ok", "bad_blocks", "bad_parity", "size_ok" e "repairable"
+        """
+        path = os.fspath(path)
+        
+        with open(parity_path(path), 'rb') as parity_file:
+            layout, data_sums, parity_sums = ParityCodec._read_tables(parity_file)
+            
+            bad_parity = []
+            for group in range(layout.parity_count):
+                block = parity_file.read(layout.block_size)
+                if _checksum(block) != parity_sums[group * CHECKSUM_SIZE:(group + 1) * CHECKSUM_SIZE]:
+                    bad_parity.append(group)
+        
+        bad_blocks = []
+        with open(path, 'rb') as infile:
+            size_ok = os.fstat(infile.fileno()).st_size == layout.file_size
+            
+            for index in range(layout.block_count):
+                length = layout.block_length(index)
+                block = infile.read(length)
+                if len(block) != length or _checksum(block) != data_sums[index * CHECKSUM_SIZE:(index + 1) * CHECKSUM_SIZE]:
+                    bad_blocks.append(index)
+        
+        damaged_groups = {}
+        for index in bad_blocks:
+            group = layout.group_of(index)
+            damaged_groups[group] = damaged_groups.get(group, 0) + 1
+        
+        repairable = all(count == 1 and group not in bad_parity for group, count in damaged_groups.items())
+        
+        return {"ok": not bad_blocks and not bad_parity and size_ok, "bad_blocks": bad_blocks,
+                "bad_parity": bad_parity, "size_ok": size_ok, "repairable": repairable}
+    
+    def repair(self, path):
+        """
+        Reconstrói os blocos danificados a partir da paridade, no próprio arquivo
+        
+        Se apenas a paridade estiver danificada, o arquivo de paridade é
+        gerado novamente.
+        
+        Args:
+            path (str): Arquivo criptografado
+        
+        Returns:
+            dict: Resultado de check antes do reparo, mais "repaired"
+            (blocos reconstruídos)
+        """
+        path = os.fspath(path)
+        
+        try:
+            result = self.check(path)
+            result["repaired"] = 0
+            
+            if result["ok"]:
+                return result
+            if not result["repairable"]:
+                raise ValueError(f"{len(result['bad_blocks'])} bloco(s) danificado(s) além da capacidade da paridade")
+            
+            with open(parity_path(path), 'rb') as parity_file:
+                layout, _, _ = self._read_tables(parity_file)
+                
+                with open(path, 'r+b') as target:
+                    fd = target.fileno()
+                    
+                    for index in result["bad_blocks"]:
+                        group = layout.group_of(index)
+                        block = bytearray(os.pread(parity_file.fileno(), layout.block_size,
+                                                   layout.parity_offset + group * layout.block_size))
+                        
+                        for member in layout.members(group):
+                            if member != index:
+                                _xor_into(block, os.pread(fd, layout.block_length(member),
+                                                          member * layout.block_size))
+                        
+                        os.pwrite(fd, block[:layout.block_length(index)], index * layout.block_size)
+                        result["repaired"] += 1
+                    
+                    target.truncate(layout.file_size)
+                    os.fsync(fd)
+            
+            if result["bad_parity"]:
+                self.create(path)
+            
+            return result
+        
+        except Exception as e:
+            raise Exception(f"Erro ao reparar {os.path.basename(path)}: {e}")
+    
+    def protect_files(self, paths, engine=None):
+        """
+        Gera a paridade de vários arquivos em paralelo
+        
+        Args:
+            paths (list): Arquivos criptografados
+            engine (BatchEngine): Motor de lote (padrão: novo BatchEngine)
+        
+        Returns:
+            dict: "files", "data_bytes", "parity_bytes" e "failed" (lista de (caminho, erro))
+        """
+        from .batch_engine import BatchEngine
+        
+        engine = engine or BatchEngine()
+        summary = {"files": 0, "data_bytes": 0, "parity_bytes": 0, "failed": []}
+        
+        for path, result, error in engine.run(list(paths), lambda path: (os.path.getsize(path), self.create(path))):
+            if error is not None:
+                summary["failed"].append((path, str(error)))
+            else:
+                summary["files"] += 1
+                summary["data_bytes"] += result[0]
+                summary["parity_bytes"] += result[1]
+        
+        return summary
\ No newline at end of file
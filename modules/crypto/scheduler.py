@@ -0,0 +1,95 @@
+"""
+Módulo de agendamento de trabalho
+Ordena os arquivos de um lote por tamanho ou por faixas de prioridade por
+extensão e separa os arquivos grandes o bastante para serem divididos
+"""
+
+import os
+
+LARGEST_FIRST = "largest_first"
+TIERS = "tiers"
+NAME = "name"
+
+STRATEGIES = {
+    LARGEST_FIRST: "Maiores primeiro (melhor balanceamento)",
+    TIERS: "Por tipo: documentos, imagens e depois mídia",
+    NAME: "Ordem alfabética"
+}
+
+DEFAULT_TIERS = [
+    {'.txt', '.doc', '.docx', '.pdf', '.xls', '.xlsx', '.ppt', '.pptx', '.csv', '.json', '.xml', '.md'},
+    {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp'},
+    {'.mp3', '.wav', '.flac', '.mp4', '.avi', '.mkv', '.mov'}
+]
+
+class WorkScheduler:
+    """Define a ordem em que os arquivos de um lote são processados"""
+    
+    def __init__(self, strategy=LARGEST_FIRST, tiers=None):
+        """
+        Inicializa o agendador
+        
+        Args:
+            strategy (str): LARGEST_FIRST, TIERS ou NAME
+            tiers (list): Conjuntos de extensões, do mais prioritário ao menos
+                (extensões fora das faixas vêm depois de todas)
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Estratégia de agendamento desconhecida: {strategy}")
+        
+        self.strategy = strategy
+        self.tiers = tiers if tiers is not None else DEFAULT_TIERS
+    
+    def tier_of(self, path):
+        """
+        Retorna a faixa de prioridade de um arquivo pela extensão
+        
+        Args:
+            path (str): Caminho do arquivo
+        
+        Returns:
+            int: Índice da faixa (menor = mais prioritário)
+        """
+        extension = os.path.splitext(str(path))[1].lower()
+        
+        for tier, extensions in enumerate(self.tiers):
+            if extension in extensions:
+                return tier
+        
+        return len(self.tiers)
+    
+    def priority(self, path, size):
+        """
+        Chave de ordenação de um arquivo (menor = processado antes)
+        
+        Args:
+            path (str): Caminho do arquivo
+            size (int): Tamanho em bytes
+        
+        Returns:
+            tuple: Chave comparável
+        """
+        if self.strategy == LARGEST_FIRST:
+            return (-size, str(path))
+        if self.strategy == TIERS:
+            # Dentro de cada faixa, os maiores primeiro para equilibrar os workers
+            return (self.tier_of(path), -size, str(path))
+        
+        return (str(path),)
+    
+    def order(self, paths, sizes):
+        """
+        Ordena os arquivos conforme a estratégia
+        
+        Args:
+            paths (list): Caminhos dos arquivos
+            sizes (dict): Caminho -> tamanho
+        
+        Returns:
+            list: Caminhos na ordem de processamento
+        """
+        return sorted(paths, key=lambda path: self.priority(path, sizes.get(path, 0)))
+    
+    def describe(self):
+        """Descrição legível da estratégia atual"""
+        return STRATEGIES[self.strategy]
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+Módulo de arquivos esparsos
+Localiza trechos com dados (SEEK_DATA/SEEK_HOLE) para que os buracos não
+sejam lidos, criptografados nem gravados, e os recria na restauração
+"""
+
+import errno
+import os
+
+ZERO_BLOCK = bytes(1024 * 1024)
+
+def is_probably_sparse(stat_result):
+    """
+    Indica se o arquivo ocupa menos blocos do que seu tamanho (possui buracos)
+    
+    Args:
+        stat_result (os.stat_result): Resultado de os.stat/os.fstat
+    
+    Returns:
+        bool: True se o arquivo possivelmente for esparso
+    """
+    blocks = getattr(stat_result, "st_blocks", None)
+    return blocks is not None and blocks * 512 < stat_result.st_size
+
+def find_data_extents(fd, size):
+    """
+    Lista os trechos com dados de um arquivo
+    
+    Args:
+        fd (int): Descritor do arquivo aberto
+        size (int): Tamanho do arquivo
+    
+    Returns:
+        list: Lista de [offset, tamanho], ou None se o sistema não suportar SEEK_DATA
+    """
+    if not hasattr(os, "SEEK_DATA"):
+        return None
+    
+    extents = []
+    offset = 0
+    
+    try:
+        while offset < size:
+            try:
+                start = os.lseek(fd, offset, os.SEEK_DATA)
+            except OSError as e:
+                if e.errno == errno.ENXIO:  # Não há mais dados até o fim do arquivo
+                    break
+                raise
+            
+            end = min(os.lseek(fd, start, os.SEEK_HOLE), size)
+            extents.append([start, end - start])
+            offset = end
+    
+    except OSError as e:
+        if e.errno in (errno.EINVAL, errno.EOPNOTSUPP):
+            return None
+        raise
+    
+    finally:
+        os.lseek(fd, 0, os.SEEK_SET)
+    
+    return extents
+
+def hash_zeros(hasher, count):
+    """Alimenta o hash com zeros no lugar de um buraco, sem ler o disco"""
+    if hasher is None:
+        return
+    
+    view = memoryview(ZERO_BLOCK)
+    
+    while count > 0:
+        step = min(count, len(ZERO_BLOCK))
+        hasher.update(view[:step])
+        count -= step
+
+class ExtentReader:
+    """
+    Leitor (com readinto) apenas dos trechos com dados de um arquivo esparso
+    
+    Os buracos entram no hash como zeros, para que o hash seja igual ao de
+    uma leitura completa do arquivo. Cada leitura para no fim do trecho atual,
+    de modo que o chamador atualize o hash com os dados antes dos zeros do
+    buraco seguinte.
+    """
+    
+    def __init__(self, infile, extents, size, hasher):
+        """
+        Args:
+            infile: Arquivo original aberto em modo binário
+            extents (list): Trechos [offset, tamanho] com dados
+            size (int): Tamanho lógico do arquivo
+            hasher: Objeto do hashlib que recebe os zeros dos buracos (ou None)
+        """
+        self.infile = infile
+        self.extents = iter(extents)
+        self.size = size
+        self.hasher = hasher
+        self.position = 0
+        self.remaining = 0
+    
+    def readinto(self, buffer):
+        while self.remaining == 0:
+            extent = next(self.extents, None)
+            if extent is None:
+                return 0
+            
+            offset, self.remaining = extent
+            hash_zeros(self.hasher, offset - self.position)
+            self.infile.seek(offset)
+            self.position = offset + self.remaining
+        
+        view = memoryview(buffer)[:self.remaining]
+        count = self.infile.readinto(view)
+        if not count:
+            raise ValueError("Arquivo alterado durante a leitura")
+        
+        self.remaining -= count
+        return count
+    
+    def finish(self):
+        """Conclui o hash com os zeros do buraco final"""
+        hash_zeros(self.hasher, self.size - self.position)
+        self.position = self.size
+
+class ExtentWriter:
+    """Grava dados sequenciais nos offsets dos trechos, deixando buracos entre eles"""
+    
+    def __init__(self, outfile, extents):
+        """
+        Args:
+            outfile: Destino aberto em modo binário (com suporte a seek)
+            extents (list): Trechos [offset, tamanho] com dados
+        """
+        self.outfile = outfile
+        self.extents = iter(extents)
+        self.remaining = 0
+    
+    def write(self, data):
+        view = memoryview(data)
+        
+        while view:
+            if self.remaining == 0:
+                offset, self.remaining = next(self.extents)
+                self.outfile.seek(offset)
+            
+            step = min(self.remaining, len(view))
+            self.outfile.write(view[:step])
+            self.remaining -= step
+            view = view[step:]
+        
+        return len(data)
+    
+    def finish(self, size):
+        """
+        Recria o buraco final, estendendo o destino até o tamanho lógico
+        
+        Args:
+            size (int): Tamanho lógico do arquivo
+        """
+        end = self.outfile.seek(0, os.SEEK_END)
+        if end >= size:
+            return
+        
+        try:
+            self.outfile.truncate(size)
+        except (AttributeError, OSError):
+            pass
+        
+        # Destinos em memória (BytesIO) não crescem com truncate
+        if self.outfile.seek(0, os.SEEK_END) < size:
+            self.outfile.seek(size - 1)
+            self.outfile.write(b"\0")
\ No newline at end of file
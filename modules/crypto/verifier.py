@@ -0,0 +1,105 @@
+"""
+Módulo de verificação de integridade
+Confere backups criptografados sem gravar o conteúdo descriptografado e
+repara pela paridade os arquivos danificados que a possuem
+"""
+
+import os
+
+from .batch_engine import BatchEngine
+from .parity import has_parity
+
+class BackupVerifier:
+    """Classe para verificação paralela de pastas de backup"""
+    
+    def __init__(self, aes_handler, engine=None, parity=None):
+        """
+        Inicializa o verificador
+        
+        Args:
+            aes_handler (AESHandler): Handler com a chave do backup
+            engine (BatchEngine): Motor de lote usado na verificação paralela
+            parity (ParityCodec): Se informado, arquivos com falha que possuem
+                arquivo de paridade são reparados e verificados novamente
+        """
+        self.aes_handler = aes_handler
+        self.engine = engine or BatchEngine()
+        self.parity = parity
+    
+    def find_encrypted_files(self, folder):
+        """
+        Lista os arquivos criptografados de uma pasta de backup
+        
+        Args:
+            folder (Path): Pasta do backup
+        
+        Returns:
+            list: Caminhos dos arquivos criptografados, ordenados
+        """
+        with os.scandir(folder) as entries:
+            files = [entry.path for entry in entries
+                     if entry.is_file() and entry.name.endswith('.encrypted')]
+        
+        files.sort()
+        return files
+    
+    def verify_folder(self, folder, on_result=None):
+        """
+        Verifica todos os arquivos criptografados de uma pasta
+        
+        Args:
+            folder (Path): Pasta do backup
+            on_result (callable): Chamada a cada arquivo verificado com
+                (resultado, concluídos, total)
+        
+        Returns:
+            dict: Resumo com "total", "ok", "original_bytes", "repaired" e
+            "failed" (lista de resultados)
+        """
+        files = self.find_encrypted_files(folder)
+        
+        def report(item, result, error, done, total):
+            if on_result:
+                on_result(result, done, total)
+        
+        outcomes = self.engine.run(files, self._verify, report)
+        
+        summary = {"total": len(files), "ok": 0, "original_bytes": 0, "repaired": 0, "failed": []}
+        
+        for _, result, _ in outcomes:
+            if result["ok"]:
+                summary["ok"] += 1
+                summary["original_bytes"] += result["original_size"]
+                summary["repaired"] += bool(result.get("repaired"))
+            else:
+                summary["failed"].append(result)
+        
+        summary["failed"].sort(key=lambda r: r["path"])
+        return summary
+    
+    def _verify(self, file_path):
+        """Verifica um arquivo e, se falhar, tenta repará-lo pela paridade"""
+        result = self._verify_once(file_path)
+        
+        if result["ok"] or self.parity is None or not has_parity(file_path):
+            return result
+        
+        try:
+            repair = self.parity.repair(file_path)
+        except Exception as e:
+            result["error"] = f"{result['error']} ({e})"
+            return result
+        
+        if not repair["repaired"]:
+            return result
+        
+        result = self._verify_once(file_path)
+        result["repaired"] = repair["repaired"]
+        return result
+    
+    def _verify_once(self, file_path):
+        """Verifica um arquivo convertendo qualquer exceção em resultado de falha"""
+        try:
+            return self.aes_handler.verify_file(file_path)
+        except Exception as e:
+            return {"path": str(file_path), "ok": False, "original_size": None, "error": str(e)}
\ No newline at end of file
@@ -13,6 +13,8 @@ class FileManager:
     
     def __init__(self):
         self.current_dir = Path.cwd()
+        self._retention = None
+        self._scan_cache = None
         self.supported_extensions = {
             '.txt', '.doc', '.docx', '.pdf', '.jpg', '.jpeg', '.png', '.gif',
             '.mp4', '.avi', '.mp3', '.wav', '.zip', '.rar', '.xlsx', '.xls',
@@ -20,6 +22,14 @@ class FileManager:
             '.csv', '.encrypted'  # Incluindo arquivos já criptografados
         }
     
+    @property
+    def retention(self):
+        """Motor de retenção, criado apenas quando usado pela primeira vez"""
+        if self._retention is None:
+            from .retention import RetentionEngine
+            self._retention = RetentionEngine(self.current_dir)
+        return self._retention
+    
     def get_source_folder(self):
         """
         Obtém a pasta de origem dos arquivos a serem processados
@@ -56,6 +66,42 @@ class FileManager:
             else:
                 print("Opção inválida!")
     
+    def scan_inventory(self, folder_path, recursive=False):
+        """
+        Escaneia uma pasta e retorna o inventário compacto dos arquivos suportados
+        
+        Args:
+            folder_path (Path): Caminho da pasta a ser escaneada
+            recursive (bool): Se True, inclui subpastas
+            
+        Returns:
+            FileInventory: Inventário ordenado pelo caminho
+        """
+        from .inventory import FileInventory
+        
+        return FileInventory.scan(folder_path, self.supported_extensions, recursive)
+    
+    @property
+    def scan_cache(self):
+        """Cache de inventários, criado apenas quando usado pela primeira vez"""
+        if self._scan_cache is None:
+            from .scan_cache import ScanCache
+            self._scan_cache = ScanCache(self.scan_inventory)
+        return self._scan_cache
+    
+    def get_inventory(self, folder_path, recursive=False):
+        """
+        Obtém o inventário de uma pasta reaproveitando o último escaneamento
+        
+        Args:
+            folder_path (Path): Caminho da pasta
+            recursive (bool): Se True, inclui subpastas
+            
+        Returns:
+            FileInventory: Inventário da pasta
+        """
+        return self.scan_cache.get(folder_path, recursive)
+    
     def scan_folder(self, folder_path, silent=False):
         """
         Escaneia uma pasta em busca de arquivos suportados
@@ -67,35 +113,53 @@ class FileManager:
         Returns:
             list: Lista de caminhos dos arquivos encontrados
         """
-        files_found = []
-        
         try:
-            for item in folder_path.iterdir():
-                if item.is_file() and item.suffix.lower() in self.supported_extensions:
-                    files_found.append(str(item))
-            
-            # Ordena os arquivos por nome
-            files_found.sort()
+            inventory = self.scan_inventory(folder_path)
             
             if not silent:
                 print(f"\n📋 ARQUIVOS ENCONTRADOS")
                 print("-" * 25)
                 
-                if files_found:
-                    for i, file_path in enumerate(files_found, 1):
-                        file_size = self._format_file_size(Path(file_path).stat().st_size)
-                        print(f"{i:2d}. {Path(file_path).name} ({file_size})")
+                if len(inventory):
+                    for i in range(len(inventory)):
+                        file_size = self._format_file_size(inventory.sizes[i])
+                        print(f"{i + 1:2d}. {inventory.names[i]} ({file_size})")
                 else:
                     print("Nenhum arquivo suportado encontrado.")
                     print(f"Extensões suportadas: {', '.join(sorted(self.supported_extensions))}")
             
-            return files_found
+            return inventory.paths()
             
         except Exception as e:
             if not silent:
                 print(f"Erro ao escanear pasta: {e}")
             return []
     
+    def _create_unique_folder(self, prefix):
+        """
+        Cria uma pasta nova com a data e hora no nome
+        
+        Operações iniciadas no mesmo segundo recebem pastas próprias (sufixos
+        _2, _3...): uma pasta já existente nunca é reaproveitada.
+        
+        Args:
+            prefix (str): Início do nome da pasta
+        
+        Returns:
+            Path: Pasta criada
+        """
+        name = f"{prefix}{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        folder = self.current_dir / name
+        suffix = 1
+        
+        while True:
+            try:
+                folder.mkdir()
+                return folder
+            except FileExistsError:
+                suffix += 1
+                folder = self.current_dir / f"{name}_{suffix}"
+    
     def create_backup_folder(self):
         """
         Cria uma pasta de backup para arquivos criptografados
@@ -103,11 +167,8 @@ class FileManager:
         Returns:
             Path: Caminho da pasta de backup criada
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_folder = self.current_dir / f"encrypted_backup_{timestamp}"
-        
         try:
-            backup_folder.mkdir(exist_ok=True)
+            backup_folder = self._create_unique_folder("encrypted_backup_")
             print(f"\n📂 Pasta de backup criada: {backup_folder}")
             return backup_folder
             
@@ -121,17 +182,29 @@ class FileManager:
         Returns:
             Path: Caminho da pasta de descriptografia criada
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        decrypted_folder = self.current_dir / f"decrypted_files_{timestamp}"
-        
         try:
-            decrypted_folder.mkdir(exist_ok=True)
+            decrypted_folder = self._create_unique_folder("decrypted_files_")
             print(f"\n📂 Pasta de descriptografia criada: {decrypted_folder}")
             return decrypted_folder
             
         except Exception as e:
             raise Exception(f"Erro ao criar pasta de descriptografia: {e}")
     
+    def list_backup_folders(self):
+        """
+        Lista as pastas de backup criptografado da pasta atual
+        
+        Returns:
+            list: Pastas de backup, da mais recente para a mais antiga
+        """
+        backup_folders = [
+            item for item in self.current_dir.iterdir()
+            if item.is_dir() and item.name.startswith('encrypted_backup_')
+        ]
+        
+        backup_folders.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+        return backup_folders
+    
     def _list_subdirectories(self, path):
         """Lista subdiretórios de uma pasta"""
         try:
@@ -195,30 +268,37 @@ class FileManager:
         except Exception as e:
             return {"error": f"Erro ao obter estatísticas: {e}"}
     
-    def clean_old_backups(self, max_backups=5):
+    def clean_old_backups(self, max_backups=5, policy=None, background=False):
         """
-        Remove backups antigos mantendo apenas os mais recentes
+        Remove backups antigos conforme a política de retenção
         
         Args:
-            max_backups (int): Número máximo de backups a manter
+            max_backups (int): Número máximo de backups a manter (sem política)
+            policy (RetentionPolicy): Política de retenção (opcional)
+            background (bool): Se True, não aguarda a remoção dos arquivos
+            
+        Returns:
+            list: Entradas do catálogo removidas
         """
+        from .retention import RetentionPolicy
+        
         try:
-            backup_folders = []
-            
-            # Encontra todas as pastas de backup
-            for item in self.current_dir.iterdir():
-                if item.is_dir() and item.name.startswith('encrypted_backup_'):
-                    backup_folders.append(item)
-            
-            # Ordena por data de modificação (mais recente primeiro)
-            backup_folders.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-            
-            # Remove backups excedentes
-            if len(backup_folders) > max_backups:
-                for old_backup in backup_folders[max_backups:]:
-                    print(f"Removendo backup antigo: {old_backup.name}")
-                    import shutil
-                    shutil.rmtree(old_backup)
+            policy = policy or RetentionPolicy(keep_last=max_backups)
+            _, removed = self.retention.plan(policy)
+            
+            for old_backup in removed:
+                print(f"Removendo backup antigo: {old_backup['path'].name}")
+            
+            futures = self.retention.apply(removed, background=background)
+            
+            if not background:
+                for backup, future in zip(removed, futures):
+                    if future.exception() is not None:
+                        print(f"Aviso: Erro ao remover {backup['path'].name}: {future.exception()}")
+                removed = [backup for backup, future in zip(removed, futures) if future.exception() is None]
+            
+            return removed
                     
         except Exception as e:
-            print(f"Aviso: Erro ao limpar backups antigos: {e}")
\ No newline at end of file
+            print(f"Aviso: Erro ao limpar backups antigos: {e}")
+            return []
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Módulo de inventário de arquivos
+Inventário compacto em colunas (arrays de tamanhos, datas e ids de pasta)
+compartilhado pelos menus e pelos processamentos em lote
+"""
+
+import os
+import sys
+from array import array
+
+class FileInventory:
+    """Inventário de arquivos armazenado em colunas, com pastas internadas"""
+    
+    __slots__ = ("directories", "_directory_ids", "dir_ids", "names", "sizes", "mtimes", "flags")
+    
+    ENCRYPTED = 1
+    
+    def __init__(self):
+        self.directories = []
+        self._directory_ids = {}
+        self.dir_ids = array('I')
+        self.names = []
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.flags = bytearray()
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def _directory_id(self, directory):
+        """Retorna o id da pasta, registrando-a na primeira ocorrência"""
+        directory_id = self._directory_ids.get(directory)
+        
+        if directory_id is None:
+            directory_id = len(self.directories)
+            self.directories.append(sys.intern(directory))
+            self._directory_ids[directory] = directory_id
+        
+        return directory_id
+    
+    def add(self, directory, name, size, mtime):
+        """
+        Adiciona um arquivo ao inventário
+        
+        Args:
+            directory (str): Pasta do arquivo
+            name (str): Nome do arquivo
+            size (int): Tamanho em bytes
+            mtime (float): Data de modificação
+        """
+        self.dir_ids.append(self._directory_id(directory))
+        self.names.append(name)
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+        self.flags.append(self.ENCRYPTED if name.endswith('.encrypted') else 0)
+    
+    def path(self, index):
+        """
+        Monta o caminho completo de um arquivo
+        
+        Args:
+            index (int): Posição do arquivo no inventário
+        
+        Returns:
+            str: Caminho do arquivo
+        """
+        return os.path.join(self.directories[self.dir_ids[index]], self.names[index])
+    
+    def is_encrypted(self, index):
+        """Indica se o arquivo na posição informada é criptografado"""
+        return self.flags[index] == self.ENCRYPTED
+    
+    def indices(self, encrypted=None):
+        """
+        Seleciona posições do inventário
+        
+        Args:
+            encrypted (bool): True para criptografados, False para normais, None para todos
+        
+        Returns:
+            array: Posições selecionadas
+        """
+        if encrypted is None:
+            return array('L', range(len(self)))
+        
+        wanted = self.ENCRYPTED if encrypted else 0
+        return array('L', (i for i, flag in enumerate(self.flags) if flag == wanted))
+    
+    def count(self, encrypted=None):
+        """
+        Conta arquivos sem materializar listas
+        
+        Args:
+            encrypted (bool): True para criptografados, False para normais, None para todos
+        
+        Returns:
+            int: Quantidade de arquivos
+        """
+        if encrypted is None:
+            return len(self)
+        
+        encrypted_count = self.flags.count(self.ENCRYPTED)
+        return encrypted_count if encrypted else len(self) - encrypted_count
+    
+    def paths(self, indices=None):
+        """
+        Gera a lista de caminhos para as operações que precisam de caminhos
+        
+        Args:
+            indices (iterable): Posições desejadas (None para todas)
+        
+        Returns:
+            list: Caminhos dos arquivos
+        """
+        if indices is None:
+            indices = range(len(self))
+        
+        return [self.path(i) for i in indices]
+    
+    def total_size(self, indices=None):
+        """
+        Soma o tamanho dos arquivos
+        
+        Args:
+            indices (iterable): Posições desejadas (None para todas)
+        
+        Returns:
+            int: Tamanho total em bytes
+        """
+        if indices is None:
+            return sum(self.sizes)
+        
+        return sum(self.sizes[i] for i in indices)
+    
+    def sort(self):
+        """Ordena o inventário pelo caminho dos arquivos"""
+        order = sorted(range(len(self)),
+                       key=lambda i: (self.directories[self.dir_ids[i]], self.names[i]))
+        
+        self.dir_ids = array('I', (self.dir_ids[i] for i in order))
+        self.names = [self.names[i] for i in order]
+        self.sizes = array('q', (self.sizes[i] for i in order))
+        self.mtimes = array('d', (self.mtimes[i] for i in order))
+        self.flags = bytearray(self.flags[i] for i in order)
+    
+    @classmethod
+    def scan(cls, folder, extensions=None, recursive=False, exclude=None):
+        """
+        Escaneia uma pasta com os.scandir, com um único stat por arquivo
+        
+        Args:
+            folder (Path): Pasta a ser escaneada
+            extensions (set): Extensões aceitas (None aceita todas)
+            recursive (bool): Se True, inclui subpastas
+            exclude (set): Caminhos absolutos de subpastas ignoradas (opcional)
+        
+        Returns:
+            FileInventory: Inventário ordenado pelo caminho
+        """
+        inventory = cls()
+        pending = [os.fspath(folder)]
+        
+        while pending:
+            directory = pending.pop()
+            
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and not (exclude and os.path.abspath(entry.path) in exclude):
+                            pending.append(entry.path)
+                        continue
+                    
+                    if not entry.is_file():
+                        continue
+                    
+                    if extensions is not None and os.path.splitext(entry.name)[1].lower() not in extensions:
+                        continue
+                    
+                    stat = entry.stat()
+                    inventory.add(directory, entry.name, stat.st_size, stat.st_mtime)
+        
+        inventory.sort()
+        return inventory
\ No newline at end of file
@@ -0,0 +1,338 @@
+"""
+Módulo de manifesto de backup
+Registra, para cada arquivo original, onde foi salvo, seu tamanho e seu hash
+
+Com a chave de dados do backup, o manifesto é gravado criptografado e os
+arquivos salvos recebem nomes aleatórios: os nomes reais só existem dentro
+do manifesto, que é lido e descriptografado de uma vez para listagem e
+restauração.
+"""
+
+import json
+import os
+from pathlib import Path, PurePosixPath, PureWindowsPath
+
+class BackupManifest:
+    """Classe para o manifesto de uma pasta de backup"""
+    
+    MANIFEST_NAME = "backup.manifest"
+    MANIFEST_VERSION = 1
+    ENCRYPTED_MAGIC = b"BKMANIF1"
+    STORED_SUFFIX = ".encrypted"
+    
+    def __init__(self, entries=None):
+        """
+        Inicializa o manifesto
+        
+        Args:
+            entries (dict): Entradas existentes, indexadas pelo nome original
+        """
+        self.entries = entries or {}
+        self._stored_index = None
+    
+    @classmethod
+    def new_stored_name(cls):
+        """
+        Gera um nome aleatório para um arquivo salvo, sem revelar o original
+        
+        Returns:
+            str: Nome do arquivo criptografado
+        """
+        return os.urandom(12).hex() + cls.STORED_SUFFIX
+    
+    def add_entry(self, name, stored_name, size, mtime, file_hash, hash_algorithm='sha256', **extra):
+        """
+        Registra um arquivo original no manifesto
+        
+        Args:
+            name (str): Nome do arquivo original
+            stored_name (str): Nome do arquivo (ou pacote) salvo no backup
+            size (int): Tamanho do original em bytes
+            mtime (float): Data de modificação do original
+            file_hash (str): Hash do original em hexadecimal
+            hash_algorithm (str): Algoritmo do hash
+            **extra: Campos adicionais da entrada
+        """
+        self._stored_index = None
+        self.entries[name] = dict(
+            extra,
+            stored_name=stored_name,
+            size=size,
+            mtime=mtime,
+            hash=file_hash,
+            hash_algorithm=hash_algorithm
+        )
+    
+    def get(self, name):
+        """
+        Obtém a entrada de um arquivo original
+        
+        Args:
+            name (str): Nome do arquivo original
+        
+        Returns:
+            dict: Entrada do manifesto ou None
+        """
+        return self.entries.get(name)
+    
+    def find_stored(self, stored_name):
+        """
+        Obtém a entrada pelo nome do arquivo salvo no backup
+        
+        Args:
+            stored_name (str): Nome do arquivo criptografado
+        
+        Returns:
+            dict: Entrada do manifesto, com o nome original em "name", ou None
+        """
+        if self._stored_index is None:
+            # Índice reverso montado uma vez, em memória
+            self._stored_index = {
+                entry.get("stored_name"): name
+                for name, entry in self.entries.items() if not entry.get("bundle")
+            }
+        
+        name = self._stored_index.get(stored_name)
+        return dict(self.entries[name], name=name) if name is not None else None
+    
+    def original_name(self, stored_name):
+        """
+        Retorna o nome original de um arquivo salvo
+        
+        Args:
+            stored_name (str): Nome do arquivo criptografado
+        
+        Returns:
+            str: Nome original, ou o nome salvo sem a extensão se não houver entrada
+        """
+        entry = self.find_stored(stored_name)
+        
+        if entry is not None:
+            return entry["name"]
+        
+        return stored_name[:-len(self.STORED_SUFFIX)] if stored_name.endswith(self.STORED_SUFFIX) else stored_name
+    
+    @staticmethod
+    def restore_path(output_folder, name):
+        """
+        Caminho de restauração de um arquivo, preservando as subpastas do nome
+        original (ex.: "origem/sub/arquivo.txt" de um backup de várias origens)
+        
+        A pasta do arquivo é criada se necessário. Nomes absolutos ou com ".."
+        são recusados, assim como destinos já existentes, para que um arquivo
+        restaurado nunca sobrescreva outro.
+        
+        Args:
+            output_folder (Path): Pasta de restauração
+            name (str): Nome original registrado no manifesto
+        
+        Returns:
+            Path: Caminho do arquivo a restaurar
+        """
+        path = PurePosixPath(name)
+        
+        if (path.is_absolute() or PureWindowsPath(name).drive or not path.parts
+                or any(part in ('.', '..') or '\\' in part for part in path.parts)):
+            raise ValueError(f"Nome inválido no manifesto: {name}")
+        
+        output_path = Path(output_folder).joinpath(*path.parts)
+        if os.path.lexists(output_path):
+            raise FileExistsError(f"Destino já existe, arquivo não restaurado: {output_path}")
+        
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        return output_path
+    
+    def diff(self, newer):
+        """
+        Compara este manifesto com o de um backup mais recente, sem ler o conteúdo
+        
+        Um arquivo é "modified" quando tamanho ou hash mudaram e "touched"
+        quando apenas a data de modificação mudou. Sem hash comparável
+        (algoritmos diferentes ou índices antigos), vale o tamanho.
+        
+        Args:
+            newer (BackupManifest): Manifesto do backup mais recente
+        
+        Returns:
+            dict: "added", "removed", "modified", "touched" (listas de nomes
+            ordenadas) e "unchanged" (quantidade)
+        """
+        old_names = self.entries.keys()
+        new_names = newer.entries.keys()
+        
+        result = {
+            "added": sorted(new_names - old_names),
+            "removed": sorted(old_names - new_names),
+            "modified": [],
+            "touched": [],
+            "unchanged": 0
+        }
+        
+        for name in sorted(old_names & new_names):
+            old, new = self.entries[name], newer.entries[name]
+            
+            same_hash = None
+            if old.get("hash") and new.get("hash") and old.get("hash_algorithm") == new.get("hash_algorithm"):
+                same_hash = old["hash"] == new["hash"]
+            
+            if old.get("size") != new.get("size") or same_hash is False:
+                result["modified"].append(name)
+            elif old.get("mtime") is not None and new.get("mtime") is not None and old["mtime"] != new["mtime"]:
+                result["touched"].append(name)
+            else:
+                result["unchanged"] += 1
+        
+        return result
+    
+    def browse(self, prefix=""):
+        """
+        Lista um nível do conteúdo, tratando "/" nos nomes como pastas
+        
+        Args:
+            prefix (str): Pasta a listar ("" para a raiz)
+        
+        Returns:
+            tuple: (subpastas, arquivos), subpastas como nomes e arquivos como
+            tuplas (nome, entrada), ambas ordenadas
+        """
+        prefix = prefix.strip("/")
+        start = prefix + "/" if prefix else ""
+        folders = set()
+        files = []
+        
+        for name, entry in self.entries.items():
+            if not name.startswith(start):
+                continue
+            
+            rest = name[len(start):]
+            folder, separator, _ = rest.partition("/")
+            
+            if separator:
+                folders.add(folder)
+            else:
+                files.append((rest, entry))
+        
+        files.sort()
+        return sorted(folders), files
+    
+    @classmethod
+    def from_headers(cls, folder):
+        """
+        Monta um índice a partir dos cabeçalhos, para backups sem manifesto
+        
+        Usa o nome salvo (sem a extensão) e o tamanho original do cabeçalho;
+        não há hash nem data de modificação. Pacotes são ignorados, pois o
+        índice deles só existe dentro do conteúdo criptografado.
+        
+        Args:
+            folder (Path): Pasta do backup
+        
+        Returns:
+            BackupManifest: Índice montado a partir dos cabeçalhos
+        """
+        from ..crypto.aes_handler import AESHandler
+        from ..crypto.bundle_handler import BundleHandler
+        
+        entries = {}
+        
+        with os.scandir(folder) as items:
+            for item in items:
+                if not item.name.endswith(cls.STORED_SUFFIX) or item.name.endswith(BundleHandler.BUNDLE_SUFFIX):
+                    continue
+                
+                info = AESHandler.get_file_info(item.path)
+                if "error" in info:
+                    continue
+                
+                entries[item.name[:-len(cls.STORED_SUFFIX)]] = {
+                    "stored_name": item.name,
+                    "size": info["original_size"],
+                    "mtime": None,
+                    "hash": None,
+                    "hash_algorithm": None
+                }
+        
+        return cls(entries)
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    @classmethod
+    def manifest_path(cls, folder):
+        """
+        Retorna o caminho do manifesto de uma pasta de backup
+        
+        Args:
+            folder (Path): Pasta do backup
+        
+        Returns:
+            Path: Caminho do manifesto
+        """
+        return Path(folder) / cls.MANIFEST_NAME
+    
+    @classmethod
+    def exists(cls, folder):
+        """
+        Verifica se a pasta de backup possui manifesto
+        
+        Args:
+            folder (Path): Pasta do backup
+        
+        Returns:
+            bool: True se o manifesto existir
+        """
+        return cls.manifest_path(folder).is_file()
+    
+    def save(self, folder, aes_handler=None):
+        """
+        Grava o manifesto na pasta de backup
+        
+        Args:
+            folder (Path): Pasta do backup
+            aes_handler (AESHandler): Se informado, o manifesto é gravado
+                criptografado com a chave do backup
+        """
+        try:
+            path = self.manifest_path(folder)
+            temp_path = path.with_name(path.name + ".tmp")
+            
+            data = json.dumps({"version": self.MANIFEST_VERSION, "files": self.entries},
+                              ensure_ascii=False, indent=None if aes_handler else 1).encode('utf-8')
+            
+            if aes_handler is not None:
+                data = self.ENCRYPTED_MAGIC + aes_handler.encrypt(data)
+            
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            
+            os.replace(temp_path, path)
+        
+        except Exception as e:
+            raise Exception(f"Erro ao salvar manifesto: {e}")
+    
+    @classmethod
+    def load(cls, folder, aes_handler=None):
+        """
+        Carrega o manifesto de uma pasta de backup (uma leitura e uma descriptografia)
+        
+        Args:
+            folder (Path): Pasta do backup
+            aes_handler (AESHandler): Handler com a chave do backup, necessário
+                para manifestos criptografados
+        
+        Returns:
+            BackupManifest: Manifesto carregado
+        """
+        try:
+            with open(cls.manifest_path(folder), 'rb') as f:
+                data = f.read()
+            
+            if data.startswith(cls.ENCRYPTED_MAGIC):
+                if aes_handler is None:
+                    raise ValueError("manifesto criptografado, informe a senha do backup")
+                data = aes_handler.decrypt(data[len(cls.ENCRYPTED_MAGIC):])
+            
+            return cls(json.loads(data.decode('utf-8')).get("files", {}))
+        
+        except Exception as e:
+            raise Exception(f"Erro ao carregar manifesto: {e}")
\ No newline at end of file
@@ -0,0 +1,226 @@
+"""
+Módulo de retenção de backups
+Políticas de retenção (últimos N, diários, semanais, mensais, limite de tamanho)
+e remoção paralela em segundo plano
+"""
+
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+BACKUP_PREFIX = "encrypted_backup_"
+PENDING_PREFIX = ".removendo_"
+
+class RetentionPolicy:
+    """Política de retenção de backups"""
+    
+    def __init__(self, keep_last=5, daily=0, weekly=0, monthly=0, max_total_size=None):
+        """
+        Inicializa a política
+        
+        Args:
+            keep_last (int): Quantidade de backups mais recentes sempre mantidos
+            daily (int): Quantidade de dias com um backup mantido por dia
+            weekly (int): Quantidade de semanas com um backup mantido por semana
+            monthly (int): Quantidade de meses com um backup mantido por mês
+            max_total_size (int): Tamanho total máximo (bytes) dos backups mantidos
+        """
+        self.keep_last = keep_last
+        self.daily = daily
+        self.weekly = weekly
+        self.monthly = monthly
+        self.max_total_size = max_total_size
+    
+    def describe(self):
+        """
+        Descreve a política em texto
+        
+        Returns:
+            str: Descrição legível da política
+        """
+        parts = [f"últimos {self.keep_last}"]
+        
+        if self.daily:
+            parts.append(f"{self.daily} diário(s)")
+        if self.weekly:
+            parts.append(f"{self.weekly} semanal(is)")
+        if self.monthly:
+            parts.append(f"{self.monthly} mensal(is)")
+        if self.max_total_size:
+            parts.append(f"até {self.max_total_size / (1024 ** 3):.1f} GB")
+        
+        return ", ".join(parts)
+
+class RetentionEngine:
+    """Classe para planejar e aplicar a retenção sobre o catálogo de backups"""
+    
+    def __init__(self, base_dir, max_workers=4):
+        """
+        Inicializa o motor de retenção
+        
+        Args:
+            base_dir (Path): Pasta onde ficam as pastas de backup
+            max_workers (int): Remoções executadas em paralelo
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        self.base_dir = Path(base_dir)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+    
+    def _backup_time(self, entry):
+        """Obtém a data do backup pelo nome da pasta (ou mtime, se fora do padrão)"""
+        # Pastas criadas no mesmo segundo têm sufixo (_2, _3...) após a data
+        timestamp = entry.name[len(BACKUP_PREFIX):len(BACKUP_PREFIX) + len("AAAAMMDD_HHMMSS")]
+        
+        try:
+            return datetime.strptime(timestamp, "%Y%m%d_%H%M%S")
+        except ValueError:
+            return datetime.fromtimestamp(entry.stat().st_mtime)
+    
+    def _folder_size(self, path):
+        """Soma o tamanho dos arquivos de uma pasta usando os.scandir"""
+        total = 0
+        stack = [path]
+        
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+        
+        return total
+    
+    def catalog(self, with_sizes=False):
+        """
+        Lista os backups existentes
+        
+        Args:
+            with_sizes (bool): Se True, calcula o tamanho de cada backup
+        
+        Returns:
+            list: Dicionários com "path", "time" e "size", do mais recente ao mais antigo
+        """
+        backups = []
+        
+        with os.scandir(self.base_dir) as entries:
+            for entry in entries:
+                if entry.is_dir() and entry.name.startswith(BACKUP_PREFIX):
+                    backups.append({
+                        "path": Path(entry.path),
+                        "time": self._backup_time(entry),
+                        "size": self._folder_size(entry.path) if with_sizes else None
+                    })
+        
+        backups.sort(key=lambda b: b["time"], reverse=True)
+        return backups
+    
+    def plan(self, policy):
+        """
+        Decide quais backups manter e quais remover
+        
+        Args:
+            policy (RetentionPolicy): Política de retenção
+        
+        Returns:
+            tuple: (mantidos, removidos), listas de entradas do catálogo
+        """
+        backups = self.catalog(with_sizes=policy.max_total_size is not None)
+        keep = set()
+        
+        for i, backup in enumerate(backups):
+            if i < policy.keep_last:
+                keep.add(i)
+        
+        # O backup mais recente nunca é removido, qualquer que seja a política
+        if backups:
+            keep.add(0)
+        
+        # Camadas: o backup mais recente de cada período, até a quantidade de períodos
+        tiers = [
+            (policy.daily, lambda t: t.strftime("%Y-%m-%d")),
+            (policy.weekly, lambda t: "%d-%02d" % t.isocalendar()[:2]),
+            (policy.monthly, lambda t: t.strftime("%Y-%m"))
+        ]
+        
+        for count, period_of in tiers:
+            seen = set()
+            for i, backup in enumerate(backups):
+                if len(seen) >= count:
+                    break
+                period = period_of(backup["time"])
+                if period not in seen:
+                    seen.add(period)
+                    keep.add(i)
+        
+        # Limite de tamanho: remove os mais antigos até caber (o mais recente sempre fica)
+        if policy.max_total_size is not None:
+            total = 0
+            for i, backup in enumerate(backups):
+                if i not in keep:
+                    continue
+                total += backup["size"]
+                if total > policy.max_total_size and i > 0:
+                    keep.discard(i)
+                    total -= backup["size"]
+        
+        kept = [b for i, b in enumerate(backups) if i in keep]
+        removed = [b for i, b in enumerate(backups) if i not in keep]
+        return kept, removed
+    
+    def _remove(self, path):
+        """
+        Remove uma pasta já renomeada para remoção
+        
+        Falhas são propagadas pelo future; a pasta continua com o prefixo de
+        remoção e é tentada de novo por purge_pending.
+        """
+        shutil.rmtree(path)
+        return path
+    
+    def apply(self, removed, background=True):
+        """
+        Remove os backups indicados
+        
+        Cada pasta é renomeada imediatamente (some do catálogo na hora) e a
+        remoção dos arquivos é feita em paralelo pelo pool de threads.
+        
+        Args:
+            removed (list): Entradas do catálogo a remover
+            background (bool): Se False, aguarda a conclusão das remoções
+        
+        Returns:
+            list: Futures das remoções, na ordem de removed (falhas ficam em
+            future.exception())
+        """
+        futures = []
+        
+        for backup in removed:
+            path = backup["path"]
+            pending = path.with_name(PENDING_PREFIX + path.name)
+            os.rename(path, pending)
+            futures.append(self.executor.submit(self._remove, pending))
+        
+        if not background:
+            from concurrent.futures import wait
+            wait(futures)
+        
+        return futures
+    
+    def purge_pending(self):
+        """
+        Conclui remoções interrompidas (pastas renomeadas e não apagadas)
+        
+        Returns:
+            list: Futures das remoções iniciadas
+        """
+        futures = []
+        
+        with os.scandir(self.base_dir) as entries:
+            for entry in entries:
+                if entry.is_dir() and entry.name.startswith(PENDING_PREFIX + BACKUP_PREFIX):
+                    futures.append(self.executor.submit(self._remove, entry.path))
+        
+        return futures
\ No newline at end of file
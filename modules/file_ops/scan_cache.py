@@ -0,0 +1,120 @@
+"""
+Módulo de cache de escaneamento
+Reaproveita o inventário de uma pasta enquanto o mtime da pasta não mudar
+"""
+
+import os
+import threading
+import time
+
+class ScanCache:
+    """Cache de inventários por pasta, validado pelo mtime da pasta"""
+    
+    def __init__(self, scanner, max_age=60.0):
+        """
+        Inicializa o cache
+        
+        Args:
+            scanner (callable): Função (pasta, recursivo) -> FileInventory
+            max_age (float): Idade (s) a partir da qual o inventário é atualizado
+                em segundo plano, mesmo com o mtime inalterado (None desativa)
+        """
+        self.scanner = scanner
+        self.max_age = max_age
+        self._entries = {}
+        self._refreshing = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, folder, recursive):
+        return (os.path.abspath(os.fspath(folder)), recursive)
+    
+    def _scan(self, key):
+        """Escaneia a pasta e grava o resultado no cache"""
+        folder, recursive = key
+        mtime = os.stat(folder).st_mtime_ns
+        inventory = self.scanner(folder, recursive)
+        
+        with self._lock:
+            self._entries[key] = (mtime, time.monotonic(), inventory)
+        
+        return inventory
+    
+    def get(self, folder, recursive=False):
+        """
+        Obtém o inventário de uma pasta, escaneando apenas se necessário
+        
+        O mtime da pasta muda quando arquivos são criados, removidos ou
+        renomeados; alterações de conteúdo são captadas pela atualização em
+        segundo plano após max_age segundos.
+        
+        Args:
+            folder (Path): Pasta a ser escaneada
+            recursive (bool): Se True, inclui subpastas
+        
+        Returns:
+            FileInventory: Inventário (possivelmente do cache)
+        """
+        key = self._key(folder, recursive)
+        
+        with self._lock:
+            cached = self._entries.get(key)
+            pending = self._refreshing.get(key)
+        
+        # Uma atualização em andamento é aguardada em vez de repetir o escaneamento
+        if cached is None and pending is not None:
+            pending.wait()
+            with self._lock:
+                cached = self._entries.get(key)
+        
+        if cached is not None:
+            mtime, scanned_at, inventory = cached
+            
+            if os.stat(key[0]).st_mtime_ns == mtime:
+                if self.max_age is not None and time.monotonic() - scanned_at > self.max_age:
+                    self.refresh_async(folder, recursive)
+                return inventory
+        
+        return self._scan(key)
+    
+    def refresh_async(self, folder, recursive=False):
+        """
+        Atualiza o inventário de uma pasta em uma thread de segundo plano
+        
+        Args:
+            folder (Path): Pasta a ser escaneada
+            recursive (bool): Se True, inclui subpastas
+        """
+        key = self._key(folder, recursive)
+        
+        with self._lock:
+            if key in self._refreshing:
+                return
+            done = self._refreshing[key] = threading.Event()
+        
+        def worker():
+            try:
+                self._scan(key)
+            except OSError:
+                self.invalidate(folder)
+            finally:
+                with self._lock:
+                    del self._refreshing[key]
+                done.set()
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def invalidate(self, folder=None):
+        """
+        Descarta inventários do cache
+        
+        Args:
+            folder (Path): Pasta a descartar (None descarta todas)
+        """
+        with self._lock:
+            if folder is None:
+                self._entries.clear()
+                return
+            
+            path = os.path.abspath(os.fspath(folder))
+            for key in [k for k in self._entries if k[0] == path]:
+                del self._entries[key]
\ No newline at end of file
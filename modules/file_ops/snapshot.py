@@ -0,0 +1,132 @@
+"""
+Módulo de captura consistente
+Detecta arquivos alterados durante a leitura (stat antes e depois), repete a
+leitura e, se o arquivo continuar mudando, lê de uma cópia reflink
+(copy-on-write) quando o sistema de arquivos permitir
+"""
+
+import os
+import time
+
+FICLONE = 0x40049409  # ioctl do Linux para clonar um arquivo (btrfs, XFS, ...)
+
+CONSISTENT = "consistent"
+RETRIED = "retried"
+SNAPSHOT = "snapshot"
+INCONSISTENT = "inconsistent"
+
+def stat_signature(stat_result):
+    """
+    Resume os campos do stat que mudam quando o arquivo é escrito
+    
+    Args:
+        stat_result (os.stat_result): Resultado de os.stat
+    
+    Returns:
+        tuple: (tamanho, mtime_ns, ctime_ns, inode)
+    """
+    return (stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ctime_ns, stat_result.st_ino)
+
+def reflink(source, destination):
+    """
+    Cria uma cópia copy-on-write (reflink) de um arquivo
+    
+    Args:
+        source (str): Arquivo original
+        destination (str): Cópia a ser criada
+    
+    Returns:
+        bool: True se a cópia foi criada; False se o sistema não suportar
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    
+    try:
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    
+    except OSError:
+        try:
+            os.remove(destination)
+        except OSError:
+            pass
+        return False
+
+class ConsistentCapture:
+    """Leitura consistente de arquivos que podem mudar durante o backup"""
+    
+    def __init__(self, max_retries=2, retry_delay=0.2, use_reflink=True):
+        """
+        Inicializa a captura consistente
+        
+        Args:
+            max_retries (int): Novas leituras quando o arquivo muda durante a leitura
+            retry_delay (float): Espera (s) antes de cada nova leitura
+            use_reflink (bool): Se True, tenta uma cópia reflink após as novas leituras
+        """
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.use_reflink = use_reflink
+    
+    def capture(self, path, read):
+        """
+        Executa uma leitura do arquivo e confere se ele mudou durante ela
+        
+        Cada arquivo é tratado de forma independente; as novas leituras e a
+        cópia reflink não bloqueiam os demais arquivos do backup.
+        
+        Args:
+            path (str): Arquivo original
+            read (callable): Função que recebe o caminho a ler e o indicador
+                "tolerant" e retorna o resultado (ex.: criptografa e devolve as
+                informações). Com tolerant=True, a leitura deve aceitar
+                mudanças de tamanho (usado apenas na última tentativa)
+        
+        Returns:
+            tuple: (resultado da última leitura, situação), sendo a situação
+            CONSISTENT, RETRIED, SNAPSHOT ou INCONSISTENT
+        """
+        path = os.fspath(path)
+        result, error = None, None
+        
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.retry_delay)
+            
+            before = stat_signature(os.stat(path))
+            
+            # Falhas causadas pela mudança (ex.: tamanho diferente) também geram nova leitura
+            try:
+                result, error = read(path, False), None
+            except Exception as e:
+                result, error = None, e
+            
+            if stat_signature(os.stat(path)) == before:
+                if error is not None:
+                    raise error
+                return result, CONSISTENT if attempt == 0 else RETRIED
+        
+        if self.use_reflink:
+            snapshot = self._snapshot(path)
+            
+            if snapshot is not None:
+                try:
+                    return read(snapshot, False), SNAPSHOT
+                finally:
+                    os.remove(snapshot)
+        
+        # Sem cópia reflink: guarda a última leitura e sinaliza a entrada
+        if error is not None:
+            result = read(path, True)
+        
+        return result, INCONSISTENT
+    
+    def _snapshot(self, path):
+        """Cria a cópia reflink ao lado do original (precisa do mesmo sistema de arquivos)"""
+        directory, name = os.path.split(path)
+        snapshot = os.path.join(directory, f".{name}.snapshot-{os.getpid()}-{time.monotonic_ns()}")
+        
+        return snapshot if reflink(path, snapshot) else None
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""
+Módulo de expressões cron
+Interpreta agendamentos no formato do cron (minuto hora dia mês dia-da-semana)
+e calcula a próxima execução
+"""
+
+from datetime import timedelta
+
+ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *"
+}
+
+# (nome, mínimo, máximo) de cada campo
+FIELDS = [
+    ("minuto", 0, 59),
+    ("hora", 0, 23),
+    ("dia", 1, 31),
+    ("mês", 1, 12),
+    ("dia da semana", 0, 7)
+]
+
+MAX_SEARCH_DAYS = 366 * 5  # Cobre 29/02, o caso que mais demora a se repetir
+
+def _parse_field(text, name, low, high):
+    """Converte um campo (ex.: "*/15", "1-5", "0,30") no conjunto de valores aceitos"""
+    values = set()
+    
+    for part in text.split(','):
+        range_text, _, step_text = part.partition('/')
+        
+        try:
+            step = int(step_text) if step_text else 1
+            
+            if range_text == '*':
+                start, end = low, high
+            elif '-' in range_text:
+                start, end = (int(value) for value in range_text.split('-', 1))
+            else:
+                start = int(range_text)
+                end = high if step_text else start
+        except ValueError:
+            raise ValueError(f"Campo {name} inválido: {part}")
+        
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"Campo {name} inválido: {part}")
+        
+        values.update(range(start, end + 1, step))
+    
+    return values
+
+class CronSchedule:
+    """Agendamento no formato do cron, com resolução de minutos"""
+    
+    def __init__(self, expression):
+        """
+        Interpreta a expressão
+        
+        Args:
+            expression (str): Cinco campos (ex.: "30 2 * * 1-5") ou um atalho
+                (@hourly, @daily, @weekly, @monthly, @yearly)
+        """
+        self.expression = expression.strip()
+        fields = ALIASES.get(self.expression, self.expression).split()
+        
+        if len(fields) != len(FIELDS):
+            raise ValueError(f"Agendamento inválido: {expression} (esperados 5 campos)")
+        
+        try:
+            parsed = [_parse_field(text, *field) for text, field in zip(fields, FIELDS)]
+        except ValueError as e:
+            raise ValueError(f"Agendamento inválido: {expression} ({e})")
+        
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {day % 7 for day in weekdays}  # 0 e 7 são domingo
+        
+        # Como no cron: com dia e dia da semana restritos, basta um deles conferir
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+    
+    def _day_matches(self, moment):
+        if moment.month not in self.months:
+            return False
+        
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        
+        if self._any_day:
+            return weekday_ok
+        if self._any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+    
+    def matches(self, moment):
+        """
+        Indica se o agendamento dispara no minuto informado
+        
+        Args:
+            moment (datetime): Data e hora
+        
+        Returns:
+            bool: True se o minuto confere com a expressão
+        """
+        return (moment.minute in self.minutes and moment.hour in self.hours
+                and self._day_matches(moment))
+    
+    def next_after(self, moment):
+        """
+        Calcula a próxima execução estritamente depois de um instante
+        
+        Args:
+            moment (datetime): Instante de referência
+        
+        Returns:
+            datetime: Próximo minuto em que o agendamento dispara
+        """
+        start = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        
+        # Percorre os dias e, no primeiro dia aceito, as horas e minutos válidos
+        for _ in range(MAX_SEARCH_DAYS):
+            if self._day_matches(day):
+                for hour in sorted(self.hours):
+                    for minute in sorted(self.minutes):
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        
+        raise ValueError(f"Agendamento nunca dispara: {self.expression}")
\ No newline at end of file
@@ -0,0 +1,249 @@
+"""
+Módulo de definição dos jobs de backup
+Carrega do arquivo de configuração (JSON) os jobs agendados: origens,
+destino, agendamento, retenção, limites de IO, cifra e paridade
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from ..utils.throttle import IOThrottle
+from .cron import CronSchedule
+
+CONFIG_ENV = "BACKUP_JOBS_CONFIG"
+DEFAULT_CONFIG_NAME = "backup_jobs.json"
+DEFAULT_HISTORY_NAME = "backup_jobs_history.jsonl"
+AUTO_CIPHER = "auto"
+THROTTLE_FIELDS = {"read_mbps", "write_mbps", "files_per_sec"}
+RETENTION_FIELDS = {"keep_last", "daily", "weekly", "monthly", "max_total_gb"}
+RETENTION_COUNTS = {"keep_last", "daily", "weekly", "monthly"}  # Quantidades inteiras
+
+def _check_fields(job_name, label, options, allowed):
+    """Rejeita campos desconhecidos em uma seção do job"""
+    unknown = set(options or {}) - allowed
+    if unknown:
+        raise ValueError(f"Job {job_name}: {label} desconhecido(s): {', '.join(sorted(unknown))}")
+
+def _check_retention(job_name, retention):
+    """Rejeita valores de retenção que não sejam números não negativos (keep_last >= 1)"""
+    for field, value in (retention or {}).items():
+        types = int if field in RETENTION_COUNTS else (int, float)
+        if isinstance(value, bool) or not isinstance(value, types) or not value >= 0:
+            raise ValueError(f"Job {job_name}: retenção {field} inválida: {value!r}")
+    
+    # Com keep_last 0, o backup recém-criado pelo job poderia ser removido
+    if retention is not None and retention.get("keep_last", 1) < 1:
+        raise ValueError(f"Job {job_name}: retenção keep_last deve ser ao menos 1")
+
+def default_config_path():
+    """
+    Caminho do arquivo de jobs: variável BACKUP_JOBS_CONFIG ou
+    backup_jobs.json na pasta atual
+    
+    Returns:
+        Path: Caminho do arquivo de configuração
+    """
+    return Path(os.environ.get(CONFIG_ENV) or Path.cwd() / DEFAULT_CONFIG_NAME)
+
+class BackupJob:
+    """Um backup agendado"""
+    
+    def __init__(self, name, schedule, sources, destination, retention=None, throttle=None,
+                 cipher=AUTO_CIPHER, parity=False, enabled=True):
+        """
+        Inicializa o job
+        
+        Args:
+            name (str): Nome único do job
+            schedule (str): Expressão cron (ex.: "0 2 * * *" ou "@daily")
+            sources (list): Pastas de origem
+            destination (str): Pasta onde as pastas de backup são criadas
+            retention (dict): Parâmetros de RetentionPolicy ("keep_last",
+                "daily", "weekly", "monthly" e "max_total_gb"); None não remove
+                backups antigos
+            throttle (dict): Parâmetros de IOThrottle ("read_mbps",
+                "write_mbps" e "files_per_sec")
+            cipher (str): Cifra autenticada ou "auto" (mais rápida no equipamento)
+            parity (bool): Gera paridade para reparo (~10% de espaço)
+            enabled (bool): Jobs desativados não são agendados
+        """
+        if not sources:
+            raise ValueError(f"Job {name}: nenhuma pasta de origem")
+        if not destination:
+            raise ValueError(f"Job {name}: destino não informado")
+        _check_fields(name, "limite(s)", throttle, THROTTLE_FIELDS)
+        _check_fields(name, "campo(s) de retenção", retention, RETENTION_FIELDS)
+        _check_retention(name, retention)
+        
+        try:
+            IOThrottle(**(throttle or {}))
+        except ValueError as e:
+            raise ValueError(f"Job {name}: {e}")
+        
+        self.name = name
+        self.schedule = CronSchedule(schedule)
+        
+        # Expressões válidas que nunca disparam (ex.: 31 de abril) são recusadas na carga
+        try:
+            self.schedule.next_after(datetime.now())
+        except ValueError as e:
+            raise ValueError(f"Job {name}: {e}")
+        
+        self.sources = [os.path.abspath(source) for source in sources]
+        self.destination = os.path.abspath(destination)
+        self.retention = retention
+        self.throttle = throttle or {}
+        self.cipher = cipher
+        self.parity = parity
+        self.enabled = enabled
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Cria o job a partir de uma entrada do arquivo de configuração
+        
+        Args:
+            data (dict): Entrada com os mesmos nomes dos argumentos de __init__
+        
+        Returns:
+            BackupJob: Job validado
+        """
+        name = data.get("name")
+        if not name:
+            raise ValueError("Job sem nome")
+        
+        _check_fields(name, "campo(s)", data, {"name", "schedule", "sources", "destination", "retention",
+                                               "throttle", "cipher", "parity", "enabled"})
+        
+        try:
+            return cls(**data)
+        except TypeError as e:
+            raise ValueError(f"Job {name}: {e}")
+    
+    def retention_policy(self):
+        """
+        Política de retenção do job
+        
+        Returns:
+            RetentionPolicy: Política configurada ou None
+        """
+        from ..file_ops.retention import RetentionPolicy
+        
+        if self.retention is None:
+            return None
+        
+        options = dict(self.retention)
+        max_gb = options.pop("max_total_gb", 0)
+        return RetentionPolicy(**options, max_total_size=int(max_gb * 1024 ** 3) if max_gb else None)
+    
+    def resolve_cipher(self):
+        """
+        Cifra usada nos backups do job
+        
+        Returns:
+            str: Nome da cifra autenticada
+        """
+        from ..crypto.cipher_suite import AUTHENTICATED_CIPHERS, select_cipher
+        
+        if self.cipher == AUTO_CIPHER:
+            return select_cipher()
+        if self.cipher not in AUTHENTICATED_CIPHERS:
+            raise ValueError(f"Job {self.name}: cifra inválida: {self.cipher}")
+        return self.cipher
+    
+    def devices(self):
+        """
+        Dispositivos usados pelo job (origens e destino)
+        
+        Returns:
+            set: Valores de st_dev; um caminho que ainda não existe (destino
+            criado na primeira execução) conta pelo disco da pasta acima dele
+        """
+        devices = set()
+        
+        for path in self.sources + [self.destination]:
+            while True:
+                try:
+                    devices.add(os.stat(path).st_dev)
+                    break
+                except OSError:
+                    parent = os.path.dirname(path)
+                    if parent == path:
+                        break
+                    path = parent
+        
+        return devices
+    
+    def describe(self):
+        """
+        Descreve o job em uma linha
+        
+        Returns:
+            str: Agendamento, origens e destino
+        """
+        state = "" if self.enabled else " (desativado)"
+        return f"{self.name}{state}: {self.schedule.expression} | {len(self.sources)} origem(ns) -> {self.destination}"
+
+def load_jobs(path=None):
+    """
+    Carrega o arquivo de jobs
+    
+    Formato:
+        {"max_concurrent": 2, "history": "backup_jobs_history.jsonl",
+         "jobs": [{"name": "docs", "schedule": "0 2 * * *",
+                   "sources": ["/home/usuario/docs"], "destination": "/mnt/backup",
+                   "retention": {"keep_last": 7, "weekly": 4},
+                   "throttle": {"read_mbps": 50}, "cipher": "auto", "parity": true}]}
+    
+    Caminhos relativos são resolvidos a partir da pasta do arquivo.
+    
+    Args:
+        path (Path): Arquivo de configuração (padrão: default_config_path())
+    
+    Returns:
+        dict: "jobs" (lista de BackupJob), "max_concurrent" e "history" (Path)
+    """
+    path = Path(path) if path else default_config_path()
+    
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        raise Exception(f"Arquivo de jobs não encontrado: {path}")
+    except ValueError as e:
+        raise Exception(f"Erro ao ler arquivo de jobs {path}: {e}")
+    
+    base = path.resolve().parent
+    
+    def resolve(value):
+        return str(base / value)
+    
+    try:
+        jobs = []
+        for entry in data.get("jobs", []):
+            entry = dict(entry)
+            if "sources" in entry:
+                entry["sources"] = [resolve(source) for source in entry["sources"]]
+            if entry.get("destination"):
+                entry["destination"] = resolve(entry["destination"])
+            jobs.append(BackupJob.from_dict(entry))
+        
+        names = [job.name for job in jobs]
+        duplicated = sorted({name for name in names if names.count(name) > 1})
+        if duplicated:
+            raise ValueError(f"Nomes de job repetidos: {', '.join(duplicated)}")
+        
+        max_concurrent = int(data.get("max_concurrent", 1))
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent deve ser ao menos 1")
+    
+    except ValueError as e:
+        raise Exception(f"Erro no arquivo de jobs {path}: {e}")
+    
+    return {
+        "jobs": jobs,
+        "max_concurrent": max_concurrent,
+        "history": base / data.get("history", DEFAULT_HISTORY_NAME)
+    }
\ No newline at end of file
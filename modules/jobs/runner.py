@@ -0,0 +1,268 @@
+"""
+Módulo de execução dos jobs agendados
+Agendador no próprio processo: dispara os jobs nos horários do cron, limita
+quantos rodam ao mesmo tempo (e por disco) e registra o histórico em JSONL
+com duração e vazão de cada execução
+"""
+
+import json
+import threading
+import time
+from datetime import datetime
+
+OK = "ok"
+PARTIAL = "parcial"      # Backup concluído com arquivos que falharam
+FAILED = "falhou"
+SKIPPED = "ignorado"     # Disparo com a execução anterior ainda em andamento
+
+class JobHistory:
+    """Histórico das execuções em um arquivo JSONL (uma linha por execução)"""
+    
+    def __init__(self, path):
+        """
+        Args:
+            path (Path): Arquivo do histórico (criado no primeiro registro)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+    
+    def record(self, entry):
+        """
+        Acrescenta uma execução ao histórico
+        
+        Args:
+            entry (dict): Dados da execução (serializáveis em JSON)
+        """
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+    
+    def read(self, job=None, limit=None):
+        """
+        Lê as execuções registradas
+        
+        Args:
+            job (str): Filtra por nome do job (opcional)
+            limit (int): Quantidade máxima, das mais recentes (opcional)
+        
+        Returns:
+            list: Execuções, da mais antiga para a mais recente
+        """
+        entries = []
+        
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Linha incompleta de uma gravação interrompida
+                    if job is None or entry.get("job") == job:
+                        entries.append(entry)
+        except FileNotFoundError:
+            return []
+        
+        return entries[-limit:] if limit else entries
+    
+    def summary(self, job=None):
+        """
+        Estatísticas por job, para planejamento de capacidade
+        
+        Args:
+            job (str): Filtra por nome do job (opcional)
+        
+        Returns:
+            dict: Nome -> "runs", "failed", "skipped", "bytes", "avg_seconds",
+            "max_seconds", "avg_mbps" e "last"
+        """
+        stats = {}
+        
+        for entry in self.read(job):
+            item = stats.setdefault(entry["job"], {"runs": 0, "failed": 0, "skipped": 0, "bytes": 0,
+                                                   "seconds": 0.0, "max_seconds": 0.0, "last": None})
+            item["last"] = entry
+            
+            if entry["status"] == SKIPPED:
+                item["skipped"] += 1
+                continue
+            
+            item["runs"] += 1
+            item["failed"] += entry["status"] == FAILED
+            item["bytes"] += entry.get("bytes", 0)
+            item["seconds"] += entry["seconds"]
+            item["max_seconds"] = max(item["max_seconds"], entry["seconds"])
+        
+        for item in stats.values():
+            seconds = item.pop("seconds")
+            item["avg_seconds"] = seconds / item["runs"] if item["runs"] else 0.0
+            item["avg_mbps"] = item["bytes"] / seconds / (1024 * 1024) if seconds else 0.0
+        
+        return stats
+
+class JobScheduler:
+    """Agendador dos jobs de backup com limite de concorrência"""
+    
+    def __init__(self, jobs, run_job, max_concurrent=1, history=None, on_event=None):
+        """
+        Inicializa o agendador
+        
+        Args:
+            jobs (list): Jobs (BackupJob)
+            run_job (callable): Executa um job e retorna um dict com "files",
+                "bytes", "failed" e "folder"
+            max_concurrent (int): Jobs executados ao mesmo tempo; jobs que usam
+                um mesmo disco (origem ou destino) nunca rodam juntos
+            history (JobHistory): Histórico das execuções (opcional)
+            on_event (callable): Chamada com (job, evento, dados) em "start",
+                "finish" e "skip" (opcional)
+        """
+        self.jobs = {job.name: job for job in jobs}
+        self.run_job = run_job
+        self.max_concurrent = max_concurrent
+        self.history = history
+        self.on_event = on_event
+        
+        self._condition = threading.Condition()
+        self._queue = []      # Jobs prontos aguardando vaga, na ordem de disparo
+        self._running = {}    # Nome -> dispositivos em uso
+        self.next_runs = {}
+    
+    def _emit(self, job, event, data=None):
+        if self.on_event is not None:
+            self.on_event(job, event, data)
+    
+    def schedule_from(self, now=None):
+        """
+        Calcula o próximo disparo de cada job ativo
+        
+        Args:
+            now (datetime): Instante de referência (padrão: agora)
+        """
+        now = now or datetime.now()
+        self.next_runs = {name: job.schedule.next_after(now) for name, job in self.jobs.items() if job.enabled}
+    
+    def submit(self, name):
+        """
+        Coloca um job na fila para execução assim que houver vaga
+        
+        Um job ainda na fila ou em execução não é enfileirado de novo: o
+        disparo é registrado como ignorado.
+        
+        Args:
+            name (str): Nome do job
+        
+        Returns:
+            bool: True se o job foi enfileirado
+        """
+        job = self.jobs.get(name)
+        if job is None:
+            raise ValueError(f"Job desconhecido: {name}")
+        
+        with self._condition:
+            overlapping = name in self._running or job in self._queue
+            if not overlapping:
+                self._queue.append(job)
+                self._start_ready()
+        
+        if overlapping:
+            now = datetime.now().isoformat(timespec='seconds')
+            if self.history is not None:
+                self.history.record({"job": name, "start": now, "end": now, "seconds": 0.0, "status": SKIPPED,
+                                     "error": "Execução anterior ainda em andamento"})
+            self._emit(job, "skip")
+        
+        return not overlapping
+    
+    def tick(self, now=None):
+        """
+        Enfileira os jobs cujo horário chegou e agenda o próximo disparo
+        
+        Args:
+            now (datetime): Instante atual (padrão: agora)
+        
+        Returns:
+            list: Nomes dos jobs disparados
+        """
+        now = now or datetime.now()
+        due = [name for name, when in self.next_runs.items() if when <= now]
+        
+        for name in due:
+            self.next_runs[name] = self.jobs[name].schedule.next_after(now)
+            self.submit(name)
+        
+        return due
+    
+    def _start_ready(self):
+        """Inicia os jobs da fila que cabem nos limites (chamado com o lock)"""
+        busy = set().union(*self._running.values()) if self._running else set()
+        
+        for job in list(self._queue):
+            if len(self._running) >= self.max_concurrent:
+                break
+            
+            # Jobs que compartilham disco com um job em execução esperam a vez
+            devices = job.devices()
+            if devices & busy:
+                continue
+            
+            self._queue.remove(job)
+            self._running[job.name] = devices
+            busy |= devices
+            
+            threading.Thread(target=self._execute, args=(job,), name=f"job-{job.name}", daemon=True).start()
+    
+    def _execute(self, job):
+        """Executa um job e registra o resultado no histórico"""
+        started = datetime.now()
+        start = time.perf_counter()
+        entry = {"job": job.name, "start": started.isoformat(timespec='seconds')}
+        self._emit(job, "start")
+        
+        try:
+            result = self.run_job(job)
+            entry.update(status=PARTIAL if result.get("failed") else OK, files=result.get("files", 0),
+                         bytes=result.get("bytes", 0), failed=result.get("failed", 0),
+                         folder=str(result.get("folder", "")), removed=result.get("removed", 0))
+        except Exception as e:
+            entry.update(status=FAILED, error=str(e))
+        
+        seconds = time.perf_counter() - start
+        entry["end"] = datetime.now().isoformat(timespec='seconds')
+        entry["seconds"] = round(seconds, 3)
+        entry["mbps"] = round(entry.get("bytes", 0) / max(seconds, 0.001) / (1024 * 1024), 2)
+        
+        try:
+            if self.history is not None:
+                self.history.record(entry)
+            self._emit(job, "finish", entry)
+        finally:
+            with self._condition:
+                del self._running[job.name]
+                self._start_ready()
+                self._condition.notify_all()
+    
+    def wait(self):
+        """Aguarda a fila esvaziar e os jobs em execução terminarem"""
+        with self._condition:
+            self._condition.wait_for(lambda: not self._queue and not self._running)
+    
+    def run_forever(self, stop_event=None):
+        """
+        Executa o agendador até stop_event ser sinalizado
+        
+        Args:
+            stop_event (threading.Event): Encerra o laço quando sinalizado;
+                jobs em execução terminam antes do retorno
+        """
+        stop_event = stop_event or threading.Event()
+        self.schedule_from()
+        
+        while not stop_event.is_set():
+            self.tick()
+            
+            # Acorda no início do próximo minuto (resolução do cron)
+            stop_event.wait(60 - time.time() % 60 + 0.01)
+        
+        self.wait()
\ No newline at end of file
@@ -0,0 +1,355 @@
+"""
+Módulo de armazenamento de backups
+Backends com put/get/list/delete: sistema de arquivos local e object store S3
+"""
+
+import os
+import random
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+# Códigos de erro do S3 que indicam limitação de taxa ou falha temporária do serviço
+RETRYABLE_CODES = {
+    "Throttling", "ThrottlingException", "SlowDown", "RequestLimitExceeded", "TooManyRequestsException",
+    "RequestTimeout", "RequestTimeoutException", "InternalError", "ServiceUnavailable", "BandwidthLimitExceeded"
+}
+
+def _connection_errors():
+    """Exceções de conexão: as nativas e, se instalado, as do botocore"""
+    errors = (ConnectionError, TimeoutError)
+    
+    try:
+        from botocore import exceptions
+    except ImportError:
+        return errors
+    
+    return errors + (exceptions.ConnectionError, exceptions.HTTPClientError)
+
+def is_retryable(error):
+    """
+    Indica se uma falha de requisição deve ser repetida
+    
+    Apenas limitação de taxa (429/SlowDown), erros 5xx e falhas de conexão
+    são temporários; erros como NoSuchKey ou AccessDenied falham de imediato.
+    
+    Args:
+        error (Exception): Exceção levantada pelo cliente S3
+    
+    Returns:
+        bool: True se uma nova tentativa pode ter sucesso
+    """
+    if isinstance(error, _connection_errors()):
+        return True
+    
+    # ClientError do botocore traz o código e o status HTTP em "response"
+    response = getattr(error, "response", None)
+    if not isinstance(response, dict):
+        return False
+    
+    code = response.get("Error", {}).get("Code")
+    status = response.get("ResponseMetadata", {}).get("HTTPStatusCode") or 0
+    return code in RETRYABLE_CODES or status == 429 or status >= 500
+
+class StorageBackend:
+    """Interface comum dos backends de armazenamento"""
+    
+    def put(self, key, source_path):
+        """
+        Envia um arquivo local para o armazenamento
+        
+        Args:
+            key (str): Chave (caminho relativo) do objeto
+            source_path (str): Arquivo local a enviar
+        """
+        raise NotImplementedError
+    
+    def get(self, key, dest_path):
+        """
+        Baixa um objeto para um arquivo local
+        
+        Args:
+            key (str): Chave do objeto
+            dest_path (str): Arquivo local de destino
+        """
+        raise NotImplementedError
+    
+    def list(self, prefix=""):
+        """
+        Lista os objetos com um prefixo
+        
+        Args:
+            prefix (str): Prefixo das chaves
+        
+        Returns:
+            list: Tuplas (chave, tamanho) ordenadas pela chave
+        """
+        raise NotImplementedError
+    
+    def delete(self, key):
+        """
+        Remove um objeto
+        
+        Args:
+            key (str): Chave do objeto
+        """
+        raise NotImplementedError
+    
+    def upload_folder(self, folder, prefix, on_progress=None):
+        """
+        Envia todos os arquivos de uma pasta de backup
+        
+        Args:
+            folder (Path): Pasta local
+            prefix (str): Prefixo das chaves no armazenamento
+            on_progress (callable): Chamada a cada arquivo com (chave, concluídos, total)
+        
+        Returns:
+            int: Total de bytes enviados
+        """
+        files = sorted(p for p in Path(folder).rglob('*') if p.is_file())
+        total_bytes = 0
+        
+        for done, path in enumerate(files, 1):
+            key = f"{prefix.rstrip('/')}/{path.relative_to(folder).as_posix()}"
+            self.put(key, path)
+            total_bytes += path.stat().st_size
+            
+            if on_progress:
+                on_progress(key, done, len(files))
+        
+        return total_bytes
+
+class LocalStorageBackend(StorageBackend):
+    """Armazenamento em uma pasta do sistema de arquivos local"""
+    
+    def __init__(self, root):
+        """
+        Args:
+            root (Path): Pasta raiz do armazenamento
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+    
+    def _path(self, key):
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Chave inválida: {key}")
+        return path
+    
+    def put(self, key, source_path):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Copia para temporário e substitui, para nunca expor objeto parcial
+        temp_path = path.with_name(path.name + ".tmp")
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, path)
+    
+    def get(self, key, dest_path):
+        shutil.copyfile(self._path(key), dest_path)
+    
+    def list(self, prefix=""):
+        objects = []
+        
+        for path in self.root.rglob('*'):
+            if path.is_file() and not path.name.endswith(".tmp"):
+                key = path.relative_to(self.root).as_posix()
+                if key.startswith(prefix):
+                    objects.append((key, path.stat().st_size))
+        
+        objects.sort()
+        return objects
+    
+    def delete(self, key):
+        self._path(key).unlink(missing_ok=True)
+
+class S3StorageBackend(StorageBackend):
+    """Armazenamento em object store compatível com S3 (AWS, MinIO, etc.)"""
+    
+    def __init__(self, bucket, client=None, endpoint_url=None, part_size=16 * 1024 * 1024,
+                 max_concurrency=8, max_retries=5, backoff=0.5):
+        """
+        Inicializa o backend S3
+        
+        Args:
+            bucket (str): Nome do bucket
+            client: Cliente S3 já criado (ex.: FakeS3Client); se None, usa boto3
+            endpoint_url (str): Endpoint alternativo (ex.: MinIO local)
+            part_size (int): Tamanho de cada parte do upload multipart
+            max_concurrency (int): Partes enviadas em paralelo, somando todos os
+                uploads, e arquivos enviados em paralelo por upload_folder
+            max_retries (int): Tentativas por requisição antes de desistir
+            backoff (float): Espera inicial (s) entre tentativas, dobrada a cada falha
+        """
+        self.bucket = bucket
+        self.part_size = part_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.client = client or self._create_client(endpoint_url)
+        self._part_executor = None
+        self._lock = threading.Lock()
+    
+    def _create_client(self, endpoint_url):
+        """Cria o cliente boto3 com pool de conexões do tamanho da concorrência"""
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError:
+            raise Exception("boto3 não está instalado. Execute: pip install boto3")
+        
+        config = Config(
+            max_pool_connections=self.max_concurrency * 2,
+            retries={"max_attempts": 0}  # As novas tentativas são feitas por _retry
+        )
+        return boto3.client("s3", endpoint_url=endpoint_url, config=config)
+    
+    def _retry(self, operation, **kwargs):
+        """
+        Executa uma requisição com novas tentativas e backoff exponencial com jitter
+        
+        Apenas falhas temporárias (ver is_retryable) são repetidas.
+        """
+        for attempt in range(self.max_retries):
+            try:
+                return operation(Bucket=self.bucket, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries - 1 or not is_retryable(e):
+                    raise
+                time.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+    
+    def _parts(self):
+        """Pool das partes multipart, único por backend para limitar o total de envios"""
+        with self._lock:
+            if self._part_executor is None:
+                self._part_executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                         thread_name_prefix="s3-part")
+            return self._part_executor
+    
+    def put(self, key, source_path):
+        size = os.path.getsize(source_path)
+        
+        if size <= self.part_size:
+            with open(source_path, 'rb') as f:
+                self._retry(self.client.put_object, Key=key, Body=f.read())
+            return
+        
+        self._put_multipart(key, source_path, size)
+    
+    def _put_multipart(self, key, source_path, size):
+        """Envia um arquivo grande em partes paralelas, lendo cada parte sob demanda"""
+        upload_id = self._retry(self.client.create_multipart_upload, Key=key)["UploadId"]
+        part_count = (size + self.part_size - 1) // self.part_size
+        
+        def upload_part(number):
+            with open(source_path, 'rb') as f:
+                f.seek((number - 1) * self.part_size)
+                body = f.read(self.part_size)
+            
+            response = self._retry(self.client.upload_part, Key=key, UploadId=upload_id,
+                                   PartNumber=number, Body=body)
+            return {"PartNumber": number, "ETag": response["ETag"]}
+        
+        # As partes de todos os arquivos dividem o mesmo pool (ver _parts)
+        futures = [self._parts().submit(upload_part, number) for number in range(1, part_count + 1)]
+        
+        try:
+            parts = [future.result() for future in futures]
+            
+            self._retry(self.client.complete_multipart_upload, Key=key, UploadId=upload_id,
+                        MultipartUpload={"Parts": parts})
+        
+        except Exception:
+            # Partes pendentes são canceladas e as em andamento terminam antes do abort
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            
+            try:
+                self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            except Exception:
+                pass
+            raise
+    
+    def get(self, key, dest_path):
+        response = self._retry(self.client.get_object, Key=key)
+        body = response["Body"]
+        
+        with open(dest_path, 'wb') as f:
+            while True:
+                chunk = body.read(1024 * 1024)
+                if not chunk:
+                    break
+                f.write(chunk)
+    
+    def list(self, prefix=""):
+        objects = []
+        kwargs = {"Prefix": prefix}
+        
+        while True:
+            response = self._retry(self.client.list_objects_v2, **kwargs)
+            
+            for item in response.get("Contents", []):
+                objects.append((item["Key"], item["Size"]))
+            
+            if not response.get("IsTruncated"):
+                break
+            kwargs["ContinuationToken"] = response["NextContinuationToken"]
+        
+        objects.sort()
+        return objects
+    
+    def delete(self, key):
+        self._retry(self.client.delete_object, Key=key)
+    
+    def upload_folder(self, folder, prefix, on_progress=None):
+        """
+        Envia os arquivos da pasta em paralelo
+        
+        Os arquivos grandes enviam suas partes pelo pool único de partes, então
+        o total de partes em andamento continua limitado a max_concurrency,
+        qualquer que seja a quantidade de arquivos multipart simultâneos.
+        """
+        files = sorted(p for p in Path(folder).rglob('*') if p.is_file())
+        lock = threading.Lock()
+        state = {"done": 0, "bytes": 0}
+        
+        def upload(path):
+            key = f"{prefix.rstrip('/')}/{path.relative_to(folder).as_posix()}"
+            self.put(key, path)
+            
+            with lock:
+                state["done"] += 1
+                state["bytes"] += path.stat().st_size
+                if on_progress:
+                    on_progress(key, state["done"], len(files))
+        
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            list(executor.map(upload, files))
+        
+        return state["bytes"]
+
+def create_backend(url):
+    """
+    Cria um backend a partir de uma URL de destino
+    
+    Aceita "s3://bucket" (endpoint opcional em BACKUP_S3_ENDPOINT, ex. MinIO)
+    ou um caminho local ("file:///caminho" ou "/caminho").
+    
+    Args:
+        url (str): Destino do armazenamento
+    
+    Returns:
+        StorageBackend: Backend configurado
+    """
+    if url.startswith("s3://"):
+        bucket = url[len("s3://"):].strip("/")
+        return S3StorageBackend(bucket, endpoint_url=os.environ.get("BACKUP_S3_ENDPOINT"))
+    
+    if url.startswith("file://"):
+        url = url[len("file://"):]
+    
+    return LocalStorageBackend(url)
\ No newline at end of file
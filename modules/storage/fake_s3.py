@@ -0,0 +1,90 @@
+"""
+Object store S3 em memória
+Substituto em processo para testar o S3StorageBackend sem rede
+"""
+
+import hashlib
+import io
+import threading
+
+class FakeS3Client:
+    """Cliente S3 mínimo em memória, com a mesma interface usada pelo backend"""
+    
+    def __init__(self, fail_every=0):
+        """
+        Args:
+            fail_every (int): Se > 0, toda n-ésima requisição falha (testa novas tentativas)
+        """
+        self.objects = {}
+        self.uploads = {}
+        self.upload_count = 0
+        self.fail_every = fail_every
+        self.requests = 0
+        self._lock = threading.Lock()
+    
+    def _request(self):
+        with self._lock:
+            self.requests += 1
+            if self.fail_every and self.requests % self.fail_every == 0:
+                raise ConnectionError("Falha simulada de conexão")
+    
+    def put_object(self, Bucket, Key, Body):
+        self._request()
+        with self._lock:
+            self.objects[(Bucket, Key)] = bytes(Body)
+        return {"ETag": hashlib.md5(Body).hexdigest()}
+    
+    def get_object(self, Bucket, Key):
+        self._request()
+        with self._lock:
+            if (Bucket, Key) not in self.objects:
+                raise KeyError(f"NoSuchKey: {Key}")
+            return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+    
+    def delete_object(self, Bucket, Key):
+        self._request()
+        with self._lock:
+            self.objects.pop((Bucket, Key), None)
+        return {}
+    
+    def list_objects_v2(self, Bucket, Prefix="", ContinuationToken=None, MaxKeys=1000):
+        self._request()
+        with self._lock:
+            keys = sorted(k for b, k in self.objects if b == Bucket and k.startswith(Prefix))
+        
+        start = int(ContinuationToken) if ContinuationToken else 0
+        page = keys[start:start + MaxKeys]
+        response = {
+            "Contents": [{"Key": k, "Size": len(self.objects[(Bucket, k)])} for k in page],
+            "IsTruncated": start + MaxKeys < len(keys)
+        }
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = str(start + MaxKeys)
+        return response
+    
+    def create_multipart_upload(self, Bucket, Key):
+        self._request()
+        with self._lock:
+            self.upload_count += 1
+            upload_id = f"upload-{self.upload_count}"  # Único mesmo após uploads concluídos
+            self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+    
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self._request()
+        with self._lock:
+            self.uploads[UploadId][PartNumber] = bytes(Body)
+        return {"ETag": hashlib.md5(Body).hexdigest()}
+    
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self._request()
+        with self._lock:
+            parts = self.uploads.pop(UploadId)
+            numbers = [p["PartNumber"] for p in MultipartUpload["Parts"]]
+            self.objects[(Bucket, Key)] = b"".join(parts[n] for n in sorted(numbers))
+        return {}
+    
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        with self._lock:
+            self.uploads.pop(UploadId, None)
+        return {}
\ No newline at end of file
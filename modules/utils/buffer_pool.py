@@ -0,0 +1,149 @@
+"""
+Módulo de buffers reutilizáveis
+Pool de bytearray pré-alocados para leitura com readinto e criptografia com
+update_into/encrypt_into, evitando novas alocações a cada arquivo
+"""
+
+import threading
+from contextlib import contextmanager
+
+class BufferPool:
+    """Pool de buffers de tamanho fixo, seguro para várias threads"""
+    
+    def __init__(self, buffer_size, max_buffers=64):
+        """
+        Inicializa o pool
+        
+        Args:
+            buffer_size (int): Tamanho de cada buffer em bytes
+            max_buffers (int): Máximo de buffers livres mantidos no pool
+        """
+        self.buffer_size = buffer_size
+        self.max_buffers = max_buffers
+        self._free = []
+        self._lock = threading.Lock()
+        self.allocated = 0
+    
+    def acquire(self):
+        """
+        Obtém um buffer livre (ou aloca um novo, se não houver)
+        
+        Returns:
+            bytearray: Buffer com buffer_size bytes
+        """
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+            self.allocated += 1
+        
+        return bytearray(self.buffer_size)
+    
+    def release(self, buffer):
+        """
+        Devolve um buffer ao pool
+        
+        Args:
+            buffer (bytearray): Buffer obtido com acquire
+        """
+        with self._lock:
+            if len(self._free) < self.max_buffers:
+                self._free.append(buffer)
+    
+    @contextmanager
+    def buffer(self):
+        """Obtém um buffer e o devolve ao pool ao final do bloco with"""
+        buffer = self.acquire()
+        try:
+            yield buffer
+        finally:
+            self.release(buffer)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(buffer_size):
+    """
+    Retorna o pool compartilhado para um tamanho de buffer
+    
+    Args:
+        buffer_size (int): Tamanho de cada buffer em bytes
+    
+    Returns:
+        BufferPool: Pool compartilhado por todos os motores do processo
+    """
+    with _pools_lock:
+        if buffer_size not in _pools:
+            _pools[buffer_size] = BufferPool(buffer_size)
+        return _pools[buffer_size]
+
+def readinto_full(reader, view, hasher=None):
+    """
+    Preenche um memoryview com readinto até enchê-lo ou chegar ao fim
+    
+    Args:
+        reader: Objeto com readinto (arquivo, ThrottledFile, ExtentReader...)
+        view (memoryview): Destino
+        hasher: Objeto do hashlib atualizado a cada leitura, na ordem (opcional)
+    
+    Returns:
+        int: Quantidade de bytes lidos
+    """
+    filled = 0
+    
+    while filled < len(view):
+        count = reader.readinto(view[filled:])
+        if not count:
+            break
+        
+        if hasher is not None:
+            hasher.update(view[filled:filled + count])
+        filled += count
+    
+    return filled
+
+class LimitedReader:
+    """Leitor (com readinto) que para após uma quantidade fixa de bytes"""
+    
+    def __init__(self, reader, limit):
+        """
+        Args:
+            reader: Objeto com readinto
+            limit (int): Máximo de bytes lidos
+        """
+        self.reader = reader
+        self.remaining = limit
+    
+    def readinto(self, buffer):
+        if self.remaining <= 0:
+            return 0
+        
+        count = self.reader.readinto(memoryview(buffer)[:self.remaining]) or 0
+        self.remaining -= count
+        return count
+
+class ViewReader:
+    """Leitor sequencial (com readinto) sobre uma lista de buffers em memória"""
+    
+    def __init__(self, views):
+        """
+        Args:
+            views (list): Buffers (bytes, bytearray ou memoryview), em ordem
+        """
+        self.views = [memoryview(view).cast('B') for view in views]
+        self.index = 0
+        self.offset = 0
+    
+    def readinto(self, buffer):
+        while self.index < len(self.views):
+            current = self.views[self.index]
+            
+            if self.offset < len(current):
+                count = min(len(buffer), len(current) - self.offset)
+                buffer[:count] = current[self.offset:self.offset + count]
+                self.offset += count
+                return count
+            
+            self.index += 1
+            self.offset = 0
+        
+        return 0
\ No newline at end of file
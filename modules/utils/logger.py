@@ -40,8 +40,8 @@ def setup_logger(log_level=logging.INFO):
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     
-    # Handler para arquivo
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    # Handler para arquivo (aberto apenas na primeira mensagem gravada)
+    file_handler = logging.FileHandler(log_file, encoding='utf-8', delay=True)
     file_handler.setLevel(log_level)
     file_handler.setFormatter(formatter)
     logger.addHandler(file_handler)
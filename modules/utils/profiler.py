@@ -0,0 +1,264 @@
+"""
+Módulo de perfilamento
+Spans de baixo custo nos caminhos críticos (derivação de chave, os.urandom,
+criptografia, escaneamento, lotes e logging), gravados em formato Chrome
+trace/Perfetto (.json) ou em pilhas agregadas para flamegraph (.folded)
+
+Ativado pela opção --profile ARQUIVO ou pela variável BACKUP_PROFILE. Com o
+perfilamento desativado, nenhuma função é instrumentada e não há custo.
+"""
+
+import os
+import threading
+import time
+
+# Caminhos críticos instrumentados: (módulo, atributo)
+TARGETS = [
+    ("os", "urandom"),
+    ("logging", "Handler.handle"),
+    ("modules.auth.password_manager", "PasswordManager.derive_key"),
+    ("modules.auth.kdf", "derive"),
+    ("modules.crypto.aes_handler", "AESHandler.encrypt"),
+    ("modules.crypto.aes_handler", "AESHandler.decrypt"),
+    ("modules.crypto.aes_handler", "AESHandler.encrypt_file"),
+    ("modules.crypto.aes_handler", "AESHandler.encrypt_file_parallel"),
+    ("modules.crypto.aes_handler", "AESHandler.decrypt_file"),
+    ("modules.crypto.aes_handler", "AESHandler.encrypt_stream"),
+    ("modules.crypto.aes_handler", "AESHandler.decrypt_stream"),
+    ("modules.crypto.aes_handler", "AESHandler._encrypt_cbc_from"),
+    ("modules.crypto.aes_handler", "AESHandler.verify_file"),
+    ("modules.crypto.cipher_suite", "SegmentedCipher.encrypt_from"),
+    ("modules.crypto.cipher_suite", "SegmentedCipher.encrypt_segments"),
+    ("modules.crypto.cipher_suite", "SegmentedCipher.decrypt_stream"),
+    ("modules.crypto.bundle_handler", "BundleHandler.create_bundle"),
+    ("modules.crypto.bundle_handler", "BundleHandler.read_bundle"),
+    ("modules.crypto.batch_engine", "BatchEngine.run"),
+    ("modules.crypto.host_backup", "HostBackup.run"),
+    ("modules.file_ops.file_manager", "FileManager.scan_folder"),
+    ("modules.file_ops.inventory", "FileInventory.scan"),
+    ("modules.file_ops.manifest", "BackupManifest.save"),
+    ("modules.file_ops.manifest", "BackupManifest.load"),
+    ("modules.utils.throttle", "RateLimiter.consume"),
+]
+
+_profiler = None
+
+class Profiler:
+    """Coleta spans por thread e grava o resultado ao final"""
+    
+    def __init__(self, output_path):
+        """
+        Args:
+            output_path (str): Arquivo de saída (.json para Chrome trace,
+                outra extensão para pilhas agregadas)
+        """
+        self.output_path = output_path
+        self.start_ns = time.perf_counter_ns()
+        self.events = []
+        self.folded = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._originals = []
+    
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+    
+    def begin(self, name):
+        """Abre um span na thread atual"""
+        # Cada item: [nome, início_ns, tempo dos filhos]
+        self._stack().append([name, time.perf_counter_ns(), 0])
+    
+    def end(self):
+        """Fecha o span mais recente da thread atual"""
+        end_ns = time.perf_counter_ns()
+        stack = self._stack()
+        name, start_ns, children_ns = stack.pop()
+        duration = end_ns - start_ns
+        
+        if stack:
+            stack[-1][2] += duration
+        
+        thread = threading.current_thread()
+        key = ";".join([thread.name] + [item[0] for item in stack] + [name])
+        event = {"name": name, "ph": "X", "ts": (start_ns - self.start_ns) / 1000,
+                 "dur": duration / 1000, "pid": os.getpid(), "tid": thread.ident}
+        
+        with self._lock:
+            self.events.append(event)
+            self.folded[key] = self.folded.get(key, 0) + duration - children_ns
+    
+    def span(self, name):
+        """Gerenciador de contexto para um trecho nomeado"""
+        return _Span(self, name)
+    
+    def wrap(self, name, func):
+        """Retorna a função envolvida por um span"""
+        profiler = self
+        
+        def wrapper(*args, **kwargs):
+            profiler.begin(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.end()
+        
+        wrapper.__wrapped__ = func
+        wrapper.__name__ = getattr(func, "__name__", name)
+        wrapper.__doc__ = getattr(func, "__doc__", None)
+        return wrapper
+    
+    def instrument(self, targets=TARGETS):
+        """Envolve os caminhos críticos com spans (desfeito por uninstrument)"""
+        import importlib
+        
+        for module_name, attribute in targets:
+            try:
+                owner = importlib.import_module(module_name)
+            except ImportError:
+                continue
+            
+            *path, name = attribute.split(".")
+            for part in path:
+                owner = getattr(owner, part)
+            
+            raw = vars(owner).get(name) if isinstance(owner, type) else getattr(owner, name, None)
+            if raw is None:
+                continue
+            
+            # Funções de módulo recebem o nome do módulo (ex.: "kdf.derive", "os.urandom")
+            label = attribute if path else f"{module_name.rsplit('.', 1)[-1]}.{attribute}"
+            self._originals.append((owner, name, raw))
+            setattr(owner, name, self._wrap_raw(label, raw))
+    
+    def _wrap_raw(self, name, raw):
+        """Envolve funções, métodos estáticos e de classe preservando o tipo"""
+        if isinstance(raw, staticmethod):
+            return staticmethod(self.wrap(name, raw.__func__))
+        if isinstance(raw, classmethod):
+            return classmethod(self.wrap(name, raw.__func__))
+        if name == "BatchEngine.run":
+            return self._wrap_batch_run(raw)
+        return self.wrap(name, raw)
+    
+    def _wrap_batch_run(self, run):
+        """BatchEngine.run: span do lote e um span por item, em cada worker"""
+        profiler = self
+        
+        def batch_run(engine, items, func, *args, **kwargs):
+            item_name = f"lote:{getattr(func, '__name__', 'item')}"
+            return profiler.wrap("BatchEngine.run", run)(engine, items, profiler.wrap(item_name, func),
+                                                         *args, **kwargs)
+        
+        batch_run.__wrapped__ = run
+        return batch_run
+    
+    def uninstrument(self):
+        """Restaura as funções originais"""
+        for owner, name, raw in reversed(self._originals):
+            setattr(owner, name, raw)
+        self._originals.clear()
+    
+    def write(self):
+        """
+        Grava o resultado no arquivo de saída
+        
+        Returns:
+            str: Caminho do arquivo gravado
+        """
+        with self._lock:
+            events = list(self.events)
+            folded = dict(self.folded)
+        
+        if self.output_path.endswith(".json"):
+            import json
+            
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            metadata = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                         "args": {"name": names.get(tid, str(tid))}}
+                        for tid in {event["tid"] for event in events}]
+            
+            with open(self.output_path, 'w', encoding='utf-8') as f:
+                json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+        else:
+            # Pilhas agregadas (tempo próprio em microssegundos), entrada do flamegraph.pl/speedscope
+            with open(self.output_path, 'w', encoding='utf-8') as f:
+                for stack, self_ns in sorted(folded.items()):
+                    f.write(f"{stack} {max(1, self_ns // 1000)}\n")
+        
+        return self.output_path
+
+class _Span:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+    
+    def __enter__(self):
+        self.profiler.begin(self.name)
+        return self
+    
+    def __exit__(self, *exc):
+        self.profiler.end()
+        return False
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def span(name):
+    """
+    Marca um trecho de código no perfil (sem efeito se o perfilamento estiver desativado)
+    
+    Args:
+        name (str): Nome do trecho
+    
+    Returns:
+        Gerenciador de contexto
+    """
+    return _profiler.span(name) if _profiler is not None else _NULL_SPAN
+
+def enable(output_path=None):
+    """
+    Ativa o perfilamento e instrumenta os caminhos críticos
+    
+    Args:
+        output_path (str): Arquivo de saída (padrão: variável BACKUP_PROFILE)
+    
+    Returns:
+        Profiler: Perfilador ativo, ou None se não houver arquivo de saída
+    """
+    global _profiler
+    
+    output_path = output_path or os.environ.get("BACKUP_PROFILE")
+    if not output_path or _profiler is not None:
+        return _profiler
+    
+    import atexit
+    
+    _profiler = Profiler(output_path)
+    _profiler.instrument()
+    atexit.register(disable)
+    return _profiler
+
+def disable():
+    """
+    Desativa o perfilamento e grava o resultado
+    
+    Returns:
+        str: Caminho do arquivo gravado, ou None se não estava ativo
+    """
+    global _profiler
+    
+    profiler, _profiler = _profiler, None
+    if profiler is None:
+        return None
+    
+    profiler.uninstrument()
+    return profiler.write()
\ No newline at end of file
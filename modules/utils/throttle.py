@@ -0,0 +1,240 @@
+"""
+Módulo de limitação de recursos
+Limites de leitura/escrita (MB/s) e arquivos/s, ajustáveis durante a execução,
+e redução da prioridade de CPU/IO do processo
+"""
+
+import os
+import sys
+import threading
+import time
+
+_low_priority = []  # Alterações de prioridade já aplicadas ao processo
+_low_priority_lock = threading.Lock()
+
+def _check_limit(label, value):
+    """Valida um limite: número positivo, ou None/0 para sem limite"""
+    if value is None or (value == 0 and not isinstance(value, bool)):
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not value > 0:
+        raise ValueError(f"Limite inválido para {label}: {value} (use 0 para sem limite)")
+    return value
+
+class RateLimiter:
+    """Limitador do tipo token bucket, seguro para várias threads"""
+    
+    def __init__(self, rate=None, burst_seconds=0.5):
+        """
+        Inicializa o limitador
+        
+        Args:
+            rate (float): Unidades por segundo (None = sem limite)
+            burst_seconds (float): Rajada máxima, em segundos de taxa acumulada
+        """
+        self.burst_seconds = burst_seconds
+        self._lock = threading.Lock()
+        self._rate = None
+        self._tokens = 0.0
+        self._last = time.monotonic()
+        self.set_rate(rate)
+    
+    @property
+    def rate(self):
+        return self._rate
+    
+    def set_rate(self, rate):
+        """
+        Altera a taxa, inclusive com operações em andamento
+        
+        Args:
+            rate (float): Unidades por segundo (None ou 0 = sem limite)
+        """
+        rate = _check_limit("taxa", rate)
+        
+        with self._lock:
+            self._rate = rate or None
+            self._tokens = min(self._tokens, self._capacity())
+            self._last = time.monotonic()
+    
+    def _capacity(self):
+        return self._rate * self.burst_seconds if self._rate else 0.0
+    
+    def consume(self, amount):
+        """
+        Aguarda até que a quantidade possa ser consumida dentro da taxa
+        
+        Args:
+            amount (float): Quantidade a consumir (bytes, arquivos, ...)
+        """
+        while True:
+            with self._lock:
+                if not self._rate:
+                    return
+                
+                now = time.monotonic()
+                self._tokens = min(self._capacity(), self._tokens + (now - self._last) * self._rate)
+                self._last = now
+                
+                # Permite dívida para quantidades maiores que a rajada
+                if self._tokens >= min(amount, self._capacity()):
+                    self._tokens -= amount
+                    return
+                
+                wait = (min(amount, self._capacity()) - self._tokens) / self._rate
+            
+            time.sleep(min(wait, 0.25))
+
+class ThrottledFile:
+    """Envolve um arquivo aberto aplicando os limites de leitura e escrita"""
+    
+    def __init__(self, file, throttle):
+        self._file = file
+        self._throttle = throttle
+    
+    def read(self, size=-1):
+        data = self._file.read(size)
+        self._throttle.read_limiter.consume(len(data))
+        return data
+    
+    def readinto(self, buffer):
+        count = self._file.readinto(buffer)
+        self._throttle.read_limiter.consume(count or 0)
+        return count
+    
+    def write(self, data):
+        self._throttle.write_limiter.consume(len(data))
+        return self._file.write(data)
+    
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+class IOThrottle:
+    """Conjunto de limites de uma operação: leitura, escrita e arquivos por segundo"""
+    
+    MB = 1024 * 1024
+    
+    def __init__(self, read_mbps=None, write_mbps=None, files_per_sec=None):
+        """
+        Inicializa os limites
+        
+        Args:
+            read_mbps (float): Leitura máxima em MB/s (None = sem limite)
+            write_mbps (float): Escrita máxima em MB/s (None = sem limite)
+            files_per_sec (float): Arquivos processados por segundo (None = sem limite)
+        """
+        self.read_limiter = RateLimiter()
+        self.write_limiter = RateLimiter()
+        self.file_limiter = RateLimiter(burst_seconds=1.0)
+        self.set_limits(read_mbps, write_mbps, files_per_sec)
+    
+    def set_limits(self, read_mbps=None, write_mbps=None, files_per_sec=None):
+        """
+        Define os limites; pode ser chamado durante uma operação em andamento
+        
+        Args:
+            read_mbps (float): Leitura máxima em MB/s (None = sem limite)
+            write_mbps (float): Escrita máxima em MB/s (None = sem limite)
+            files_per_sec (float): Arquivos por segundo (None = sem limite)
+        
+        Raises:
+            ValueError: Se algum limite for negativo ou não numérico (0 = sem limite)
+        """
+        read_mbps = _check_limit("leitura", read_mbps)
+        write_mbps = _check_limit("escrita", write_mbps)
+        files_per_sec = _check_limit("arquivos por segundo", files_per_sec)
+        
+        self.read_mbps = read_mbps
+        self.write_mbps = write_mbps
+        self.files_per_sec = files_per_sec
+        
+        self.read_limiter.set_rate(read_mbps * self.MB if read_mbps else None)
+        self.write_limiter.set_rate(write_mbps * self.MB if write_mbps else None)
+        self.file_limiter.set_rate(files_per_sec)
+    
+    @property
+    def enabled(self):
+        return bool(self.read_mbps or self.write_mbps or self.files_per_sec)
+    
+    def wrap(self, file):
+        """
+        Envolve um arquivo aberto com os limites (ou o retorna intacto sem limites)
+        
+        Args:
+            file: Arquivo aberto em modo binário
+        
+        Returns:
+            Arquivo com leitura/escrita limitadas
+        """
+        return ThrottledFile(file, self) if self.enabled else file
+    
+    def before_file(self):
+        """Aguarda a vez do próximo arquivo conforme o limite de arquivos/s"""
+        self.file_limiter.consume(1)
+    
+    def describe(self):
+        """
+        Descreve os limites em texto
+        
+        Returns:
+            str: Descrição legível
+        """
+        if not self.enabled:
+            return "sem limites"
+        
+        parts = []
+        if self.read_mbps:
+            parts.append(f"leitura {self.read_mbps:g} MB/s")
+        if self.write_mbps:
+            parts.append(f"escrita {self.write_mbps:g} MB/s")
+        if self.files_per_sec:
+            parts.append(f"{self.files_per_sec:g} arquivos/s")
+        return ", ".join(parts)
+
+def apply_low_priority(nice_increment=10, idle_io=True):
+    """
+    Reduz a prioridade de CPU (nice) e de disco (classe idle do ionice) do processo
+    
+    Como o nice é cumulativo, a redução é aplicada uma única vez: chamadas
+    seguintes apenas retornam o que já foi aplicado.
+    
+    Args:
+        nice_increment (int): Incremento de nice (0 não altera)
+        idle_io (bool): Se True, usa a classe de IO idle (Linux)
+    
+    Returns:
+        list: Descrição das alterações aplicadas
+    """
+    with _low_priority_lock:
+        if not _low_priority:
+            _low_priority.extend(_lower_priority(nice_increment, idle_io))
+        return list(_low_priority)
+
+def _lower_priority(nice_increment, idle_io):
+    """Aplica nice e ionice; retorna a descrição das alterações"""
+    applied = []
+    
+    if nice_increment and hasattr(os, "nice"):
+        try:
+            applied.append(f"nice {os.nice(nice_increment)}")
+        except OSError:
+            pass
+    
+    if idle_io and sys.platform.startswith("linux"):
+        import subprocess
+        
+        try:
+            import psutil
+        except ImportError:
+            psutil = None
+        
+        try:
+            if psutil is not None:
+                psutil.Process().ionice(psutil.IOPRIO_CLASS_IDLE)
+                applied.append("ionice idle")
+            elif subprocess.run(["ionice", "-c", "3", "-p", str(os.getpid())],
+                                capture_output=True).returncode == 0:
+                applied.append("ionice idle")
+        except Exception:
+            pass
+    
+    return applied
\ No newline at end of file
@@ -16,6 +16,9 @@ def create_directory_structure():
         "modules/crypto", 
         "modules/file_ops",
         "modules/utils",
+        "modules/storage",
+        "modules/agent",
+        "modules/jobs",
         "logs"
     ]
     
@@ -30,7 +33,10 @@ def create_directory_structure():
         "modules/auth/__init__.py",
         "modules/crypto/__init__.py",
         "modules/file_ops/__init__.py",
-        "modules/utils/__init__.py"
+        "modules/utils/__init__.py",
+        "modules/storage/__init__.py",
+        "modules/agent/__init__.py",
+        "modules/jobs/__init__.py"
     ]
     
     for init_file in init_files: